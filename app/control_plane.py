@@ -1,20 +1,40 @@
 # app/control_plane.py
 from __future__ import annotations
 
+import heapq
+import io
 import json
 import os
+import random
+import tarfile
 import time
 import uuid
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
+from urllib import error as urllib_error
+from urllib import request as urllib_request
 
 import yaml
-from fastapi import FastAPI, Header, HTTPException, status
+from fastapi import FastAPI, Header, HTTPException, Query, status
 from fastapi.testclient import TestClient
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.audit import AuditConfigError, audit_emit, now_utc_iso
-from app.runtime import RuntimeConfigError, load_tenant_keys
+from app.runtime import (
+    BUNDLE_DELTA_FORMAT,
+    INTERNAL_TOKEN_ENV,
+    RuntimeConfigError,
+    bundle_delta_artifact_name,
+    bundle_file_digests,
+    compute_bundle_tree_digest,
+    iter_faq_records,
+    load_ontology_intents,
+    load_tenant_keys,
+    normalize_question,
+)
 from app.runtime import app as runtime_app
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -24,19 +44,50 @@ DEFAULT_TENANT_AUTH_PATH = REPO_ROOT / "data" / "control_plane" / "tenants.json"
 AUTH_CONFIG_PATH_ENV = "CONTRACTOR_CONTROL_PLANE_TENANT_AUTH_CONFIG_PATH"
 AUTH_CONFIG_JSON_ENV = "CONTRACTOR_CONTROL_PLANE_TENANT_AUTH_CONFIG_JSON"
 ALIAS_CONFIG_PATH_ENV = "CONTRACTOR_CONTROL_PLANE_ALIAS_CONFIG_PATH"
+RUNTIME_INTERNAL_URLS_ENV = "CONTRACTOR_RUNTIME_INTERNAL_URLS"
+BUNDLE_ORIGIN_DIR_ENV = "CONTRACTOR_BUNDLE_ORIGIN_DIR"
+RUNTIME_NOTIFY_TIMEOUT_SECONDS = 2.0
+WARMUP_POLL_INTERVAL_SECONDS = 0.2
+DEFAULT_WARMUP_TIMEOUT_SECONDS = 30.0
 
 app = FastAPI()
 GATE_HISTORY_LIMIT = 50
 GATE_STORAGE_ROOT = REPO_ROOT / "data" / "control_plane" / "gates"
 ALIAS_STATE_ROOT = REPO_ROOT / "data" / "control_plane" / "alias_state"
+NEAR_DUPLICATE_WORKERS_ENV = "CONTRACTOR_NEAR_DUPLICATE_WORKERS"
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 0.8
+NEAR_DUPLICATE_SHINGLE = 4
+NEAR_DUPLICATE_BINS = 128
+NEAR_DUPLICATE_BATCH_SIZE = 20_000
+NEAR_DUPLICATE_PARALLEL_MIN = 50_000
+NEAR_DUPLICATE_MIN_RECALL = 0.9
+NEAR_DUPLICATE_RUN_WINDOW = 8
+NEAR_DUPLICATE_REPORT_LIMIT = 100
+_MINHASH_PRIME = (1 << 61) - 1
+_MINHASH_A = 0x1F3D5B79A2C4E68
+_MINHASH_B = 0x0B7E151628AED2A
+_DENSIFY_PROBES = [
+    random.Random(slot).sample(range(NEAR_DUPLICATE_BINS), NEAR_DUPLICATE_BINS)
+    for slot in range(NEAR_DUPLICATE_BINS)
+]
+_NEAR_DUPLICATE_SHINGLES: tuple[array, array] = (array("I"), array("q", [0]))
+# Bundles são imutáveis (ADR 0002): o digest de conteúdo é calculado uma vez por path.
+BUNDLE_TREE_DIGESTS: dict[str, str] = {}
 
 
 class GateRunRequest(BaseModel):
     suite_id: str | None = None
+    near_duplicate_threshold: float = Field(
+        default=DEFAULT_NEAR_DUPLICATE_THRESHOLD, gt=0, le=1
+    )
+    # Sem valor, conflitos só são reportados; com valor, acima dele o gate reprova.
+    max_conflicts: int | None = Field(default=None, ge=0)
 
 
 class AliasCandidateRequest(BaseModel):
     bundle_id: str
+    bundle_sha256: str | None = None
+    bundle_tree_sha256: str | None = None
 
 
 class AliasRollbackRequest(BaseModel):
@@ -65,6 +116,82 @@ def _find_bundle_path_by_bundle_id(bundle_id: str) -> Path:
     )
 
 
+def build_bundle_delta(
+    base_bundle_path: Path, bundle_path: Path, destination: Path
+) -> dict[str, Any]:
+    # Gera o artefato de delta (file-level) publicado na origem como
+    # {bundle_id}.from-{base_bundle_id}.delta.tar.gz.
+    base_manifest = _load_yaml_file(base_bundle_path / "manifest.yaml")
+    manifest = _load_yaml_file(bundle_path / "manifest.yaml")
+    base_digests = bundle_file_digests(base_bundle_path)
+    digests = bundle_file_digests(bundle_path)
+    delta_manifest = {
+        "format": BUNDLE_DELTA_FORMAT,
+        "base_bundle_id": str(base_manifest.get("bundle_id")),
+        "bundle_id": str(manifest.get("bundle_id")),
+        "bundle_tree_sha256": compute_bundle_tree_digest(bundle_path),
+        "removed": sorted(path for path in base_digests if path not in digests),
+        "changed": sorted(
+            path for path, digest in digests.items() if base_digests.get(path) != digest
+        ),
+    }
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    manifest_bytes = json.dumps(delta_manifest, ensure_ascii=False).encode("utf-8")
+    with tarfile.open(destination, mode="w:gz") as tar:
+        manifest_info = tarfile.TarInfo("delta.json")
+        manifest_info.size = len(manifest_bytes)
+        tar.addfile(manifest_info, io.BytesIO(manifest_bytes))
+        for relative_path in delta_manifest["changed"]:
+            tar.add(bundle_path / relative_path, arcname=f"files/{relative_path}")
+    return delta_manifest
+
+
+def _bundle_tree_digest(bundle_path: Path) -> str:
+    key = str(bundle_path.resolve())
+    digest = BUNDLE_TREE_DIGESTS.get(key)
+    if digest is None:
+        digest = BUNDLE_TREE_DIGESTS[key] = compute_bundle_tree_digest(bundle_path)
+    return digest
+
+
+def _configured_bundle_sha256(bundle_id: str) -> str | None:
+    # Digest do arquivo na origem, quando alguma entrada da alias config já aponta para o
+    # bundle: sem ele, o pré-aquecimento não tem fallback para o download completo.
+    config = load_alias_config()
+    tenants = config.get("tenants", config)
+    for entry in tenants.values() if isinstance(tenants, dict) else ():
+        if isinstance(entry, dict) and entry.get("bundle_id") == bundle_id:
+            digest = entry.get("bundle_sha256")
+            if isinstance(digest, str) and digest:
+                return digest
+    return None
+
+
+def publish_bundle_delta(base_bundle_id: str | None, bundle_id: str) -> str | None:
+    # Publica o delta base -> alvo no diretório servido como origem (ADR 0021). Best-effort:
+    # sem delta, os runtimes caem no download completo. None: nada a publicar.
+    origin = os.getenv(BUNDLE_ORIGIN_DIR_ENV)
+    if not origin or not base_bundle_id or base_bundle_id == bundle_id:
+        return None
+    destination = Path(origin) / bundle_delta_artifact_name(bundle_id, base_bundle_id)
+    if destination.exists():
+        return "exists"
+    temp_path = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        build_bundle_delta(
+            _find_bundle_path_by_bundle_id(base_bundle_id),
+            _find_bundle_path_by_bundle_id(bundle_id),
+            temp_path,
+        )
+        # Runtimes nunca baixam um delta pela metade.
+        temp_path.replace(destination)
+    except (HTTPException, RuntimeConfigError, OSError, yaml.YAMLError):
+        temp_path.unlink(missing_ok=True)
+        return "failed"
+    return "published"
+
+
 def _list_suite_paths(bundle_path: Path, suite_id: str | None) -> list[Path]:
     suites_dir = bundle_path / "suites"
     if not suites_dir.exists() or not suites_dir.is_dir():
@@ -136,6 +263,215 @@ def _load_and_validate_suite(path: Path) -> list[dict[str, str]]:
     return normalized
 
 
+def _question_shingles(normalized: str) -> set[int]:
+    padded = f" {normalized} "
+    return {
+        zlib.crc32(padded[start : start + NEAR_DUPLICATE_SHINGLE].encode("utf-8"))
+        for start in range(max(len(padded) - NEAR_DUPLICATE_SHINGLE + 1, 1))
+    }
+
+
+def _lsh_bands(threshold: float) -> tuple[int, int]:
+    # (bandas, linhas) com o maior número de linhas que ainda acha um par de Jaccard igual ao
+    # threshold com probabilidade 1 - (1 - t^r)^b >= NEAR_DUPLICATE_MIN_RECALL. Limiar do LSH,
+    # (1/b)^(1/r), bem abaixo do pedido inunda a verificação com candidatos.
+    options = [(NEAR_DUPLICATE_BINS // rows, rows) for rows in range(1, 17)]
+    eligible = [
+        (bands, rows)
+        for bands, rows in options
+        if 1 - (1 - threshold**rows) ** bands >= NEAR_DUPLICATE_MIN_RECALL
+    ]
+    return eligible[-1] if eligible else options[0]
+
+
+def _minhash_band_keys(
+    normalized: list[str], bands: int, rows: int
+) -> tuple[list[array], array, array]:
+    # One permutation hashing: um hash por shingle, o bit baixo escolhe o bin e o mínimo fica
+    # no bin. Perguntas curtas deixam a maioria dos bins vazia; cada bin vazio copia o primeiro
+    # bin cheio da sua sequência fixa de sondagem (densificação ótima). Copiar o vizinho
+    # espalharia uma única diferença por vários bins seguidos e derrubaria o recall das bandas.
+    # Os shingles voltam compactados (array + contagem por pergunta) para a verificação exata.
+    keys = [array("q") for _ in range(bands)]
+    shingles = array("I")
+    counts = array("I")
+    bin_bits = NEAR_DUPLICATE_BINS.bit_length() - 1
+    for text in normalized:
+        text_shingles = _question_shingles(text)
+        shingles.extend(text_shingles)
+        counts.append(len(text_shingles))
+        raw: list[int | None] = [None] * NEAR_DUPLICATE_BINS
+        for shingle in text_shingles:
+            value = (_MINHASH_A * shingle + _MINHASH_B) % _MINHASH_PRIME
+            slot = value & (NEAR_DUPLICATE_BINS - 1)
+            value >>= bin_bits
+            current = raw[slot]
+            if current is None or value < current:
+                raw[slot] = value
+        signature = raw[:]
+        for slot, current in enumerate(raw):
+            if current is None:
+                for probe in _DENSIFY_PROBES[slot]:
+                    if raw[probe] is not None:
+                        signature[slot] = raw[probe]
+                        break
+        for band in range(bands):
+            keys[band].append(hash(tuple(signature[band * rows : (band + 1) * rows])))
+    return keys, shingles, counts
+
+
+def _init_near_duplicate_worker(shingles: array, offsets: array) -> None:
+    global _NEAR_DUPLICATE_SHINGLES
+    _NEAR_DUPLICATE_SHINGLES = (shingles, offsets)
+
+
+def _band_near_duplicates(
+    keys: array, threshold: float, shingles: tuple[array, array] | None = None
+) -> list[tuple[int, int, float]]:
+    # Uma banda: ids ordenados pela chave, cada sequência de chaves iguais gera candidatos e o
+    # Jaccard exato é calculado aqui mesmo; só os pares aprovados voltam ao processo pai.
+    # Cada id só pareia com os NEAR_DUPLICATE_RUN_WINDOW seguintes na ordem do texto
+    # normalizado: sequências enormes (perguntas de template) custam linear, não quadrático.
+    values, offsets = _NEAR_DUPLICATE_SHINGLES if shingles is None else shingles
+    ordered = sorted(range(len(keys)), key=keys.__getitem__)
+    found: list[tuple[int, int, float]] = []
+    start = 0
+    for end in range(1, len(ordered) + 1):
+        if end < len(ordered) and keys[ordered[end]] == keys[ordered[start]]:
+            continue
+        if end - start > 1:
+            run = sorted(ordered[start:end])
+            sets = [set(values[offsets[index] : offsets[index + 1]]) for index in run]
+            for position, left in enumerate(sets):
+                stop = min(position + 1 + NEAR_DUPLICATE_RUN_WINDOW, len(run))
+                for other in range(position + 1, stop):
+                    right = sets[other]
+                    shared = len(left & right)
+                    similarity = shared / (len(left) + len(right) - shared)
+                    if similarity >= threshold:
+                        found.append((run[position], run[other], similarity))
+        start = end
+    return found
+
+
+def _near_duplicate_workers() -> int:
+    raw = os.getenv(NEAR_DUPLICATE_WORKERS_ENV)
+    if raw is None or not raw.strip():
+        return os.cpu_count() or 1
+    try:
+        workers = int(raw)
+    except ValueError as exc:
+        raise RuntimeConfigError("Near-duplicate workers invalid") from exc
+    if workers < 1:
+        raise RuntimeConfigError("Near-duplicate workers invalid")
+    return workers
+
+
+def _bundle_question_answers(bundle_path: Path) -> dict[str, str | None]:
+    answers: dict[str, str | None] = dict(iter_faq_records(bundle_path))
+    for intent in load_ontology_intents(bundle_path):
+        match = intent.get("match") if isinstance(intent, dict) else None
+        if isinstance(match, dict):
+            for question in match.get("questions") or []:
+                if isinstance(question, str):
+                    answers.setdefault(question, None)
+    return answers
+
+
+def find_near_duplicate_questions(
+    answers: dict[str, str | None], threshold: float
+) -> dict[str, Any]:
+    # Perguntas de faq.json e de match.questions; conflito = par parecido com respostas
+    # diferentes. Pergunta da ontologia sem resposta no faq.json conta à parte (unanswered).
+    by_normalized: dict[str, list[str]] = {}
+    for question in sorted(answers):
+        by_normalized.setdefault(normalize_question(question), []).append(question)
+    found: list[tuple[float, str, str]] = []
+    for group in by_normalized.values():
+        found.extend((1.0, group[0], other) for other in group[1:])
+
+    normalized = sorted(by_normalized)
+    bands, rows = _lsh_bands(threshold)
+    batches = [
+        normalized[start : start + NEAR_DUPLICATE_BATCH_SIZE]
+        for start in range(0, len(normalized), NEAR_DUPLICATE_BATCH_SIZE)
+    ]
+    workers = _near_duplicate_workers()
+    parallel = workers > 1 and len(normalized) >= NEAR_DUPLICATE_PARALLEL_MIN
+    if parallel:
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+            batch_results = list(
+                executor.map(
+                    _minhash_band_keys, batches, [bands] * len(batches), [rows] * len(batches)
+                )
+            )
+    else:
+        batch_results = [_minhash_band_keys(batch, bands, rows) for batch in batches]
+    band_keys = [array("q") for _ in range(bands)]
+    shingles = array("I")
+    offsets = array("q", [0])
+    for batch_keys, batch_shingles, counts in batch_results:
+        for keys, keys_part in zip(band_keys, batch_keys, strict=True):
+            keys.extend(keys_part)
+        shingles.extend(batch_shingles)
+        for count in counts:
+            offsets.append(offsets[-1] + count)
+    del batch_results
+    # Candidatos e Jaccard exato por banda; os processos recebem os shingles uma única vez.
+    if parallel:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, bands),
+            initializer=_init_near_duplicate_worker,
+            initargs=(shingles, offsets),
+        ) as executor:
+            band_results = list(
+                executor.map(_band_near_duplicates, band_keys, [threshold] * bands)
+            )
+    else:
+        band_results = [
+            _band_near_duplicates(keys, threshold, (shingles, offsets)) for keys in band_keys
+        ]
+    # Um par parecido costuma colidir em várias bandas; a chave inteira evita uma tupla por par.
+    similar: dict[int, float] = {}
+    for result in band_results:
+        for left, right, similarity in result:
+            similar[left * len(normalized) + right] = similarity
+    for key, similarity in similar.items():
+        left, right = divmod(key, len(normalized))
+        found.append(
+            (
+                similarity,
+                by_normalized[normalized[left]][0],
+                by_normalized[normalized[right]][0],
+            )
+        )
+
+    # Só os primeiros pares do relatório viram dicts; grupos de template podem somar milhões.
+    conflicts = 0
+    unanswered = 0
+    ranked: list[tuple[bool, float, list[str]]] = []
+    for similarity, left, right in found:
+        missing = answers[left] is None or answers[right] is None
+        conflict = not missing and answers[left] != answers[right]
+        conflicts += conflict
+        unanswered += missing
+        ranked.append((not conflict, -round(similarity, 4), [left, right]))
+    reported = [
+        {"questions": questions, "similarity": -similarity, "conflict": not not_conflict}
+        for not_conflict, similarity, questions in heapq.nsmallest(
+            NEAR_DUPLICATE_REPORT_LIMIT, ranked
+        )
+    ]
+    return {
+        "questions": len(answers),
+        "threshold": threshold,
+        "near_duplicates": len(found),
+        "conflicts": conflicts,
+        "unanswered": unanswered,
+        "pairs": reported,
+    }
+
+
 def _gate_storage_file(tenant_id: str, bundle_id: str, gate_id: str) -> Path:
     return GATE_STORAGE_ROOT / tenant_id / bundle_id / f"{gate_id}.json"
 
@@ -222,6 +558,85 @@ def _save_alias_state(tenant_id: str, payload: dict[str, Any]) -> None:
     _atomic_write_json(_alias_state_file(tenant_id), payload)
 
 
+def _runtime_internal_urls() -> list[str]:
+    urls: list[str] = []
+    for raw_url in os.getenv(RUNTIME_INTERNAL_URLS_ENV, "").split(","):
+        url = raw_url.strip().rstrip("/")
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def _runtime_internal_request(
+    url: str, method: str, payload: dict[str, Any] | None = None
+) -> dict[str, Any] | None:
+    headers = {"Content-Type": "application/json"}
+    token = os.getenv(INTERNAL_TOKEN_ENV)
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    try:
+        with urllib_request.urlopen(
+            urllib_request.Request(url, data=data, method=method, headers=headers),
+            timeout=RUNTIME_NOTIFY_TIMEOUT_SECONDS,
+        ) as response:
+            body = json.loads(response.read().decode("utf-8"))
+    except (urllib_error.URLError, OSError, json.JSONDecodeError):
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def _fan_out_runtimes(
+    method: str, path: str, payload: dict[str, Any] | None = None
+) -> list[dict[str, Any] | None]:
+    urls = _runtime_internal_urls()
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(len(urls), 16)) as pool:
+        return list(
+            pool.map(
+                lambda url: _runtime_internal_request(f"{url}{path}", method, payload),
+                urls,
+            )
+        )
+
+
+def notify_runtimes_candidate(tenant_id: str, candidate: dict[str, Any]) -> int:
+    # Best-effort: runtimes indisponíveis não bloqueiam o set de candidate; o
+    # quorum de aquecimento é verificado (opcionalmente) no promote.
+    responses = _fan_out_runtimes(
+        "POST", "/internal/warmup", {"tenant_id": tenant_id, **candidate}
+    )
+    return sum(1 for response in responses if response is not None)
+
+
+def notify_runtimes_alias_changed(tenant_id: str, bundle_id: str) -> int:
+    # Invalida o cache negativo dos runtimes (tenant e novo bundle); best-effort, o TTL
+    # curto do cache cobre runtimes que não receberem a notificação.
+    responses = _fan_out_runtimes(
+        "POST", f"/internal/aliases/{tenant_id}/changed", {"bundle_id": bundle_id}
+    )
+    return sum(1 for response in responses if response is not None)
+
+
+def count_warm_runtimes(bundle_id: str) -> int:
+    responses = _fan_out_runtimes("GET", f"/internal/warmup/{bundle_id}")
+    return sum(
+        1
+        for response in responses
+        if response is not None and response.get("status") == "warm"
+    )
+
+
+def wait_for_runtime_warmup(bundle_id: str, quorum: int, timeout_seconds: float) -> int:
+    deadline = time.monotonic() + timeout_seconds
+    warm_count = count_warm_runtimes(bundle_id)
+    while warm_count < quorum and time.monotonic() < deadline:
+        time.sleep(WARMUP_POLL_INTERVAL_SECONDS)
+        warm_count = count_warm_runtimes(bundle_id)
+    return warm_count
+
+
 def _ensure_passed_gate_for_bundle(tenant_id: str, bundle_id: str) -> None:
     bundle_dir = GATE_STORAGE_ROOT / tenant_id / bundle_id
     if not bundle_dir.exists():
@@ -435,7 +850,21 @@ def enforce_control_plane_auth(
     return token_tenant_id
 
 
-def resolve_current_bundle_metadata(tenant_id: str) -> tuple[str, str, str | None]:
+def _optional_entry_digest(tenant_entry: dict[str, Any], key: str) -> str | None:
+    raw_digest = tenant_entry.get(key)
+    if raw_digest is None:
+        return None
+    if not isinstance(raw_digest, str) or not raw_digest:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Bundle metadata missing",
+        )
+    return raw_digest
+
+
+def resolve_current_bundle_metadata(
+    tenant_id: str,
+) -> tuple[str, str, str | None, str]:
     config = load_alias_config()
     tenants = config.get("tenants", config)
     tenant_entry = tenants.get(tenant_id) or tenants.get("*")
@@ -444,6 +873,7 @@ def resolve_current_bundle_metadata(tenant_id: str) -> tuple[str, str, str | Non
             status_code=status.HTTP_404_NOT_FOUND, detail="Tenant not found"
         )
     bundle_sha256: str | None = None
+    bundle_tree_sha256: str | None = None
     if isinstance(tenant_entry, str):
         bundle_path_value = tenant_entry
         bundle_id = None
@@ -452,14 +882,8 @@ def resolve_current_bundle_metadata(tenant_id: str) -> tuple[str, str, str | Non
             "bundle_path"
         )
         bundle_id = tenant_entry.get("bundle_id")
-        raw_digest = tenant_entry.get("bundle_sha256")
-        if raw_digest is not None:
-            if not isinstance(raw_digest, str) or not raw_digest:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Bundle metadata missing",
-                )
-            bundle_sha256 = raw_digest
+        bundle_sha256 = _optional_entry_digest(tenant_entry, "bundle_sha256")
+        bundle_tree_sha256 = _optional_entry_digest(tenant_entry, "bundle_tree_sha256")
     if not bundle_path_value:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -482,7 +906,15 @@ def resolve_current_bundle_metadata(tenant_id: str) -> tuple[str, str, str | Non
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Bundle metadata missing",
         )
-    return str(bundle_id), str(min_version), bundle_sha256
+    # Sempre informado: sem ele os runtimes não usam delta nem peers (ADR 0021, ADR 0022).
+    # Um valor na alias config só é aceito se confere com o bundle publicado.
+    tree_digest = _bundle_tree_digest(bundle_path)
+    if bundle_tree_sha256 is not None and bundle_tree_sha256 != tree_digest:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Bundle metadata invalid",
+        )
+    return str(bundle_id), str(min_version), bundle_sha256, tree_digest
 
 
 def _map_error_code(exc: Exception, http_status: int) -> str:
@@ -521,8 +953,8 @@ def resolve_current(
         enforce_control_plane_auth(
             tenant_id=tenant_id, authorization=authorization, x_tenant_id=x_tenant_id
         )
-        bundle_id, min_version, bundle_sha256 = resolve_current_bundle_metadata(
-            tenant_id
+        bundle_id, min_version, bundle_sha256, bundle_tree_sha256 = (
+            resolve_current_bundle_metadata(tenant_id)
         )
         payload = {
             "bundle_id": bundle_id,
@@ -530,6 +962,7 @@ def resolve_current(
         }
         if bundle_sha256:
             payload["bundle_sha256"] = bundle_sha256
+        payload["bundle_tree_sha256"] = bundle_tree_sha256
         return payload
     except HTTPException as exc:
         status_code = exc.status_code
@@ -591,18 +1024,43 @@ def set_alias_candidate(
     status_code = status.HTTP_200_OK
     from_bundle_id: str | None = None
     to_bundle_id: str | None = None
+    runtimes_notified: int | None = None
+    bundle_delta: str | None = None
 
     try:
         enforce_control_plane_auth(
             tenant_id=tenant_id, authorization=authorization, x_tenant_id=x_tenant_id
         )
-        _find_bundle_path_by_bundle_id(alias_request.bundle_id)
+        bundle_path = _find_bundle_path_by_bundle_id(alias_request.bundle_id)
+        # O digest de conteúdo é calculado aqui, não confiado ao chamador: é ele que
+        # verifica deltas e peers nos runtimes (ADR 0021, ADR 0022).
+        tree_digest = _bundle_tree_digest(bundle_path)
+        if alias_request.bundle_tree_sha256 and alias_request.bundle_tree_sha256 != tree_digest:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail="Bundle tree digest mismatch",
+            )
         state = _load_alias_state(tenant_id)
         candidate = state["aliases"]["candidate"]
+        current = state["aliases"]["current"]
         from_bundle_id = candidate["bundle_id"] if isinstance(candidate, dict) else None
         to_bundle_id = alias_request.bundle_id
-        state["aliases"]["candidate"] = {"bundle_id": alias_request.bundle_id}
+        candidate_entry: dict[str, Any] = {"bundle_id": alias_request.bundle_id}
+        bundle_sha256 = alias_request.bundle_sha256 or _configured_bundle_sha256(
+            alias_request.bundle_id
+        )
+        if bundle_sha256:
+            candidate_entry["bundle_sha256"] = bundle_sha256
+        candidate_entry["bundle_tree_sha256"] = tree_digest
+        state["aliases"]["candidate"] = candidate_entry
         _save_alias_state(tenant_id, state)
+        # Delta a partir do current, publicado antes do pré-aquecimento dos runtimes.
+        bundle_delta = publish_bundle_delta(
+            current["bundle_id"] if isinstance(current, dict) else None,
+            alias_request.bundle_id,
+        )
+        if _runtime_internal_urls():
+            runtimes_notified = notify_runtimes_candidate(tenant_id, candidate_entry)
         return {
             "tenant_id": tenant_id,
             "aliases": state["aliases"],
@@ -632,6 +1090,10 @@ def set_alias_candidate(
             event["from_bundle_id"] = from_bundle_id
         if to_bundle_id:
             event["to_bundle_id"] = to_bundle_id
+        if bundle_delta is not None:
+            event["bundle_delta"] = bundle_delta
+        if runtimes_notified is not None:
+            event["runtimes_notified"] = runtimes_notified
         try:
             audit_emit(event)
         except AuditConfigError as exc:
@@ -644,6 +1106,11 @@ def set_alias_candidate(
 @app.post("/tenants/{tenant_id}/aliases/promote")
 def promote_alias_current(
     tenant_id: str,
+    wait_for_warm: bool = Query(default=False),
+    warm_quorum: int | None = Query(default=None, ge=1),
+    warm_timeout_seconds: float = Query(
+        default=DEFAULT_WARMUP_TIMEOUT_SECONDS, gt=0, le=300
+    ),
     authorization: str | None = Header(default=None, alias="Authorization"),
     x_tenant_id: str | None = Header(default=None, alias="X-Tenant-Id"),
     x_request_id: str | None = Header(default=None, alias="X-Request-Id"),
@@ -657,6 +1124,9 @@ def promote_alias_current(
     status_code = status.HTTP_200_OK
     from_bundle_id: str | None = None
     to_bundle_id: str | None = None
+    warmup: dict[str, int] | None = None
+    runtimes_notified: int | None = None
+    bundle_delta: str | None = None
 
     try:
         enforce_control_plane_auth(
@@ -676,8 +1146,37 @@ def promote_alias_current(
         from_bundle_id = current["bundle_id"] if isinstance(current, dict) else None
         to_bundle_id = candidate_bundle_id
         _ensure_passed_gate_for_bundle(tenant_id, candidate_bundle_id)
-        state["aliases"]["current"] = {"bundle_id": candidate_bundle_id}
+        if wait_for_warm:
+            runtime_urls = _runtime_internal_urls()
+            if not runtime_urls:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Runtime warmup config missing",
+                )
+            required = warm_quorum or len(runtime_urls) // 2 + 1
+            if required > len(runtime_urls):
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail="Warmup quorum invalid",
+                )
+            warm_count = wait_for_runtime_warmup(
+                candidate_bundle_id, required, warm_timeout_seconds
+            )
+            warmup = {"warm": warm_count, "required": required}
+            if warm_count < required:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Warmup quorum not reached",
+                )
+        # O current pode ter mudado desde o set do candidate (rollback): garante o delta do
+        # current real antes dos runtimes buscarem o novo bundle.
+        bundle_delta = publish_bundle_delta(from_bundle_id, candidate_bundle_id)
+        state["aliases"]["current"] = dict(candidate)
         _save_alias_state(tenant_id, state)
+        if _runtime_internal_urls():
+            runtimes_notified = notify_runtimes_alias_changed(
+                tenant_id, candidate_bundle_id
+            )
         return {
             "tenant_id": tenant_id,
             "aliases": state["aliases"],
@@ -707,6 +1206,12 @@ def promote_alias_current(
             event["from_bundle_id"] = from_bundle_id
         if to_bundle_id:
             event["to_bundle_id"] = to_bundle_id
+        if warmup is not None:
+            event["warmup"] = warmup
+        if bundle_delta is not None:
+            event["bundle_delta"] = bundle_delta
+        if runtimes_notified is not None:
+            event["runtimes_notified"] = runtimes_notified
         try:
             audit_emit(event)
         except AuditConfigError as exc:
@@ -733,6 +1238,7 @@ def rollback_alias_current(
     status_code = status.HTTP_200_OK
     from_bundle_id: str | None = None
     to_bundle_id: str | None = None
+    runtimes_notified: int | None = None
 
     try:
         enforce_control_plane_auth(
@@ -745,6 +1251,10 @@ def rollback_alias_current(
         _ensure_passed_gate_for_bundle(tenant_id, alias_request.bundle_id)
         state["aliases"]["current"] = {"bundle_id": alias_request.bundle_id}
         _save_alias_state(tenant_id, state)
+        if _runtime_internal_urls():
+            runtimes_notified = notify_runtimes_alias_changed(
+                tenant_id, alias_request.bundle_id
+            )
         return {
             "tenant_id": tenant_id,
             "aliases": state["aliases"],
@@ -774,6 +1284,8 @@ def rollback_alias_current(
             event["from_bundle_id"] = from_bundle_id
         if to_bundle_id:
             event["to_bundle_id"] = to_bundle_id
+        if runtimes_notified is not None:
+            event["runtimes_notified"] = runtimes_notified
         try:
             audit_emit(event)
         except AuditConfigError as exc:
@@ -802,6 +1314,7 @@ def run_quality_gate(
     status_code = status.HTTP_200_OK
     outcome = "pass"
     summary = {"total": 0, "passed": 0, "failed": 0}
+    conflicts = 0
 
     try:
         enforce_control_plane_auth(
@@ -809,11 +1322,18 @@ def run_quality_gate(
         )
         bundle_path = _find_bundle_path_by_bundle_id(bundle_id)
         suite_paths = _list_suite_paths(bundle_path, gate_request.suite_id)
+        suites = [(path, _load_and_validate_suite(path)) for path in suite_paths]
+        for _, suite_cases in suites:
+            _ensure_suite_matches_tenant(suite_cases, tenant_id)
+        # Conflitos entre perguntas do bundle são apurados antes de executar as suites;
+        # só reprovam o gate com max_conflicts explícito no pedido.
+        validation = find_near_duplicate_questions(
+            _bundle_question_answers(bundle_path), gate_request.near_duplicate_threshold
+        )
+        conflicts = validation["conflicts"]
 
         suites_result: list[dict[str, Any]] = []
-        for suite_path in suite_paths:
-            suite_cases = _load_and_validate_suite(suite_path)
-            _ensure_suite_matches_tenant(suite_cases, tenant_id)
+        for suite_path, suite_cases in suites:
             case_results, passed_count, failed_count = _run_suite_cases(
                 suite_cases, request_id
             )
@@ -832,7 +1352,8 @@ def run_quality_gate(
             summary["passed"] += passed_count
             summary["failed"] += failed_count
 
-        if summary["failed"] > 0:
+        max_conflicts = gate_request.max_conflicts
+        if summary["failed"] > 0 or (max_conflicts is not None and conflicts > max_conflicts):
             outcome = "fail"
 
         payload = {
@@ -843,8 +1364,13 @@ def run_quality_gate(
             "status": "completed",
             "outcome": outcome,
             "created_at": now_utc_iso(),
-            "criteria": {"pass_rule": "all_cases_must_pass", "max_failures": 0},
+            "criteria": {
+                "pass_rule": "all_cases_must_pass",
+                "max_failures": 0,
+                "max_conflicts": max_conflicts,
+            },
             "summary": summary,
+            "validation": validation,
             "suites": suites_result,
         }
         _atomic_write_json(_gate_storage_file(tenant_id, bundle_id, gate_id), payload)
@@ -884,6 +1410,7 @@ def run_quality_gate(
                 "total": summary["total"],
                 "passed": summary["passed"],
                 "failed": summary["failed"],
+                "conflicts": conflicts,
             },
         }
         try:
@@ -2,24 +2,59 @@
 from __future__ import annotations
 
 import hashlib
+import heapq
 import json
 import logging
+import math
+import mmap
 import os
+import random
+import re
 import shutil
+import socket
+import struct
+import sys
 import tarfile
 import tempfile
+import threading
 import time
+import unicodedata
 import uuid
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable, Hashable, Iterator, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait as futures_wait
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from http import client as http_client
 from pathlib import Path
 from typing import Any
 from urllib import error as urllib_error
+from urllib import parse as urllib_parse
 from urllib import request as urllib_request
 
+import jinja2
 import yaml
+from anyio import to_thread
 from fastapi import FastAPI, Header, HTTPException, Response, status
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from fastapi.responses import FileResponse
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    select_autoescape,
+)
+from jinja2 import meta as jinja2_meta
+from jinja2.bccache import Bucket
 from jsonschema import Draft202012Validator
+from jsonschema.exceptions import SchemaError
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 
 from app.audit import AuditConfigError, audit_emit, now_utc_iso, sha256_hex
 
@@ -31,6 +66,188 @@ class ExecuteRequest(BaseModel):
     question: str
 
 
+class AliasChangeNotification(BaseModel):
+    bundle_id: str | None = None
+
+
+class BundleWarmupRequest(BaseModel):
+    tenant_id: str
+    bundle_id: str
+    bundle_sha256: str | None = None
+    bundle_tree_sha256: str | None = None
+
+
+@dataclass(frozen=True)
+class LexicalIndex:
+    # Índice invertido BM25 montado na compilação: doc id = posição em questions (ordenadas).
+    # Cada posting guarda o peso BM25 já calculado (idf x tf saturado pelo tamanho do doc),
+    # então o score por request é só soma de pesos.
+    questions: tuple[str, ...]
+    doc_lengths: array
+    idf: dict[str, float]
+    postings: dict[str, tuple[array, array]]
+    max_weights: dict[str, float]
+    threshold: float
+
+
+@dataclass(frozen=True)
+class SuggestionIndex:
+    # Matriz esparsa de trigramas de caracteres (hash em SUGGESTION_HASH_BUCKETS colunas,
+    # tf-idf normalizado L2), guardada por coluna: bucket -> (doc ids, pesos). O produto
+    # escalar com a pergunta (cosseno) só visita as colunas presentes nela.
+    questions: tuple[str, ...]
+    columns: dict[int, tuple[array, array]]
+    max_weights: dict[int, float]
+    idf: dict[int, float]
+    top_k: int
+    min_similarity: float
+
+
+class KeywordAutomaton:
+    # Aho-Corasick: keywords de todas as intents numa única máquina; uma passada pelo texto
+    # devolve os índices das intents com alguma keyword presente.
+    def __init__(self, keywords: list[tuple[str, int]]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._outputs: list[frozenset[int]] = [frozenset()]
+        for keyword, intent_index in keywords:
+            node = 0
+            for char in keyword:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][char] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(frozenset())
+                node = child
+            self._outputs[node] = self._outputs[node] | {intent_index}
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._outputs[child] = self._outputs[child] | self._outputs[self._fail[child]]
+
+    def matches(self, text: str) -> set[int]:
+        found: set[int] = set()
+        node = 0
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            if self._outputs[node]:
+                found |= self._outputs[node]
+        return found
+
+
+@dataclass(frozen=True)
+class IntentRouter:
+    # Intents na ordem da ontologia. Keywords (sobre a pergunta normalizada, por palavra
+    # inteira) num único Aho-Corasick; regexes (sobre a pergunta original) numa única
+    # alternação de lookaheads, em ordem de prioridade.
+    names: tuple[str, ...]
+    priorities: tuple[int, ...]
+    answers: tuple[str, ...]
+    question_intent: int | None
+    keywords: KeywordAutomaton | None
+    regex: re.Pattern[str] | None
+
+    def route(self, question: str, normalized: str, *, question_matched: bool) -> int | None:
+        found: set[int] = set()
+        if question_matched and self.question_intent is not None:
+            found.add(self.question_intent)
+        if self.keywords is not None:
+            found |= self.keywords.matches(f" {normalized} ")
+        if self.regex is not None:
+            for match in self.regex.finditer(question):
+                found.add(int(match.lastgroup[len("intent_") :]))  # type: ignore[index]
+        if not found:
+            return None
+        # Maior prioridade vence; empate pela ordem de declaração na ontologia.
+        return min(found, key=lambda index: (-self.priorities[index], index))
+
+
+def _json_bytes(value: Any) -> bytes:
+    # Mesma codificação do JSONResponse do Starlette.
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class ExecuteResponseFragments:
+    # Corpo do /execute pré-codificado; só request_id e tenant_id entram por request.
+    middle: bytes
+    tail: bytes
+
+    def render(self, request_id: str, tenant_id: str) -> bytes:
+        return b"".join(
+            (
+                b'{"request_id":',
+                _json_bytes(request_id),
+                self.middle,
+                _json_bytes(tenant_id),
+                self.tail,
+            )
+        )
+
+
+class ResponseFragmentCache:
+    # LRU por bundle compilado: pergunta -> fragments de um resultado determinístico.
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, ExecuteResponseFragments] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, question: str) -> ExecuteResponseFragments | None:
+        with self._lock:
+            fragments = self._entries.get(question)
+            if fragments is not None:
+                self._entries.move_to_end(question)
+            return fragments
+
+    def put(self, question: str, fragments: ExecuteResponseFragments) -> None:
+        with self._lock:
+            self._entries[question] = fragments
+            self._entries.move_to_end(question)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+@dataclass(frozen=True)
+class CompiledBundle:
+    bundle_id: str
+    bundle_path: Path
+    intent_questions: frozenset[str]
+    answer_map: PackedFaqAnswers | FaqAnswerIndex
+    # Validação do payload contra o schema da entidade, decidida na compilação:
+    # "proven" (sem check por request), "generated" ou "jsonschema".
+    response_validation: str
+    response_check: Callable[[dict[str, str]], bool] | None
+    template: Template
+    # Intent das perguntas (ou a primeira da ontologia), usada também no no_match.
+    intent_name: str
+    router: IntentRouter
+    # match.type da intent e índice chave de lookup -> pergunta canônica (pré-normalizado
+    # na compilação para match.type normalized).
+    match_type: str = "exact"
+    question_index: dict[str, str] = field(default_factory=dict)
+    lexical_index: LexicalIndex | None = None
+    suggestion_index: SuggestionIndex | None = None
+    response_cache: ResponseFragmentCache = field(
+        default_factory=lambda: ResponseFragmentCache(DEFAULT_RESPONSE_CACHE_MAX_ENTRIES)
+    )
+
+
 class RuntimeConfigError(RuntimeError):
     def __init__(
         self, message: str, *, status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -39,6 +256,301 @@ class RuntimeConfigError(RuntimeError):
         self.status_code = status_code
 
 
+class ControlPlaneUnavailableError(RuntimeConfigError):
+    pass
+
+
+class BundleFetchUnavailableError(RuntimeConfigError):
+    pass
+
+
+class BundleDownloadError(RuntimeConfigError):
+    # Falha de rede ou da origem durante o download: transitória, nunca vai ao cache negativo.
+    pass
+
+
+class DeadlineExceededError(RuntimeConfigError):
+    def __init__(self) -> None:
+        super().__init__(
+            "Request deadline exceeded", status_code=status.HTTP_504_GATEWAY_TIMEOUT
+        )
+
+
+@dataclass(frozen=True)
+class Deadline:
+    # Instante limite em time.monotonic(); imune a ajustes do relógio de parede.
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> Deadline:
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def check(self) -> None:
+        if self.remaining() <= 0:
+            raise DeadlineExceededError()
+
+    def bound(self, timeout: float) -> float:
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError()
+        return min(timeout, remaining)
+
+
+class ControlPlaneCircuitOpenError(ControlPlaneUnavailableError):
+    pass
+
+
+class ControlPlaneCallCancelledError(ControlPlaneUnavailableError):
+    def __init__(self) -> None:
+        super().__init__(
+            "Control Plane call cancelled", status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+
+class LoadShedError(RuntimeConfigError):
+    def __init__(self) -> None:
+        super().__init__(
+            "Runtime overloaded", status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+
+class CircuitBreaker:
+    # Janela deslizante das últimas chamadas: abre ao atingir a taxa de falhas (chamadas
+    # lentas contam como falha); após open_seconds, deixa passar uma sonda (half_open).
+    def __init__(
+        self,
+        *,
+        window: int,
+        min_calls: int,
+        error_rate: float,
+        slow_call_seconds: float,
+        open_seconds: float,
+    ) -> None:
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = "closed"
+        self.opened_total = 0
+        self.short_circuited_total = 0
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.short_circuited_total += 1
+                    return False
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open":
+                if self._probe_in_flight:
+                    self.short_circuited_total += 1
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record(self, *, success: bool, latency_seconds: float) -> None:
+        failed = not success or latency_seconds > self.slow_call_seconds
+        with self._lock:
+            if self.state == "half_open":
+                self._probe_in_flight = False
+                if failed:
+                    self._open()
+                else:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                return
+            self._outcomes.append(failed)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and sum(self._outcomes) / len(self._outcomes) >= self.error_rate
+            ):
+                self._open()
+
+    def abandon(self) -> None:
+        # Chamada interrompida pelo deadline da request: não diz nada sobre o Control Plane.
+        with self._lock:
+            if self.state == "half_open":
+                self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened_total += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "window_calls": len(self._outcomes),
+                "window_failures": sum(self._outcomes),
+                "opened_total": self.opened_total,
+                "short_circuited_total": self.short_circuited_total,
+            }
+
+
+class SingleFlight:
+    # Coalesce chamadas concorrentes com a mesma chave: a primeira executa, as demais
+    # esperam o mesmo resultado (ou exceção). Nada fica em cache após a conclusão.
+    def __init__(self) -> None:
+        self.shared_total = 0
+        self._calls: dict[Hashable, Future[Any]] = {}
+        self._lock = threading.Lock()
+
+    def do(
+        self, key: Hashable, fn: Callable[[], Any], *, timeout: float | None = None
+    ) -> tuple[Any, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if future is None:
+                future = self._calls[key] = Future()
+            else:
+                self.shared_total += 1
+        if not leader:
+            return future.result(timeout=timeout), True
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+@dataclass
+class _AdmissionTicket:
+    tenant_id: str
+    granted: threading.Event = field(default_factory=threading.Event)
+    cancelled: bool = False
+
+
+class AdmissionController:
+    # Limite de concorrência adaptativo (AIMD sobre a latência observada) com fila limitada e
+    # weighted fair queuing por tenant (virtual finish time). Rejeita na hora quando a fila
+    # está cheia ou a espera estimada passaria do alvo; quem espera além do alvo também cai.
+    def __init__(
+        self,
+        *,
+        initial_limit: int,
+        max_limit: int,
+        max_queue: int,
+        queue_target_seconds: float,
+        latency_target_seconds: float,
+    ) -> None:
+        self.limit = float(min(initial_limit, max_limit))
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_target_seconds = queue_target_seconds
+        self.latency_target_seconds = latency_target_seconds
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted_total = 0
+        self.shed_totals = {"queue_full": 0, "wait_estimate": 0, "wait_timeout": 0}
+        self._service_seconds = 0.0
+        self._queue: list[tuple[float, int, _AdmissionTicket]] = []
+        self._queued_by_tenant: dict[str, int] = {}
+        self._tenant_finish: dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def acquire(
+        self, tenant_id: str, *, weight: int = 1, deadline: Deadline | None = None
+    ) -> None:
+        with self._lock:
+            if not self.queued and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                self.admitted_total += 1
+                return
+            if self.queued >= self.max_queue:
+                self.shed_totals["queue_full"] += 1
+                raise LoadShedError()
+            # Espera estimada: posição na fila x tempo médio de serviço / slots.
+            if (self.queued + 1) * self._service_seconds / int(self.limit) > (
+                self.queue_target_seconds
+            ):
+                self.shed_totals["wait_estimate"] += 1
+                raise LoadShedError()
+            timeout = self.queue_target_seconds
+            if deadline is not None:
+                timeout = deadline.bound(timeout)
+            finish = max(self._virtual_time, self._tenant_finish.get(tenant_id, 0.0))
+            finish += 1.0 / weight
+            self._tenant_finish[tenant_id] = finish
+            self._sequence += 1
+            ticket = _AdmissionTicket(tenant_id)
+            heapq.heappush(self._queue, (finish, self._sequence, ticket))
+            self.queued += 1
+            self._queued_by_tenant[tenant_id] = self._queued_by_tenant.get(tenant_id, 0) + 1
+        if ticket.granted.wait(timeout):
+            return
+        with self._lock:
+            if ticket.granted.is_set():
+                return
+            ticket.cancelled = True
+            self._dequeued(ticket)
+            if not self.queued:
+                self._queue.clear()
+            if deadline is None or deadline.remaining() > 0:
+                self.shed_totals["wait_timeout"] += 1
+        if deadline is not None:
+            deadline.check()
+        raise LoadShedError()
+
+    def release(self, latency_seconds: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._service_seconds = (
+                latency_seconds
+                if not self._service_seconds
+                else 0.8 * self._service_seconds + 0.2 * latency_seconds
+            )
+            if latency_seconds > self.latency_target_seconds:
+                self.limit = max(1.0, self.limit * 0.9)
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            while self.queued and self.in_flight < int(self.limit):
+                finish, _, ticket = heapq.heappop(self._queue)
+                if ticket.cancelled:
+                    continue
+                self._virtual_time = finish
+                self._dequeued(ticket)
+                self.in_flight += 1
+                self.admitted_total += 1
+                ticket.granted.set()
+
+    def _dequeued(self, ticket: _AdmissionTicket) -> None:
+        self.queued -= 1
+        remaining = self._queued_by_tenant.pop(ticket.tenant_id) - 1
+        if remaining:
+            self._queued_by_tenant[ticket.tenant_id] = remaining
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": round(self.limit, 3),
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "queued_by_tenant": dict(self._queued_by_tenant),
+                "admitted_total": self.admitted_total,
+                "shed_total": sum(self.shed_totals.values()),
+                "shed_by_reason": dict(self.shed_totals),
+            }
+
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_ALIAS_PATH = REPO_ROOT / "data" / "control_plane" / "demo_aliases.json"
 DEFAULT_TENANT_KEYS_PATH = REPO_ROOT / "data" / "runtime" / "tenants.json"
@@ -48,7 +560,201 @@ DEFAULT_RATE_LIMIT_POLICY_PATH = (
 RATE_LIMIT_POLICY_ENV_JSON = "CONTRACTOR_RATE_LIMIT_POLICY_JSON"
 RATE_LIMIT_POLICY_ENV_PATH = "CONTRACTOR_RATE_LIMIT_POLICY_PATH"
 BUNDLE_BASE_URL_ENV = "CONTRACTOR_BUNDLE_BASE_URL"
+BUNDLE_CACHE_MAX_BYTES_ENV = "CONTRACTOR_BUNDLE_CACHE_MAX_BYTES"
+BUNDLE_CACHE_MAX_BUNDLES_ENV = "CONTRACTOR_BUNDLE_CACHE_MAX_BUNDLES"
+BUNDLE_PEERS_ENV = "CONTRACTOR_BUNDLE_PEERS"
+BUNDLE_PEER_ATTEMPTS_ENV = "CONTRACTOR_BUNDLE_PEER_ATTEMPTS"
+RUNTIME_SELF_URL_ENV = "CONTRACTOR_RUNTIME_SELF_URL"
+INTERNAL_TOKEN_ENV = "CONTRACTOR_INTERNAL_TOKEN"
+BUNDLE_DELTA_FORMAT = "contractor-bundle-delta/v1"
+DEFAULT_BUNDLE_PEER_ATTEMPTS = 2
+WARMUP_ENABLED_ENV = "CONTRACTOR_WARMUP_ENABLED"
+WARMUP_WORKERS_ENV = "CONTRACTOR_WARMUP_WORKERS"
+DEFAULT_WARMUP_WORKERS = 4
+WARMUP_RETRY_ENV = "CONTRACTOR_WARMUP_RETRY_SECONDS"
+DEFAULT_WARMUP_RETRY_SECONDS = 5.0
+BUNDLE_FETCH_WORKERS_ENV = "CONTRACTOR_BUNDLE_FETCH_WORKERS"
+BUNDLE_FETCH_TENANT_LIMIT_ENV = "CONTRACTOR_BUNDLE_FETCH_MAX_PER_TENANT"
+BUNDLE_FETCH_WAIT_ENV = "CONTRACTOR_BUNDLE_FETCH_WAIT_SECONDS"
+BUNDLE_DOWNLOAD_TIMEOUT_ENV = "CONTRACTOR_BUNDLE_DOWNLOAD_TIMEOUT_SECONDS"
+DEFAULT_BUNDLE_FETCH_WORKERS = 4
+DEFAULT_BUNDLE_FETCH_TENANT_LIMIT = 2
+DEFAULT_BUNDLE_FETCH_WAIT_SECONDS = 10.0
+DEFAULT_BUNDLE_DOWNLOAD_TIMEOUT_SECONDS = 30.0
+CONTROL_PLANE_BREAKER_WINDOW_ENV = "CONTRACTOR_CONTROL_PLANE_BREAKER_WINDOW"
+CONTROL_PLANE_BREAKER_MIN_CALLS_ENV = "CONTRACTOR_CONTROL_PLANE_BREAKER_MIN_CALLS"
+CONTROL_PLANE_BREAKER_ERROR_RATE_ENV = "CONTRACTOR_CONTROL_PLANE_BREAKER_ERROR_RATE"
+CONTROL_PLANE_BREAKER_SLOW_CALL_ENV = "CONTRACTOR_CONTROL_PLANE_BREAKER_SLOW_CALL_SECONDS"
+CONTROL_PLANE_BREAKER_OPEN_ENV = "CONTRACTOR_CONTROL_PLANE_BREAKER_OPEN_SECONDS"
+CONTROL_PLANE_STALE_ENV = "CONTRACTOR_CONTROL_PLANE_SERVE_STALE"
+DEFAULT_CONTROL_PLANE_BREAKER_WINDOW = 20
+DEFAULT_CONTROL_PLANE_BREAKER_MIN_CALLS = 10
+DEFAULT_CONTROL_PLANE_BREAKER_ERROR_RATE = 0.5
+DEFAULT_CONTROL_PLANE_BREAKER_SLOW_CALL_SECONDS = 1.0
+DEFAULT_CONTROL_PLANE_BREAKER_OPEN_SECONDS = 5.0
+LAST_KNOWN_GOOD_FILENAME = ".last_known_good.json"
+REQUEST_BUDGET_ENV = "CONTRACTOR_REQUEST_BUDGET_SECONDS"
+CONTROL_PLANE_HEDGE_DELAY_ENV = "CONTRACTOR_CONTROL_PLANE_HEDGE_DELAY_SECONDS"
+DEFAULT_CONTROL_PLANE_HEDGE_DELAY_SECONDS = 0.05
+CONTROL_PLANE_EXECUTOR_WORKERS_ENV = "CONTRACTOR_CONTROL_PLANE_EXECUTOR_WORKERS"
+DEFAULT_CONTROL_PLANE_EXECUTOR_WORKERS = 16
+CONTROL_PLANE_LATENCY_WINDOW = 100
+NEGATIVE_CACHE_TTL_ENV = "CONTRACTOR_NEGATIVE_CACHE_TTL_SECONDS"
+DEFAULT_NEGATIVE_CACHE_TTL_SECONDS = 5.0
+NEGATIVE_CACHE_JITTER = 0.2
+CONTROL_PLANE_HEDGE_MIN_SAMPLES = 5
+ADMISSION_INITIAL_LIMIT_ENV = "CONTRACTOR_ADMISSION_INITIAL_LIMIT"
+ADMISSION_MAX_LIMIT_ENV = "CONTRACTOR_ADMISSION_MAX_LIMIT"
+ADMISSION_MAX_QUEUE_ENV = "CONTRACTOR_ADMISSION_MAX_QUEUE"
+ADMISSION_QUEUE_TARGET_ENV = "CONTRACTOR_ADMISSION_QUEUE_TARGET_SECONDS"
+ADMISSION_LATENCY_TARGET_ENV = "CONTRACTOR_ADMISSION_LATENCY_TARGET_SECONDS"
+DEFAULT_ADMISSION_INITIAL_LIMIT = 16
+DEFAULT_ADMISSION_MAX_LIMIT = 24
+DEFAULT_ADMISSION_MAX_QUEUE = 8
+# /execute é síncrono: cada request admitida ou na fila ocupa uma thread do pool do anyio.
+# Slots + fila cabem no pool menos uma reserva para /healthz, /readyz e /internal.
+RUNTIME_THREADPOOL_SIZE_ENV = "CONTRACTOR_RUNTIME_THREADPOOL_SIZE"
+DEFAULT_RUNTIME_THREADPOOL_SIZE = 40
+RUNTIME_THREADPOOL_RESERVE = 8
+DEFAULT_ADMISSION_QUEUE_TARGET_SECONDS = 2.0
+DEFAULT_ADMISSION_LATENCY_TARGET_SECONDS = 2.0
+BUNDLE_SCRUB_INTERVAL_ENV = "CONTRACTOR_BUNDLE_SCRUB_INTERVAL_SECONDS"
+DEFAULT_BUNDLE_SCRUB_INTERVAL_SECONDS = 300.0
+BUNDLE_VERIFIED_DIRNAME = ".verified"
+BUNDLE_QUARANTINE_DIRNAME = ".quarantine"
+FAQ_INDEX_DIRNAME = ".faq_index"
+FAQ_INDEX_MAGIC = b"CFAQIDX1"
+FAQ_DISK_INDEX_MIN_BYTES_ENV = "CONTRACTOR_FAQ_DISK_INDEX_MIN_BYTES"
+DEFAULT_FAQ_DISK_INDEX_MIN_BYTES = 8 * 1024 * 1024
+FAQ_STREAM_CHUNK_CHARS = 1 << 20
+_FAQ_INDEX_HEADER = struct.Struct("<8sQQQ")
+_FAQ_SLOT = struct.Struct("<QQ")
+_FAQ_RECORD_HEADER = struct.Struct("<II")
+FAQ_ANSWER_COMPRESSION_ENV = "CONTRACTOR_FAQ_ANSWER_COMPRESSION"
+FAQ_ZDICT_MAX_BYTES = 32 * 1024
+OUTPUT_TEMPLATE_NAME = "faq_answer.j2"
+TEMPLATE_CACHE_DIRNAME = ".template_cache"
+RESPONSE_CACHE_MAX_ENTRIES_ENV = "CONTRACTOR_RESPONSE_CACHE_MAX_ENTRIES"
+DEFAULT_RESPONSE_CACHE_MAX_ENTRIES = 10_000
+# Opções do Environment que mudam o código gerado; entram na chave do bytecode.
+TEMPLATE_ENV_TAG = "autoescape=select;trim_blocks;lstrip_blocks"
+RESPONSE_SCHEMA_ANNOTATIONS = frozenset(
+    "$schema $id $comment $defs $anchor $vocabulary title description default examples "
+    "deprecated readOnly writeOnly format contentEncoding contentMediaType contentSchema".split()
+)
+_RESPONSE_SCHEMA_NUMERIC_ARRAY_KEYWORDS = (
+    "minimum maximum exclusiveMinimum exclusiveMaximum multipleOf items prefixItems contains "
+    "minContains maxContains minItems maxItems uniqueItems unevaluatedItems".split()
+)
+# Keywords de outros tipos não restringem um valor string (nem o objeto do payload).
+RESPONSE_SCHEMA_NON_STRING = frozenset(
+    _RESPONSE_SCHEMA_NUMERIC_ARRAY_KEYWORDS
+    + "properties required additionalProperties patternProperties minProperties "
+    "maxProperties propertyNames dependentRequired dependentSchemas "
+    "unevaluatedProperties".split()
+)
+# Composição e referências locais, analisadas nos dois níveis (objeto e valor).
+RESPONSE_SCHEMA_APPLICATORS = frozenset("$ref allOf anyOf oneOf not if then else".split())
+RESPONSE_SCHEMA_NON_OBJECT = frozenset(
+    _RESPONSE_SCHEMA_NUMERIC_ARRAY_KEYWORDS + ["minLength", "maxLength", "pattern"]
+)
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+QUESTION_MATCH_TYPES = ("exact", "normalized", "lexical")
+ROUTER_MATCH_TYPES = ("keyword", "regex")
+INTENT_MATCH_TYPES = QUESTION_MATCH_TYPES + ROUTER_MATCH_TYPES
+BM25_K1 = 1.2
+BM25_B = 0.75
+SUGGESTION_HASH_BUCKETS = 1 << 18
+SUGGESTION_NGRAM = 3
+# Colunas presentes em mais de max(piso, razão x N) documentos ficam fora da matriz (max_df):
+# trigramas de stopwords pesam pouco no tf-idf e dominariam o custo do produto escalar.
+SUGGESTION_MAX_DF_RATIO = 0.05
+SUGGESTION_MAX_DF_FLOOR = 64
+SUGGESTIONS_MAX_MS_ENV = "CONTRACTOR_SUGGESTIONS_MAX_MS"
+DEFAULT_SUGGESTIONS_MAX_MS = 5.0
 RATE_LIMIT_COUNTERS: dict[tuple[str, str, int], int] = {}
+# (expira em, chave) das janelas em RATE_LIMIT_COUNTERS, para GC sem varrer o map.
+RATE_LIMIT_EXPIRY: list[tuple[int, tuple[str, str, int]]] = []
+_RATE_LIMIT_LOCK = threading.Lock()
+# Requests em andamento por tenant (max_in_flight da política de rate limit).
+TENANT_IN_FLIGHT: dict[str, int] = {}
+_TENANT_IN_FLIGHT_LOCK = threading.Lock()
+BUNDLE_CACHE_COUNTERS: dict[str, int] = {"hit": 0, "miss": 0, "evict": 0}
+# Estado process-local do cache de bundles, indexado pelo path local do bundle.
+BUNDLE_CACHE_LAST_USED: dict[str, float] = {}
+BUNDLE_CACHE_SIZES: dict[str, int] = {}
+BUNDLE_LEASES: dict[str, int] = {}
+TENANT_CURRENT_BUNDLES: dict[str, str] = {}
+# Bundles já verificados (estrutura + digests por arquivo) -> tree digest; um hit no cache
+# consulta apenas este dict. O scrub em background re-verifica o disco periodicamente.
+VERIFIED_BUNDLES: dict[str, str] = {}
+BUNDLE_QUARANTINE_PENDING: set[str] = set()
+BUNDLE_SCRUB_COUNTERS: dict[str, int] = {"verified": 0, "quarantined": 0}
+ALIAS_BUNDLE_RESOLUTIONS: dict[tuple[str, str | None], tuple[Path, str]] = {}
+_BUNDLE_SCRUB_STOP = threading.Event()
+_WARMUP_STOP = threading.Event()
+# Fetch de bundles fora da thread da request: pool dedicado, single-flight por bundle
+# (path local) e bulkhead de fetches em andamento por tenant.
+BUNDLE_FETCHES: dict[str, Future[tuple[Path, str]]] = {}
+BUNDLE_FETCH_TENANT_IN_FLIGHT: dict[str, int] = {}
+BUNDLE_FETCH_METRICS: dict[str, float] = {
+    "queued": 0,
+    "running": 0,
+    "completed": 0,
+    "failed": 0,
+    "rejected": 0,
+    "timed_out": 0,
+    "latency_seconds_total": 0.0,
+    "latency_seconds_max": 0.0,
+}
+_BUNDLE_FETCH_LOCK = threading.RLock()
+_BUNDLE_FETCH_EXECUTOR: ThreadPoolExecutor | None = None
+# Circuit breaker por base URL do Control Plane e último mapeamento tenant -> bundle resolvido
+# com sucesso (last-known-good), indexado pelo arquivo de persistência e pela base URL.
+CONTROL_PLANE_BREAKERS: dict[str, CircuitBreaker] = {}
+LAST_KNOWN_GOOD: dict[str, dict[str, dict[str, dict[str, Any]]]] = {}
+_CONTROL_PLANE_LOCK = threading.Lock()
+# Latências recentes por réplica do Control Plane (falhas e hedges perdidos como amostras
+# censuradas) para escolher a primária e derivar o atraso do hedge (p95).
+CONTROL_PLANE_REPLICA_LATENCIES: dict[str, deque[float]] = {}
+CONTROL_PLANE_HEDGE_COUNTERS: dict[str, int] = {
+    "hedged": 0,
+    "hedge_won": 0,
+    "failover": 0,
+    "cancelled": 0,
+}
+# Cache negativo de falhas determinísticas: (tipo, escopo, chave) -> (expira em, erro, status).
+# Escopo = identidade da configuração (base URL do Control Plane, alias config ou bundle root).
+NEGATIVE_CACHE: dict[tuple[str, str, str], tuple[float, str, int]] = {}
+NEGATIVE_CACHE_COUNTERS: dict[str, int] = {"hit": 0, "store": 0, "invalidate": 0}
+# Sugestões "did you mean" calculadas em no_match; capped = abandonadas pelo limite de latência.
+SUGGESTION_COUNTERS: dict[str, int] = {"computed": 0, "capped": 0}
+RESPONSE_CACHE_COUNTERS: dict[str, int] = {"hit": 0, "miss": 0}
+_RESPONSE_CACHE_LOCK = threading.Lock()
+_SUGGESTION_LOCK = threading.Lock()
+_NEGATIVE_CACHE_LOCK = threading.Lock()
+# Coalescing de trabalho idêntico em andamento (resolução por tenant, compilação por bundle
+# e resultado por bundle + hash da pergunta).
+RESOLVE_FLIGHTS = SingleFlight()
+COMPILE_FLIGHTS = SingleFlight()
+EXECUTE_FLIGHTS = SingleFlight()
+# Admission control do /execute, indexado pela configuração (limites e alvos).
+ADMISSION_CONTROLLERS: dict[tuple[int, int, int, float, float], AdmissionController] = {}
+_ADMISSION_LOCK = threading.Lock()
+# Executores das chamadas com hedge ao Control Plane, indexados pelo número de workers.
+CONTROL_PLANE_EXECUTORS: dict[int, ThreadPoolExecutor] = {}
+_BUNDLE_CACHE_LOCK = threading.RLock()
+# Bundles compilados (ontologia, dados, schema e template) por (bundle_id, path).
+COMPILED_BUNDLES: dict[tuple[str, str], CompiledBundle] = {}
+_COMPILE_LOCK = threading.Lock()
+RUNTIME_READINESS: dict[str, Any] = {"status": "starting", "tenants": {}}
+_READINESS_LOCK = threading.Lock()
+# Pré-aquecimento de candidates (notificado pelo Control Plane antes do promote).
+BUNDLE_WARMUP_STATUS: dict[str, str] = {}
+TENANT_CANDIDATE_BUNDLES: dict[str, str] = {}
+_BUNDLE_WARMUP_EXECUTOR = ThreadPoolExecutor(
+    max_workers=DEFAULT_WARMUP_WORKERS, thread_name_prefix="contractor-prewarm"
+)
 EXPECTED_BUNDLE_DIRS = (
     "data",
     "entities",
@@ -106,7 +812,7 @@ def load_rate_limit_policy() -> dict[str, Any]:
         raise RuntimeConfigError("Rate limit policy invalid") from exc
 
 
-def _validate_policy_bucket(bucket: Any) -> dict[str, int]:
+def _validate_policy_bucket(bucket: Any, *, allow_borrow: bool = False) -> dict[str, int]:
     if not isinstance(bucket, dict):
         raise RuntimeConfigError("Rate limit policy invalid")
     window_seconds = bucket.get("window_seconds")
@@ -115,10 +821,47 @@ def _validate_policy_bucket(bucket: Any) -> dict[str, int]:
         raise RuntimeConfigError("Rate limit policy invalid")
     if not isinstance(max_requests, int) or max_requests <= 0:
         raise RuntimeConfigError("Rate limit policy invalid")
-    return {
+    normalized = {
         "window_seconds": window_seconds,
         "max_requests": max_requests,
     }
+    if not allow_borrow:
+        if "borrow_max_requests" in bucket:
+            raise RuntimeConfigError("Rate limit policy invalid")
+        return normalized
+    borrow_max_requests = bucket.get("borrow_max_requests", max_requests)
+    if not isinstance(borrow_max_requests, int) or borrow_max_requests < max_requests:
+        raise RuntimeConfigError("Rate limit policy invalid")
+    normalized["borrow_max_requests"] = borrow_max_requests
+    return normalized
+
+
+def _validate_global_policy(global_policy: Any) -> dict[str, int] | None:
+    # Bucket do nó acima dos buckets por tenant; ausente = sem limite global.
+    if global_policy is None:
+        return None
+    if not isinstance(global_policy, dict):
+        raise RuntimeConfigError("Rate limit policy invalid")
+    return _validate_policy_bucket(global_policy.get("rate_limit"))
+
+
+def _validate_policy_weight(weight: Any) -> int:
+    # Peso do tenant no fair queuing do admission control.
+    if isinstance(weight, bool) or not isinstance(weight, int) or weight <= 0:
+        raise RuntimeConfigError("Rate limit policy invalid")
+    return weight
+
+
+def _validate_policy_max_in_flight(max_in_flight: Any) -> int | None:
+    if max_in_flight is None:
+        return None
+    if (
+        isinstance(max_in_flight, bool)
+        or not isinstance(max_in_flight, int)
+        or max_in_flight <= 0
+    ):
+        raise RuntimeConfigError("Rate limit policy invalid")
+    return max_in_flight
 
 
 def validate_rate_limit_policy(policy: Any) -> dict[str, Any]:
@@ -128,10 +871,12 @@ def validate_rate_limit_policy(policy: Any) -> dict[str, Any]:
     tenants = policy.get("tenants")
     if not isinstance(tenants, dict) or not tenants:
         raise RuntimeConfigError("Rate limit policy invalid")
-    if "*" not in tenants:
+    if not isinstance(tenants.get("*"), dict):
         raise RuntimeConfigError("Rate limit policy invalid")
+    # max_in_flight: tenant -> "*" -> global; ausente = sem limite de concorrência.
+    default_max_in_flight = tenants["*"].get("max_in_flight", policy.get("max_in_flight"))
 
-    normalized_tenants: dict[str, dict[str, dict[str, int]]] = {}
+    normalized_tenants: dict[str, dict[str, Any]] = {}
     for tenant_id, tenant_policy in tenants.items():
         if not isinstance(tenant_id, str) or not tenant_id.strip():
             raise RuntimeConfigError("Rate limit policy invalid")
@@ -139,89 +884,169 @@ def validate_rate_limit_policy(policy: Any) -> dict[str, Any]:
             raise RuntimeConfigError("Rate limit policy invalid")
         normalized_tenants[tenant_id] = {
             "rate_limit": _validate_policy_bucket(
-                tenant_policy.get("rate_limit", policy.get("rate_limit"))
+                tenant_policy.get("rate_limit", policy.get("rate_limit")),
+                allow_borrow=True,
             ),
             "quota": _validate_policy_bucket(
                 tenant_policy.get("quota", policy.get("quota"))
             ),
+            "weight": _validate_policy_weight(
+                tenant_policy.get("weight", policy.get("weight", 1))
+            ),
+            "max_in_flight": _validate_policy_max_in_flight(
+                tenant_policy.get("max_in_flight", default_max_in_flight)
+            ),
         }
 
     return {
-        "rate_limit": _validate_policy_bucket(policy.get("rate_limit")),
+        "rate_limit": _validate_policy_bucket(policy.get("rate_limit"), allow_borrow=True),
         "quota": _validate_policy_bucket(policy.get("quota")),
+        "global_rate_limit": _validate_global_policy(policy.get("global")),
         "tenants": normalized_tenants,
     }
 
 
-def _increment_window_counter(
-    tenant_id: str, bucket_name: str, config: dict[str, int], now: int
-) -> dict[str, int | bool]:
+def _window_key(
+    scope: str, bucket_name: str, config: dict[str, int], now: int
+) -> tuple[tuple[str, str, int], int]:
     window_seconds = config["window_seconds"]
-    max_requests = config["max_requests"]
     window_start = now - (now % window_seconds)
-    window_reset = window_start + window_seconds
-    key = (tenant_id, bucket_name, window_start)
-
-    # v1: GC determinístico para evitar crescimento infinito do map (process-local).
-    # Mantém apenas janelas recentes: 2x a maior window_seconds do bucket atual.
-    # (Sem Redis, sem heurística; limite explícito e estável.)
-    gc_before = now - (window_seconds * 2)
-    if RATE_LIMIT_COUNTERS:
-        to_delete: list[tuple[str, str, int]] = []
-        for k_tenant, k_bucket, k_window_start in RATE_LIMIT_COUNTERS.keys():
-            if k_bucket == bucket_name and k_window_start < gc_before:
-                to_delete.append((k_tenant, k_bucket, k_window_start))
-        for k in to_delete:
-            RATE_LIMIT_COUNTERS.pop(k, None)
+    return (scope, bucket_name, window_start), window_start + window_seconds
+
+
+def _gc_rate_limit_counters(now: int) -> None:
+    # v2: GC amortizado por heap de expiração, sem varrer o map a cada request. Mesmo critério
+    # da v1: uma janela expira 2x window_seconds após o início (process-local, sem Redis).
+    while RATE_LIMIT_EXPIRY and RATE_LIMIT_EXPIRY[0][0] < now:
+        _, key = heapq.heappop(RATE_LIMIT_EXPIRY)
+        RATE_LIMIT_COUNTERS.pop(key, None)
 
+
+def _count_window_request(key: tuple[str, str, int], config: dict[str, int]) -> int:
+    # Chamador segura _RATE_LIMIT_LOCK.
     count = RATE_LIMIT_COUNTERS.get(key, 0) + 1
+    if count == 1:
+        heapq.heappush(RATE_LIMIT_EXPIRY, (key[2] + config["window_seconds"] * 2, key))
     RATE_LIMIT_COUNTERS[key] = count
-    return {
-        "max_requests": max_requests,
-        "remaining": max(max_requests - count, 0),
-        "reset": window_reset,
-        "retry_after": max(window_reset - now, 1),
-        "exceeded": count > max_requests,
-    }
+    return count
 
 
-def enforce_rate_limit_and_quota(tenant_id: str) -> dict[str, str]:
+def _rate_limit_rejection(
+    status_code: int, detail: str, headers: dict[str, str], reset: int, now: int
+) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail=detail,
+        headers={**headers, "Retry-After": str(max(reset - now, 1))},
+    )
+
+
+def resolve_tenant_policy(tenant_id: str) -> dict[str, Any]:
     policy = validate_rate_limit_policy(load_rate_limit_policy())
     tenant_policy = policy["tenants"].get(tenant_id, policy["tenants"]["*"])
+    return {**tenant_policy, "global_rate_limit": policy["global_rate_limit"]}
+
+
+def enforce_rate_limit_and_quota(
+    tenant_id: str, tenant_policy: dict[str, Any] | None = None
+) -> dict[str, str]:
+    if tenant_policy is None:
+        tenant_policy = resolve_tenant_policy(tenant_id)
     now = int(time.time())
+    rate_config = tenant_policy["rate_limit"]
+    quota_config = tenant_policy["quota"]
+    global_config = tenant_policy.get("global_rate_limit")
+    rate_key, rate_reset = _window_key(tenant_id, "rate_limit", rate_config, now)
+    quota_key, quota_reset = _window_key(tenant_id, "quota", quota_config, now)
+
+    # Decisão única sobre tenant e nó, sob o mesmo lock. Mesmo critério da v1 (ADR 0013): cada
+    # nível avaliado conta a request, inclusive a negada, e a avaliação para no primeiro que nega.
+    with _RATE_LIMIT_LOCK:
+        _gc_rate_limit_counters(now)
+        rate_count = _count_window_request(rate_key, rate_config)
+        # Acima do próprio limite, o tenant só pega emprestada capacidade livre do bucket
+        # global, até borrow_max_requests.
+        borrowed = rate_count > rate_config["max_requests"]
+        rate_exceeded = borrowed and (
+            global_config is None or rate_count > rate_config["borrow_max_requests"]
+        )
+        quota_exceeded = global_exceeded = False
+        if not rate_exceeded:
+            quota_exceeded = (
+                _count_window_request(quota_key, quota_config) > quota_config["max_requests"]
+            )
+        if not (rate_exceeded or quota_exceeded) and global_config is not None:
+            global_key, global_reset = _window_key("", "global", global_config, now)
+            global_count = _count_window_request(global_key, global_config)
+            global_exceeded = global_count > global_config["max_requests"]
 
-    rate_limit_decision = _increment_window_counter(
-        tenant_id, "rate_limit", tenant_policy["rate_limit"], now
-    )
     rate_limit_headers = {
-        "X-RateLimit-Limit": str(rate_limit_decision["max_requests"]),
-        "X-RateLimit-Remaining": str(rate_limit_decision["remaining"]),
-        "X-RateLimit-Reset": str(rate_limit_decision["reset"]),
+        "X-RateLimit-Limit": str(rate_config["max_requests"]),
+        "X-RateLimit-Remaining": str(max(rate_config["max_requests"] - rate_count, 0)),
+        "X-RateLimit-Reset": str(rate_reset),
     }
-    if rate_limit_decision["exceeded"]:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Rate limit exceeded",
-            headers={
-                **rate_limit_headers,
-                "Retry-After": str(rate_limit_decision["retry_after"]),
-            },
+    if rate_exceeded:
+        raise _rate_limit_rejection(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            "Rate limit exceeded",
+            rate_limit_headers,
+            rate_reset,
+            now,
+        )
+    if quota_exceeded:
+        raise _rate_limit_rejection(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            "Quota exceeded",
+            rate_limit_headers,
+            quota_reset,
+            now,
         )
+    if global_exceeded:
+        # Capacidade do nó esgotada: 503 para o cliente tentar outra instância.
+        raise _rate_limit_rejection(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            "Global rate limit exceeded",
+            rate_limit_headers,
+            global_reset,
+            now,
+        )
+    if borrowed:
+        rate_limit_headers["X-RateLimit-Borrowed"] = "true"
+    return rate_limit_headers
 
-    quota_decision = _increment_window_counter(
-        tenant_id, "quota", tenant_policy["quota"], now
-    )
-    if quota_decision["exceeded"]:
+
+def acquire_tenant_in_flight(
+    tenant_id: str, tenant_policy: dict[str, Any], rate_limit_headers: dict[str, str]
+) -> dict[str, str]:
+    max_in_flight = tenant_policy["max_in_flight"]
+    if max_in_flight is None:
+        return {}
+    with _TENANT_IN_FLIGHT_LOCK:
+        in_flight = TENANT_IN_FLIGHT.get(tenant_id, 0)
+        exceeded = in_flight >= max_in_flight
+        if not exceeded:
+            in_flight += 1
+            TENANT_IN_FLIGHT[tenant_id] = in_flight
+    in_flight_headers = {
+        "X-RateLimit-InFlight": str(in_flight),
+        "X-RateLimit-InFlight-Limit": str(max_in_flight),
+    }
+    if exceeded:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Quota exceeded",
-            headers={
-                **rate_limit_headers,
-                "Retry-After": str(quota_decision["retry_after"]),
-            },
+            detail="Concurrency limit exceeded",
+            headers={**rate_limit_headers, **in_flight_headers, "Retry-After": "1"},
         )
+    return in_flight_headers
 
-    return rate_limit_headers
+
+def release_tenant_in_flight(tenant_id: str) -> None:
+    with _TENANT_IN_FLIGHT_LOCK:
+        in_flight = TENANT_IN_FLIGHT.get(tenant_id, 0) - 1
+        if in_flight > 0:
+            TENANT_IN_FLIGHT[tenant_id] = in_flight
+        else:
+            TENANT_IN_FLIGHT.pop(tenant_id, None)
 
 
 def _validate_tenant_keys(config: Any) -> dict[str, str]:
@@ -264,33 +1089,483 @@ def load_alias_config() -> dict[str, Any]:
 
 
 def resolve_current_bundle(
-    tenant_id: str, request_id: str | None = None
-) -> tuple[Path, str, int | None, str | None]:
+    tenant_id: str,
+    request_id: str | None = None,
+    *,
+    deadline: Deadline | None = None,
+) -> tuple[Path, str, int | None, str | None, bool]:
+    # O último item indica last-known-good servido com o Control Plane indisponível (ADR 0027).
     base_url = os.getenv("CONTRACTOR_CONTROL_PLANE_BASE_URL")
     if base_url:
-        bundle_id, min_version, expected_digest, control_plane_status = (
-            resolve_bundle_via_control_plane(tenant_id, base_url, request_id=request_id)
-        )
+        control_plane_status: int | None
+        served_stale = False
+        _raise_if_negatively_cached("resolution", base_url, tenant_id)
+        try:
+            (
+                bundle_id,
+                min_version,
+                expected_digest,
+                expected_tree_digest,
+                control_plane_status,
+            ) = _resolve_via_control_planes_coalesced(
+                tenant_id, base_url, request_id, deadline
+            )
+        except ControlPlaneUnavailableError:
+            last_known_good = (
+                _load_last_known_good(base_url).get(tenant_id)
+                if _resolve_serve_stale()
+                else None
+            )
+            if last_known_good is None:
+                raise
+            bundle_id = last_known_good["bundle_id"]
+            min_version = last_known_good["min_version"]
+            expected_digest = last_known_good.get("bundle_sha256")
+            expected_tree_digest = last_known_good.get("bundle_tree_sha256")
+            control_plane_status = None
+            served_stale = True
+        except RuntimeConfigError as exc:
+            _remember_negative("resolution", base_url, tenant_id, exc)
+            raise
         ensure_runtime_compatibility(min_version)
-        bundle_path, cache_status = ensure_local_bundle(
-            bundle_id, expected_digest=expected_digest
+        with _BUNDLE_CACHE_LOCK:
+            previous_bundle_id = TENANT_CURRENT_BUNDLES.get(tenant_id)
+            TENANT_CURRENT_BUNDLES[tenant_id] = bundle_id
+        bundle_scope = str(_bundle_root())
+        _raise_if_negatively_cached("bundle", bundle_scope, bundle_id)
+        try:
+            bundle_path, cache_status = fetch_bundle(
+                tenant_id,
+                bundle_id,
+                expected_digest=expected_digest,
+                expected_tree_digest=expected_tree_digest,
+                base_bundle_id=previous_bundle_id,
+                deadline=deadline,
+            )
+        except RuntimeConfigError as exc:
+            _remember_negative("bundle", bundle_scope, bundle_id, exc)
+            raise
+        if not served_stale:
+            # Só vira last-known-good o que foi resolvido, é compatível e está local.
+            _remember_last_known_good(
+                base_url,
+                tenant_id,
+                {
+                    "bundle_id": bundle_id,
+                    "min_version": min_version,
+                    "bundle_sha256": expected_digest,
+                    "bundle_tree_sha256": expected_tree_digest,
+                },
+            )
+        return bundle_path, bundle_id, control_plane_status, cache_status, served_stale
+
+    alias_scope = "|".join(
+        [
+            os.getenv("CONTRACTOR_ALIAS_CONFIG_PATH") or str(DEFAULT_ALIAS_PATH),
+            os.getenv("CONTRACTOR_DEMO_BUNDLE_PATH", ""),
+            os.getenv("CONTRACTOR_DEMO_BUNDLE_ID", ""),
+        ]
+    )
+    _raise_if_negatively_cached("resolution", alias_scope, tenant_id)
+    try:
+        config = load_alias_config()
+        tenants = config.get("tenants", config)
+        tenant_entry = tenants.get(tenant_id) or tenants.get("*")
+        if not tenant_entry:
+            raise RuntimeConfigError("Tenant alias not configured")
+        bundle_path, bundle_id = resolve_bundle_from_alias_entry(tenant_entry)
+    except RuntimeConfigError as exc:
+        _remember_negative("resolution", alias_scope, tenant_id, exc)
+        raise
+    return bundle_path, bundle_id, None, None, False
+
+
+def _resolve_via_control_planes_coalesced(
+    tenant_id: str, base_urls: str, request_id: str | None, deadline: Deadline | None
+) -> tuple[str, str, str | None, str | None, int]:
+    # Requests concorrentes do mesmo tenant compartilham uma resolução no Control Plane
+    # (feita com o request_id e o deadline da primeira).
+    def _resolve() -> tuple[str, str, str | None, str | None, int]:
+        return resolve_bundle_via_control_planes(
+            tenant_id, base_urls, request_id=request_id, deadline=deadline
+        )
+
+    try:
+        resolution, _ = RESOLVE_FLIGHTS.do(
+            (base_urls, tenant_id),
+            _resolve,
+            timeout=None if deadline is None else deadline.bound(float("inf")),
+        )
+    except FutureTimeoutError as exc:
+        raise DeadlineExceededError() from exc
+    except DeadlineExceededError:
+        # Deadline da request que liderou; esta request ainda tem orçamento.
+        if deadline is not None:
+            deadline.check()
+        return _resolve()
+    return resolution
+
+
+def _negative_cache_ttl() -> float:
+    env_value = os.getenv(NEGATIVE_CACHE_TTL_ENV)
+    if not env_value:
+        return DEFAULT_NEGATIVE_CACHE_TTL_SECONDS
+    try:
+        ttl = float(env_value)
+    except ValueError as exc:
+        raise RuntimeConfigError("Negative cache config invalid") from exc
+    if ttl < 0:
+        raise RuntimeConfigError("Negative cache config invalid")
+    return ttl
+
+
+def _raise_if_negatively_cached(kind: str, scope: str, key: str) -> None:
+    with _NEGATIVE_CACHE_LOCK:
+        entry = NEGATIVE_CACHE.get((kind, scope, key))
+        if entry is None:
+            return
+        expires_at, message, status_code = entry
+        if time.monotonic() >= expires_at:
+            NEGATIVE_CACHE.pop((kind, scope, key), None)
+            return
+        NEGATIVE_CACHE_COUNTERS["hit"] += 1
+    raise RuntimeConfigError(message, status_code=status_code)
+
+
+def _remember_negative(kind: str, scope: str, key: str, exc: RuntimeConfigError) -> None:
+    # Só falhas que se repetiriam idênticas; indisponibilidade, deadline, falta de
+    # capacidade do pool e falhas de rede no download são transitórias.
+    if isinstance(
+        exc,
+        (
+            ControlPlaneUnavailableError,
+            DeadlineExceededError,
+            BundleFetchUnavailableError,
+            BundleDownloadError,
+        ),
+    ):
+        return
+    ttl = _negative_cache_ttl()
+    if ttl <= 0:
+        return
+    # Jitter na expiração: clientes em loop não voltam todos no mesmo instante.
+    expires_at = time.monotonic() + ttl * random.uniform(
+        1 - NEGATIVE_CACHE_JITTER, 1 + NEGATIVE_CACHE_JITTER
+    )
+    with _NEGATIVE_CACHE_LOCK:
+        NEGATIVE_CACHE[(kind, scope, key)] = (expires_at, str(exc), exc.status_code)
+        NEGATIVE_CACHE_COUNTERS["store"] += 1
+
+
+def invalidate_negative_cache(tenant_id: str, bundle_id: str | None = None) -> int:
+    with _NEGATIVE_CACHE_LOCK:
+        stale_keys = [
+            cache_key
+            for cache_key in NEGATIVE_CACHE
+            if (cache_key[0] == "resolution" and cache_key[2] == tenant_id)
+            or (bundle_id is not None and cache_key[0] == "bundle" and cache_key[2] == bundle_id)
+        ]
+        for cache_key in stale_keys:
+            NEGATIVE_CACHE.pop(cache_key, None)
+        NEGATIVE_CACHE_COUNTERS["invalidate"] += len(stale_keys)
+    return len(stale_keys)
+
+
+def resolve_bundle_via_control_planes(
+    tenant_id: str,
+    base_urls: str,
+    request_id: str | None = None,
+    *,
+    deadline: Deadline | None = None,
+) -> tuple[str, str, str | None, str | None, int]:
+    # CONTRACTOR_CONTROL_PLANE_BASE_URL aceita réplicas separadas por vírgula: a resolução vai
+    # para a réplica mais rápida (p95) e, sem resposta dentro do p95 dela, um hedge vai para
+    # a próxima. Vale a primeira resposta válida; indisponibilidade faz failover imediato.
+    replicas = _rank_control_plane_replicas(
+        [url.strip() for url in base_urls.split(",") if url.strip()]
+    )
+    if not replicas:
+        raise RuntimeConfigError("Control Plane base URL invalid")
+    if len(replicas) == 1:
+        return _timed_control_plane_resolution(
+            tenant_id, replicas[0], request_id, deadline
+        )
+
+    hedge_delay = _control_plane_hedge_delay(replicas[0])
+    executor = _control_plane_executor()
+    calls: dict[Future[tuple[str, str, str | None, str | None, int]], ControlPlaneCall] = {}
+
+    def _launch(base_url: str) -> Future[tuple[str, str, str | None, str | None, int]]:
+        call = ControlPlaneCall()
+        future = executor.submit(
+            _timed_control_plane_resolution, tenant_id, base_url, request_id, deadline, call
+        )
+        calls[future] = call
+        return future
+
+    remaining = replicas[1:]
+    primary = _launch(replicas[0])
+    pending = {primary}
+    extra_launched = False
+    last_error: ControlPlaneUnavailableError | None = None
+    try:
+        while pending:
+            timeout = None if extra_launched or not remaining else hedge_delay
+            if deadline is not None:
+                timeout = deadline.bound(float("inf") if timeout is None else timeout)
+            done, pending = futures_wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if deadline is not None:
+                    deadline.check()
+                if extra_launched or not remaining:
+                    raise DeadlineExceededError()
+                extra_launched = True
+                with _CONTROL_PLANE_LOCK:
+                    CONTROL_PLANE_HEDGE_COUNTERS["hedged"] += 1
+                pending.add(_launch(remaining.pop(0)))
+                continue
+            for future in done:
+                try:
+                    resolution = future.result()
+                except ControlPlaneUnavailableError as exc:
+                    last_error = exc
+                    if remaining and not pending:
+                        extra_launched = True
+                        with _CONTROL_PLANE_LOCK:
+                            CONTROL_PLANE_HEDGE_COUNTERS["failover"] += 1
+                        pending.add(_launch(remaining.pop(0)))
+                    continue
+                if future is not primary:
+                    with _CONTROL_PLANE_LOCK:
+                        CONTROL_PLANE_HEDGE_COUNTERS["hedge_won"] += 1
+                return resolution
+    finally:
+        # Resolução encerrada (resposta válida, erro autoritativo ou deadline): as chamadas
+        # perdedoras são abortadas em vez de ocupar o executor e a réplica lenta.
+        for future in pending:
+            future.cancel()
+            calls[future].cancel()
+        if pending:
+            with _CONTROL_PLANE_LOCK:
+                CONTROL_PLANE_HEDGE_COUNTERS["cancelled"] += len(pending)
+    if last_error is None:
+        raise RuntimeConfigError("Control Plane unreachable")
+    raise last_error
+
+
+def _control_plane_executor() -> ThreadPoolExecutor:
+    workers = (
+        _resolve_optional_positive_int_env(
+            CONTROL_PLANE_EXECUTOR_WORKERS_ENV, "Control Plane hedge config invalid"
+        )
+        or DEFAULT_CONTROL_PLANE_EXECUTOR_WORKERS
+    )
+    with _CONTROL_PLANE_LOCK:
+        executor = CONTROL_PLANE_EXECUTORS.get(workers)
+        if executor is None:
+            executor = CONTROL_PLANE_EXECUTORS[workers] = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="contractor-cp-resolve"
+            )
+    return executor
+
+
+class ControlPlaneCall:
+    # Chamada com hedge ao Control Plane que pode ser abortada quando outra vence: cancel()
+    # derruba o socket em uso, ou o da conexão que ainda vai abrir.
+    def __init__(self) -> None:
+        self.cancelled = False
+        self._sock: socket.socket | None = None
+        self._lock = threading.Lock()
+
+    def attach(self, sock: socket.socket) -> None:
+        with self._lock:
+            self._sock = sock
+            cancelled = self.cancelled
+        if cancelled:
+            self._abort(sock)
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            sock = self._sock
+        if sock is not None:
+            self._abort(sock)
+
+    @staticmethod
+    def _abort(sock: socket.socket) -> None:
+        # shutdown (e não close) acorda a thread bloqueada no recv; o close fica com o urllib.
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class _ControlPlaneHTTPConnection(http_client.HTTPConnection):
+    def __init__(self, *args: Any, call: ControlPlaneCall, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._call = call
+
+    def connect(self) -> None:
+        super().connect()
+        self._call.attach(self.sock)
+
+
+class _ControlPlaneHTTPSConnection(http_client.HTTPSConnection):
+    def __init__(self, *args: Any, call: ControlPlaneCall, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._call = call
+
+    def connect(self) -> None:
+        super().connect()
+        self._call.attach(self.sock)
+
+
+class _ControlPlaneHTTPHandler(urllib_request.HTTPHandler):
+    def __init__(self, call: ControlPlaneCall) -> None:
+        super().__init__()
+        self._call = call
+
+    def http_open(self, req: urllib_request.Request) -> http_client.HTTPResponse:
+        return self.do_open(_ControlPlaneHTTPConnection, req, call=self._call)
+
+
+class _ControlPlaneHTTPSHandler(urllib_request.HTTPSHandler):
+    def __init__(self, call: ControlPlaneCall) -> None:
+        super().__init__()
+        self._call = call
+
+    def https_open(self, req: urllib_request.Request) -> http_client.HTTPResponse:
+        return self.do_open(_ControlPlaneHTTPSConnection, req, call=self._call)
+
+
+def _open_control_plane_url(
+    http_request: urllib_request.Request, timeout: float, call: ControlPlaneCall | None
+) -> http_client.HTTPResponse:
+    if call is None:
+        return urllib_request.urlopen(http_request, timeout=timeout)
+    opener = urllib_request.build_opener(
+        _ControlPlaneHTTPHandler(call), _ControlPlaneHTTPSHandler(call)
+    )
+    return opener.open(http_request, timeout=timeout)
+
+
+def _raise_if_cancelled(call: ControlPlaneCall | None, exc: Exception) -> None:
+    # Erro provocado pelo próprio cancelamento do hedge, não pela réplica.
+    if call is not None and call.cancelled:
+        raise ControlPlaneCallCancelledError() from exc
+
+
+def _timed_control_plane_resolution(
+    tenant_id: str,
+    base_url: str,
+    request_id: str | None,
+    deadline: Deadline | None,
+    call: ControlPlaneCall | None = None,
+) -> tuple[str, str, str | None, str | None, int]:
+    if call is not None and call.cancelled:
+        raise ControlPlaneCallCancelledError()
+    # Toda chamada feita vira amostra. Falha, timeout ou hedge perdedor entram como amostra
+    # censurada (o tempo até desistir é um piso da latência): uma réplica que sempre perde o
+    # hedge acumula histórico e deixa de ser a primária.
+    started_at: float | None = time.monotonic()
+    try:
+        return resolve_bundle_via_control_plane(
+            tenant_id, base_url, request_id=request_id, deadline=deadline, call=call
         )
-        return bundle_path, bundle_id, control_plane_status, cache_status
+    except ControlPlaneCircuitOpenError:
+        # Curto-circuito local: não houve chamada para medir.
+        started_at = None
+        raise
+    finally:
+        if started_at is not None:
+            latency = time.monotonic() - started_at
+            with _CONTROL_PLANE_LOCK:
+                samples = CONTROL_PLANE_REPLICA_LATENCIES.get(base_url)
+                if samples is None:
+                    samples = CONTROL_PLANE_REPLICA_LATENCIES[base_url] = deque(
+                        maxlen=CONTROL_PLANE_LATENCY_WINDOW
+                    )
+                samples.append(latency)
+
+
+def _control_plane_p95(base_url: str) -> float | None:
+    with _CONTROL_PLANE_LOCK:
+        samples = sorted(CONTROL_PLANE_REPLICA_LATENCIES.get(base_url, ()))
+    if len(samples) < CONTROL_PLANE_HEDGE_MIN_SAMPLES:
+        return None
+    return samples[max(0, -(-len(samples) * 95 // 100) - 1)]
+
+
+def _rank_control_plane_replicas(replicas: list[str]) -> list[str]:
+    # Circuito aberto vai para o fim; réplicas sem amostras suficientes vêm primeiro
+    # (p95 desconhecido = 0) para que todas acumulem histórico.
+    def _rank(item: tuple[int, str]) -> tuple[int, float, int]:
+        index, replica = item
+        with _CONTROL_PLANE_LOCK:
+            breaker = CONTROL_PLANE_BREAKERS.get(replica)
+        is_open = breaker is not None and breaker.state == "open"
+        return (int(is_open), _control_plane_p95(replica) or 0.0, index)
+
+    return [replica for _, replica in sorted(enumerate(replicas), key=_rank)]
 
-    config = load_alias_config()
-    tenants = config.get("tenants", config)
-    tenant_entry = tenants.get(tenant_id) or tenants.get("*")
-    if not tenant_entry:
-        raise RuntimeConfigError("Tenant alias not configured")
-    bundle_path, bundle_id = resolve_bundle_from_alias_entry(tenant_entry)
-    return bundle_path, bundle_id, None, None
+
+def _control_plane_hedge_delay(base_url: str) -> float:
+    p95 = _control_plane_p95(base_url)
+    if p95 is not None:
+        return p95
+    return _resolve_positive_float_env(
+        CONTROL_PLANE_HEDGE_DELAY_ENV,
+        DEFAULT_CONTROL_PLANE_HEDGE_DELAY_SECONDS,
+        "Control Plane hedge config invalid",
+    )
 
 
 def resolve_bundle_via_control_plane(
-    tenant_id: str, base_url: str, request_id: str | None = None
-) -> tuple[str, str, str | None, int]:
+    tenant_id: str,
+    base_url: str,
+    request_id: str | None = None,
+    *,
+    deadline: Deadline | None = None,
+    call: ControlPlaneCall | None = None,
+) -> tuple[str, str, str | None, str | None, int]:
+    if deadline is not None:
+        deadline.check()
+    if call is not None and call.cancelled:
+        raise ControlPlaneCallCancelledError()
+    breaker = _control_plane_breaker(base_url)
+    if not breaker.allow():
+        raise ControlPlaneCircuitOpenError(
+            "Control Plane circuit open",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    started_at = time.monotonic()
+    try:
+        resolution = _request_control_plane_resolution(
+            tenant_id, base_url, request_id, deadline, call
+        )
+    except (DeadlineExceededError, ControlPlaneCallCancelledError):
+        breaker.abandon()
+        raise
+    except ControlPlaneUnavailableError:
+        breaker.record(success=False, latency_seconds=time.monotonic() - started_at)
+        raise
+    except RuntimeConfigError:
+        # Respostas 4xx/inválidas: o Control Plane respondeu; não é indisponibilidade.
+        breaker.record(success=True, latency_seconds=time.monotonic() - started_at)
+        raise
+    breaker.record(success=True, latency_seconds=time.monotonic() - started_at)
+    return resolution
+
+
+def _request_control_plane_resolution(
+    tenant_id: str,
+    base_url: str,
+    request_id: str | None,
+    deadline: Deadline | None,
+    call: ControlPlaneCall | None = None,
+) -> tuple[str, str, str | None, str | None, int]:
     url = f"{base_url.rstrip('/')}/tenants/{tenant_id}/resolve/current"
-    timeout_seconds = _resolve_control_plane_timeout()
+    timeout_seconds = _bounded_timeout(_resolve_control_plane_timeout(), deadline)
     headers = {"X-Tenant-Id": tenant_id}
     token = os.getenv("CONTRACTOR_CONTROL_PLANE_TOKEN")
     if token:
@@ -299,23 +1574,28 @@ def resolve_bundle_via_control_plane(
         headers["X-Request-Id"] = request_id
 
     try:
-        with urllib_request.urlopen(
-            urllib_request.Request(url, method="GET", headers=headers),
-            timeout=timeout_seconds,
+        with _open_control_plane_url(
+            urllib_request.Request(url, method="GET", headers=headers), timeout_seconds, call
         ) as response:
             status_code = response.status
             payload = json.loads(response.read().decode("utf-8"))
     except urllib_error.HTTPError as exc:
-        raise RuntimeConfigError(
+        error_class = (
+            ControlPlaneUnavailableError if exc.code >= 500 else RuntimeConfigError
+        )
+        raise error_class(
             f"Control Plane error: {exc.code}",
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         ) from exc
-    except urllib_error.URLError as exc:
-        raise RuntimeConfigError(
+    except (urllib_error.URLError, TimeoutError, http_client.HTTPException) as exc:
+        _raise_if_cancelled(call, exc)
+        _raise_if_deadline_expired(deadline, exc)
+        raise ControlPlaneUnavailableError(
             "Control Plane unreachable",
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         ) from exc
     except json.JSONDecodeError as exc:
+        _raise_if_cancelled(call, exc)
         raise RuntimeConfigError("Control Plane response invalid") from exc
 
     if not isinstance(payload, dict):
@@ -332,40 +1612,183 @@ def resolve_bundle_via_control_plane(
     expected_digest = payload.get("bundle_sha256")
     if expected_digest is not None and not isinstance(expected_digest, str):
         raise RuntimeConfigError("Control Plane response invalid bundle_sha256")
-    return bundle_id, min_version, expected_digest, int(status_code)
+    expected_tree_digest = payload.get("bundle_tree_sha256")
+    if expected_tree_digest is not None and not isinstance(expected_tree_digest, str):
+        raise RuntimeConfigError("Control Plane response invalid bundle_tree_sha256")
+    return (
+        bundle_id,
+        min_version,
+        expected_digest,
+        expected_tree_digest,
+        int(status_code),
+    )
 
 
-def _bundle_root() -> Path:
-    return REPO_ROOT / "data" / "bundles"
+def resolve_request_deadline(
+    deadline_header: str | None, timeout_ms_header: str | None
+) -> Deadline | None:
+    # X-Request-Deadline: epoch Unix em segundos; X-Request-Timeout-Ms: orçamento relativo.
+    # O orçamento configurado é teto para ambos.
+    budgets: list[float] = []
+    try:
+        if deadline_header:
+            budgets.append(float(deadline_header) - time.time())
+        elif timeout_ms_header:
+            timeout_ms = float(timeout_ms_header)
+            if timeout_ms <= 0:
+                raise ValueError(timeout_ms_header)
+            budgets.append(timeout_ms / 1000)
+    except ValueError as exc:
+        raise RuntimeConfigError(
+            "Request deadline invalid", status_code=status.HTTP_400_BAD_REQUEST
+        ) from exc
+    if os.getenv(REQUEST_BUDGET_ENV):
+        budgets.append(
+            _resolve_positive_float_env(
+                REQUEST_BUDGET_ENV, 0.0, "Request budget config invalid"
+            )
+        )
+    if not budgets:
+        return None
+    return Deadline.after(min(budgets))
 
 
-def _ensure_bundle_structure(bundle_path: Path) -> None:
-    manifest_path = bundle_path / "manifest.yaml"
-    if not manifest_path.is_file():
-        raise RuntimeConfigError("Bundle structure invalid")
-    for expected_dir in EXPECTED_BUNDLE_DIRS:
-        if not (bundle_path / expected_dir).is_dir():
-            raise RuntimeConfigError("Bundle structure invalid")
+def _bounded_timeout(timeout: float, deadline: Deadline | None) -> float:
+    return timeout if deadline is None else deadline.bound(timeout)
 
 
-def _set_bundle_read_only(bundle_path: Path) -> None:
-    for path in bundle_path.rglob("*"):
-        try:
-            if path.is_dir():
-                path.chmod(0o555)
-            else:
-                path.chmod(0o444)
-        except OSError:
-            continue
+def _raise_if_deadline_expired(deadline: Deadline | None, exc: Exception) -> None:
+    # Timeout de socket causado pelo próprio orçamento da request, não pelo destino.
+    if deadline is not None and deadline.remaining() <= 0:
+        raise DeadlineExceededError() from exc
+
+
+def _control_plane_breaker(base_url: str) -> CircuitBreaker:
+    with _CONTROL_PLANE_LOCK:
+        breaker = CONTROL_PLANE_BREAKERS.get(base_url)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                window=_resolve_optional_positive_int_env(
+                    CONTROL_PLANE_BREAKER_WINDOW_ENV,
+                    "Control Plane breaker config invalid",
+                )
+                or DEFAULT_CONTROL_PLANE_BREAKER_WINDOW,
+                min_calls=_resolve_optional_positive_int_env(
+                    CONTROL_PLANE_BREAKER_MIN_CALLS_ENV,
+                    "Control Plane breaker config invalid",
+                )
+                or DEFAULT_CONTROL_PLANE_BREAKER_MIN_CALLS,
+                error_rate=_resolve_positive_float_env(
+                    CONTROL_PLANE_BREAKER_ERROR_RATE_ENV,
+                    DEFAULT_CONTROL_PLANE_BREAKER_ERROR_RATE,
+                    "Control Plane breaker config invalid",
+                ),
+                slow_call_seconds=_resolve_positive_float_env(
+                    CONTROL_PLANE_BREAKER_SLOW_CALL_ENV,
+                    DEFAULT_CONTROL_PLANE_BREAKER_SLOW_CALL_SECONDS,
+                    "Control Plane breaker config invalid",
+                ),
+                open_seconds=_resolve_positive_float_env(
+                    CONTROL_PLANE_BREAKER_OPEN_ENV,
+                    DEFAULT_CONTROL_PLANE_BREAKER_OPEN_SECONDS,
+                    "Control Plane breaker config invalid",
+                ),
+            )
+            if breaker.error_rate > 1:
+                raise RuntimeConfigError("Control Plane breaker config invalid")
+            CONTROL_PLANE_BREAKERS[base_url] = breaker
+        return breaker
+
+
+def _resolve_serve_stale() -> bool:
+    env_value = os.getenv(CONTROL_PLANE_STALE_ENV, "false").strip().lower()
+    if env_value not in {"true", "false", "1", "0"}:
+        raise RuntimeConfigError("Control Plane breaker config invalid")
+    return env_value in {"true", "1"}
+
+
+def _last_known_good_path() -> Path:
+    return _bundle_root() / LAST_KNOWN_GOOD_FILENAME
+
+
+def _load_last_known_good(base_url: str) -> dict[str, dict[str, Any]]:
+    path = _last_known_good_path()
+    with _CONTROL_PLANE_LOCK:
+        state = LAST_KNOWN_GOOD.get(str(path))
+        if state is None:
+            try:
+                state = json.loads(path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                state = {}
+            except (OSError, json.JSONDecodeError):
+                logger.warning("last-known-good state unreadable; ignoring")
+                state = {}
+            if not isinstance(state, dict):
+                state = {}
+            LAST_KNOWN_GOOD[str(path)] = state
+        tenants = state.get(base_url)
+        return dict(tenants) if isinstance(tenants, dict) else {}
+
+
+def _remember_last_known_good(
+    base_url: str, tenant_id: str, entry: dict[str, Any]
+) -> None:
+    # Só persiste quando o mapeamento muda: o caminho quente não escreve em disco.
+    if _load_last_known_good(base_url).get(tenant_id) == entry:
+        return
+    path = _last_known_good_path()
+    with _CONTROL_PLANE_LOCK:
+        state = LAST_KNOWN_GOOD[str(path)]
+        tenants = state.get(base_url)
+        if not isinstance(tenants, dict):
+            tenants = state[base_url] = {}
+        tenants[tenant_id] = entry
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_json_atomic(path, state)
+        except OSError:
+            logger.warning("last-known-good state not persisted")
+
+
+def _write_json_atomic(path: Path, payload: Any) -> None:
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    temp_path.write_text(json.dumps(payload, sort_keys=True), encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def _bundle_root() -> Path:
+    return REPO_ROOT / "data" / "bundles"
+
+
+def _ensure_bundle_structure(bundle_path: Path) -> None:
+    manifest_path = bundle_path / "manifest.yaml"
+    if not manifest_path.is_file():
+        raise RuntimeConfigError("Bundle structure invalid")
+    for expected_dir in EXPECTED_BUNDLE_DIRS:
+        if not (bundle_path / expected_dir).is_dir():
+            raise RuntimeConfigError("Bundle structure invalid")
+
+
+def _set_bundle_read_only(bundle_path: Path) -> None:
+    for path in bundle_path.rglob("*"):
+        try:
+            if path.is_dir():
+                path.chmod(0o555)
+            else:
+                path.chmod(0o444)
+        except OSError:
+            continue
     try:
         bundle_path.chmod(0o555)
     except OSError:
         pass
 
 
-def _safe_extract_tar_gz(archive_path: Path, destination: Path) -> None:
+def _safe_extract_tar_gz(
+    archive_path: Path, destination: Path, mode: str = "r:gz"
+) -> None:
     destination_resolved = destination.resolve()
-    with tarfile.open(archive_path, mode="r:gz") as tar:
+    with tarfile.open(archive_path, mode=mode) as tar:
         for member in tar.getmembers():
             member_path = (destination / member.name).resolve()
             if os.path.commonpath([str(destination_resolved), str(member_path)]) != str(
@@ -389,17 +1812,153 @@ def _digest_file(path: Path) -> str:
     return hasher.hexdigest()
 
 
-def _download_bundle_archive(bundle_id: str, destination: Path) -> None:
+def bundle_file_digests(bundle_path: Path) -> dict[str, str]:
+    return {
+        path.relative_to(bundle_path).as_posix(): _digest_file(path)
+        for path in sorted(bundle_path.rglob("*"))
+        if path.is_file()
+    }
+
+
+def _tree_digest_from_file_digests(file_digests: dict[str, str]) -> str:
+    hasher = hashlib.sha256()
+    for relative_path in sorted(file_digests):
+        hasher.update(f"{relative_path}\0{file_digests[relative_path]}\n".encode())
+    return hasher.hexdigest()
+
+
+def compute_bundle_tree_digest(bundle_path: Path) -> str:
+    # Digest de conteúdo (independente de empacotamento): paths relativos + sha256
+    # de cada arquivo. Permite verificar bundles reconstruídos localmente.
+    return _tree_digest_from_file_digests(bundle_file_digests(bundle_path))
+
+
+def write_bundle_tar(bundle_path: Path, destination: Path) -> None:
+    # Tar não comprimido e determinístico (ordem, mtime e ownership fixos) com
+    # paths relativos à raiz do bundle; verificado pelo receptor via tree digest.
+    with tarfile.open(destination, mode="w") as tar:
+        for path in sorted(bundle_path.rglob("*")):
+            if not path.is_file() or path.is_symlink():
+                continue
+            info = tar.gettarinfo(
+                str(path), arcname=path.relative_to(bundle_path).as_posix()
+            )
+            info.mtime = 0
+            info.uid = info.gid = 0
+            info.uname = info.gname = ""
+            info.mode = 0o444
+            with path.open("rb") as file_obj:
+                tar.addfile(info, file_obj)
+
+
+def _rendezvous_peers(bundle_id: str, peers: list[str]) -> list[str]:
+    # Rendezvous (HRW) hashing: cada bundle tem uma ordem estável de peers,
+    # espalhando a carga de uma promoção sem coordenação entre nós.
+    return sorted(
+        peers,
+        key=lambda peer: (
+            hashlib.sha256(f"{peer}|{bundle_id}".encode()).hexdigest(),
+            peer,
+        ),
+        reverse=True,
+    )
+
+
+def _configured_bundle_peers() -> list[str]:
+    env_value = os.getenv(BUNDLE_PEERS_ENV, "")
+    self_url = os.getenv(RUNTIME_SELF_URL_ENV, "").strip().rstrip("/")
+    peers: list[str] = []
+    for raw_peer in env_value.split(","):
+        peer = raw_peer.strip().rstrip("/")
+        if peer and peer != self_url and peer not in peers:
+            peers.append(peer)
+    return peers
+
+
+def _download_bundle_from_peer(
+    peer: str, bundle_id: str, destination: Path, deadline: Deadline | None = None
+) -> None:
+    headers: dict[str, str] = {}
+    token = os.getenv(INTERNAL_TOKEN_ENV)
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    try:
+        with urllib_request.urlopen(
+            urllib_request.Request(
+                f"{peer}/internal/bundles/{bundle_id}.tar",
+                method="GET",
+                headers=headers,
+            ),
+            timeout=_bounded_timeout(_resolve_bundle_download_timeout(), deadline),
+        ) as response:
+            with destination.open("wb") as file_obj:
+                shutil.copyfileobj(response, file_obj)
+    except (urllib_error.URLError, OSError) as exc:
+        _raise_if_deadline_expired(deadline, exc)
+        raise BundleDownloadError(
+            "Bundle peer download failed",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        ) from exc
+
+
+def _materialize_bundle_from_peers(
+    bundle_id: str,
+    expected_tree_digest: str,
+    temp_dir: Path,
+    deadline: Deadline | None = None,
+) -> Path | None:
+    peers = _configured_bundle_peers()
+    if not peers:
+        return None
+    attempts = (
+        _resolve_optional_positive_int_env(
+            BUNDLE_PEER_ATTEMPTS_ENV, "Bundle peer attempts invalid"
+        )
+        or DEFAULT_BUNDLE_PEER_ATTEMPTS
+    )
+    for index, peer in enumerate(_rendezvous_peers(bundle_id, peers)[:attempts]):
+        archive_path = temp_dir / f"peer-{index}.tar"
+        extract_path = temp_dir / f"peer-{index}"
+        extract_path.mkdir(parents=True, exist_ok=True)
+        try:
+            _download_bundle_from_peer(peer, bundle_id, archive_path, deadline)
+            _safe_extract_tar_gz(archive_path, extract_path, mode="r:")
+            if compute_bundle_tree_digest(extract_path) != expected_tree_digest:
+                raise RuntimeConfigError("Bundle peer digest mismatch")
+            return extract_path
+        except DeadlineExceededError:
+            raise
+        except (RuntimeConfigError, tarfile.TarError) as exc:
+            # Peers são best-effort: o digest garante integridade e a origem é o fallback.
+            logger.warning("bundle peer fetch failed for %s: %s", bundle_id, exc)
+            continue
+    return None
+
+
+def bundle_delta_artifact_name(bundle_id: str, base_bundle_id: str) -> str:
+    return f"{bundle_id}.from-{base_bundle_id}.delta.tar.gz"
+
+
+def _download_bundle_archive(
+    bundle_id: str, destination: Path, deadline: Deadline | None = None
+) -> None:
+    _download_origin_artifact(f"{bundle_id}.tar.gz", destination, deadline)
+
+
+def _download_origin_artifact(
+    artifact_name: str, destination: Path, deadline: Deadline | None = None
+) -> None:
     base_url = os.getenv(BUNDLE_BASE_URL_ENV)
     if not base_url:
         raise RuntimeConfigError(
             "Bundle download base URL missing",
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         )
-    archive_url = f"{base_url.rstrip('/')}/{bundle_id}.tar.gz"
+    archive_url = f"{base_url.rstrip('/')}/{artifact_name}"
     try:
         with urllib_request.urlopen(
-            archive_url, timeout=_resolve_control_plane_timeout()
+            archive_url,
+            timeout=_bounded_timeout(_resolve_bundle_download_timeout(), deadline),
         ) as response:
             destination.write_bytes(response.read())
     except urllib_error.HTTPError as exc:
@@ -408,56 +1967,785 @@ def _download_bundle_archive(bundle_id: str, destination: Path) -> None:
                 "Bundle not found in origin",
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             ) from exc
-        raise RuntimeConfigError(
+        raise BundleDownloadError(
             "Bundle download failed",
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         ) from exc
-    except urllib_error.URLError as exc:
-        raise RuntimeConfigError(
+    except (urllib_error.URLError, TimeoutError) as exc:
+        _raise_if_deadline_expired(deadline, exc)
+        raise BundleDownloadError(
             "Bundle download failed",
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         ) from exc
 
 
 def ensure_local_bundle(
-    bundle_id: str, expected_digest: str | None
+    bundle_id: str,
+    expected_digest: str | None,
+    *,
+    expected_tree_digest: str | None = None,
+    base_bundle_id: str | None = None,
+    deadline: Deadline | None = None,
 ) -> tuple[Path, str]:
+    # Retorna com um lease de leitura adquirido: o chamador libera com
+    # release_bundle_lease(); bundles com lease ativo nunca sofrem eviction.
     bundle_path = _bundle_root() / bundle_id
-    if bundle_path.exists():
-        _ensure_bundle_structure(bundle_path)
-        return bundle_path, "hit"
+    key = str(bundle_path)
+    with _BUNDLE_CACHE_LOCK:
+        quarantine_pending = key in BUNDLE_QUARANTINE_PENDING
+        needs_verification = (
+            not quarantine_pending and key not in VERIFIED_BUNDLES and bundle_path.exists()
+        )
+    # O pin do tenant não segura a quarentena aqui: este request baixa o bundle de novo
+    # logo em seguida. Só leases ativos adiam o rename.
+    if needs_verification and not verify_local_bundle(bundle_path, expected_tree_digest):
+        # Primeira vez que o processo vê o bundle: verificação completa, uma única vez,
+        # com o hash dos arquivos fora do lock global.
+        quarantine_bundle(bundle_path, honor_pins=False)
+    with _BUNDLE_CACHE_LOCK:
+        verified_tree_digest = VERIFIED_BUNDLES.get(key)
+        if verified_tree_digest is not None and (
+            expected_tree_digest and verified_tree_digest != expected_tree_digest
+        ):
+            quarantine_bundle(bundle_path, honor_pins=False)
+            verified_tree_digest = None
+        elif key in BUNDLE_QUARANTINE_PENDING:
+            quarantine_bundle(bundle_path, honor_pins=False)
+        if key in BUNDLE_QUARANTINE_PENDING:
+            # Divergente, mas ainda com leases: nada de novos leases até a quarentena.
+            raise BundleFetchUnavailableError(
+                "Bundle quarantine pending",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        if verified_tree_digest is not None:
+            _acquire_bundle_lease(bundle_path)
+            BUNDLE_CACHE_COUNTERS["hit"] += 1
+            return bundle_path, "hit"
 
-    if not expected_digest:
+    delta_possible = bool(
+        expected_tree_digest and base_bundle_id and base_bundle_id != bundle_id
+    )
+    if not expected_digest and not expected_tree_digest:
         raise RuntimeConfigError("Bundle digest missing")
+    if deadline is not None:
+        deadline.check()
 
     with tempfile.TemporaryDirectory() as temp_dir_str:
         temp_dir = Path(temp_dir_str)
-        archive_path = temp_dir / "bundle.tar.gz"
-        extract_path = temp_dir / "extract"
-        extract_path.mkdir(parents=True, exist_ok=True)
-
-        _download_bundle_archive(bundle_id, archive_path)
-        received_digest = _digest_file(archive_path)
-        if received_digest != expected_digest:
-            raise RuntimeConfigError("Bundle digest mismatch")
-
-        _safe_extract_tar_gz(archive_path, extract_path)
-        source_path = extract_path
-        if not (source_path / "manifest.yaml").is_file():
-            subdirs = [p for p in extract_path.iterdir() if p.is_dir()]
-            if len(subdirs) == 1:
-                source_path = subdirs[0]
+        source_path: Path | None = None
+        if delta_possible:
+            source_path = _materialize_bundle_from_delta(
+                bundle_id,
+                str(base_bundle_id),
+                str(expected_tree_digest),
+                temp_dir,
+                deadline,
+            )
+        if source_path is None and expected_tree_digest:
+            source_path = _materialize_bundle_from_peers(
+                bundle_id, expected_tree_digest, temp_dir, deadline
+            )
+        if source_path is None:
+            if not expected_digest:
+                raise RuntimeConfigError("Bundle digest missing")
+            source_path = _materialize_bundle_from_archive(
+                bundle_id, expected_digest, temp_dir, deadline
+            )
+        if deadline is not None:
+            deadline.check()
 
         _ensure_bundle_structure(source_path)
+        file_digests = bundle_file_digests(source_path)
         bundle_path.parent.mkdir(parents=True, exist_ok=True)
-        if bundle_path.exists():
-            raise RuntimeConfigError("Bundle already exists")
-        shutil.move(str(source_path), str(bundle_path))
+        with _BUNDLE_CACHE_LOCK:
+            if bundle_path.exists():
+                raise RuntimeConfigError("Bundle already exists")
+            shutil.move(str(source_path), str(bundle_path))
+            _write_verification_marker(bundle_path.name, file_digests)
+            VERIFIED_BUNDLES[key] = _tree_digest_from_file_digests(file_digests)
+            _acquire_bundle_lease(bundle_path)
+            BUNDLE_CACHE_COUNTERS["miss"] += 1
 
     _set_bundle_read_only(bundle_path)
+    evict_bundles_over_budget()
     return bundle_path, "miss"
 
 
+def fetch_bundle(
+    tenant_id: str,
+    bundle_id: str,
+    expected_digest: str | None,
+    *,
+    expected_tree_digest: str | None = None,
+    base_bundle_id: str | None = None,
+    deadline: Deadline | None = None,
+) -> tuple[Path, str]:
+    # Mesmo contrato de ensure_local_bundle (retorna com lease), mas o fetch roda no
+    # pool dedicado; a request só espera o future até CONTRACTOR_BUNDLE_FETCH_WAIT_SECONDS
+    # (ou o deadline da request, o que vier antes). O fetch compartilhado não herda o
+    # deadline de nenhuma request: só o timeout de download limita a transferência.
+    bundle_path = _bundle_root() / bundle_id
+    key = str(bundle_path)
+    if key in VERIFIED_BUNDLES:
+        return ensure_local_bundle(
+            bundle_id,
+            expected_digest,
+            expected_tree_digest=expected_tree_digest,
+            base_bundle_id=base_bundle_id,
+            deadline=deadline,
+        )
+
+    wait_seconds = _resolve_positive_float_env(
+        BUNDLE_FETCH_WAIT_ENV,
+        DEFAULT_BUNDLE_FETCH_WAIT_SECONDS,
+        "Bundle fetch config invalid",
+    )
+    tenant_limit = (
+        _resolve_optional_positive_int_env(
+            BUNDLE_FETCH_TENANT_LIMIT_ENV, "Bundle fetch config invalid"
+        )
+        or DEFAULT_BUNDLE_FETCH_TENANT_LIMIT
+    )
+    with _BUNDLE_FETCH_LOCK:
+        future = BUNDLE_FETCHES.get(key)
+        if future is None:
+            if BUNDLE_FETCH_TENANT_IN_FLIGHT.get(tenant_id, 0) >= tenant_limit:
+                BUNDLE_FETCH_METRICS["rejected"] += 1
+                raise BundleFetchUnavailableError(
+                    "Bundle fetch capacity exceeded",
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
+            BUNDLE_FETCH_TENANT_IN_FLIGHT[tenant_id] = (
+                BUNDLE_FETCH_TENANT_IN_FLIGHT.get(tenant_id, 0) + 1
+            )
+            BUNDLE_FETCH_METRICS["queued"] += 1
+            future = _bundle_fetch_executor().submit(
+                _run_bundle_fetch,
+                bundle_id,
+                expected_digest,
+                expected_tree_digest,
+                base_bundle_id,
+                time.monotonic(),
+            )
+            BUNDLE_FETCHES[key] = future
+            future.add_done_callback(
+                lambda done: _finish_bundle_fetch(key, tenant_id, done)
+            )
+
+    try:
+        fetched_path, cache_status = future.result(
+            timeout=_bounded_timeout(wait_seconds, deadline)
+        )
+    except FutureTimeoutError as exc:
+        # O fetch continua no pool; a próxima request aproveita o resultado.
+        with _BUNDLE_FETCH_LOCK:
+            BUNDLE_FETCH_METRICS["timed_out"] += 1
+        _raise_if_deadline_expired(deadline, exc)
+        raise BundleFetchUnavailableError(
+            "Bundle fetch timed out",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        ) from exc
+    with _BUNDLE_CACHE_LOCK:
+        if str(fetched_path) not in VERIFIED_BUNDLES:
+            raise BundleFetchUnavailableError(
+                "Bundle fetch failed",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        _acquire_bundle_lease(fetched_path)
+    return fetched_path, cache_status
+
+
+def _bundle_fetch_executor() -> ThreadPoolExecutor:
+    global _BUNDLE_FETCH_EXECUTOR
+    with _BUNDLE_FETCH_LOCK:
+        if _BUNDLE_FETCH_EXECUTOR is None:
+            workers = (
+                _resolve_optional_positive_int_env(
+                    BUNDLE_FETCH_WORKERS_ENV, "Bundle fetch config invalid"
+                )
+                or DEFAULT_BUNDLE_FETCH_WORKERS
+            )
+            _BUNDLE_FETCH_EXECUTOR = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="contractor-bundle-fetch"
+            )
+        return _BUNDLE_FETCH_EXECUTOR
+
+
+def _run_bundle_fetch(
+    bundle_id: str,
+    expected_digest: str | None,
+    expected_tree_digest: str | None,
+    base_bundle_id: str | None,
+    submitted_at: float,
+) -> tuple[Path, str]:
+    with _BUNDLE_FETCH_LOCK:
+        BUNDLE_FETCH_METRICS["queued"] -= 1
+        BUNDLE_FETCH_METRICS["running"] += 1
+    succeeded = False
+    try:
+        bundle_path, cache_status = ensure_local_bundle(
+            bundle_id,
+            expected_digest,
+            expected_tree_digest=expected_tree_digest,
+            base_bundle_id=base_bundle_id,
+        )
+        # Cada request que espera o future adquire o próprio lease.
+        release_bundle_lease(bundle_path)
+        succeeded = True
+        return bundle_path, cache_status
+    finally:
+        latency = time.monotonic() - submitted_at
+        with _BUNDLE_FETCH_LOCK:
+            BUNDLE_FETCH_METRICS["running"] -= 1
+            BUNDLE_FETCH_METRICS["completed" if succeeded else "failed"] += 1
+            BUNDLE_FETCH_METRICS["latency_seconds_total"] += latency
+            BUNDLE_FETCH_METRICS["latency_seconds_max"] = max(
+                BUNDLE_FETCH_METRICS["latency_seconds_max"], latency
+            )
+
+
+def _finish_bundle_fetch(
+    key: str, tenant_id: str, future: Future[tuple[Path, str]]
+) -> None:
+    with _BUNDLE_FETCH_LOCK:
+        if BUNDLE_FETCHES.get(key) is future:
+            BUNDLE_FETCHES.pop(key, None)
+        remaining = BUNDLE_FETCH_TENANT_IN_FLIGHT.get(tenant_id, 0) - 1
+        if remaining > 0:
+            BUNDLE_FETCH_TENANT_IN_FLIGHT[tenant_id] = remaining
+        else:
+            BUNDLE_FETCH_TENANT_IN_FLIGHT.pop(tenant_id, None)
+
+
+def _verification_marker_path(bundle_id: str) -> Path:
+    return _bundle_root() / BUNDLE_VERIFIED_DIRNAME / f"{bundle_id}.json"
+
+
+def _write_verification_marker(bundle_id: str, file_digests: dict[str, str]) -> None:
+    marker_path = _verification_marker_path(bundle_id)
+    marker_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "bundle_id": bundle_id,
+        "tree_sha256": _tree_digest_from_file_digests(file_digests),
+        "files": file_digests,
+        "verified_at": now_utc_iso(),
+    }
+    _write_json_atomic(marker_path, payload)
+
+
+def _load_verification_marker(bundle_id: str) -> dict[str, str] | None:
+    # None: bundle sem marker. Marker ilegível nunca confere (fail-closed).
+    try:
+        payload = json.loads(
+            _verification_marker_path(bundle_id).read_text(encoding="utf-8")
+        )
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError):
+        return {}
+    files = payload.get("files") if isinstance(payload, dict) else None
+    if not isinstance(files, dict) or not all(
+        isinstance(k, str) and isinstance(v, str) for k, v in files.items()
+    ):
+        return {}
+    return files
+
+
+def verify_local_bundle(bundle_path: Path, expected_tree_digest: str | None = None) -> bool:
+    # Hash de todos os arquivos sem lock; o lock só protege a publicação do resultado.
+    try:
+        _ensure_bundle_structure(bundle_path)
+        file_digests = bundle_file_digests(bundle_path)
+    except (RuntimeConfigError, OSError):
+        return False
+    tree_digest = _tree_digest_from_file_digests(file_digests)
+    recorded = _load_verification_marker(bundle_path.name)
+    if recorded is None:
+        # Bundle sem marker (anterior ao marker ou colocado à mão): só é adotado se confere
+        # com o tree digest informado pelo Control Plane; sem ele, volta a ser baixado.
+        if expected_tree_digest is None or tree_digest != expected_tree_digest:
+            return False
+        _write_verification_marker(bundle_path.name, file_digests)
+    elif recorded != file_digests:
+        return False
+    with _BUNDLE_CACHE_LOCK:
+        if str(bundle_path) in BUNDLE_QUARANTINE_PENDING:
+            # Condenado enquanto o hash rodava: não volta a ser servido.
+            return False
+        VERIFIED_BUNDLES[str(bundle_path)] = tree_digest
+    return True
+
+
+def _bundle_pinned(bundle_path: Path) -> bool:
+    return bundle_path.name in set(TENANT_CURRENT_BUNDLES.values()) | set(
+        TENANT_CANDIDATE_BUNDLES.values()
+    )
+
+
+def quarantine_bundle(bundle_path: Path, *, honor_pins: bool = True) -> Path | None:
+    with _BUNDLE_CACHE_LOCK:
+        key = str(bundle_path)
+        if BUNDLE_LEASES.get(key, 0) > 0 or (honor_pins and _bundle_pinned(bundle_path)):
+            # Requests em andamento ainda leem o bundle (contrato de lease) e bundles
+            # pinados seguem no disco como na eviction: o bundle sai da memória agora e é
+            # movido quando o último lease for liberado ou pelo próximo request que o usar.
+            BUNDLE_QUARANTINE_PENDING.add(key)
+            _forget_bundle(bundle_path)
+            logger.warning("bundle %s quarantine deferred", bundle_path.name)
+            return None
+        BUNDLE_QUARANTINE_PENDING.discard(key)
+        target = (
+            _bundle_root()
+            / BUNDLE_QUARANTINE_DIRNAME
+            / f"{bundle_path.name}-{uuid.uuid4().hex}"
+        )
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # Mover um diretório entre pais exige escrita nele (atualiza "..").
+            bundle_path.chmod(0o755)
+            bundle_path.rename(target)
+        except OSError:
+            logger.warning("bundle quarantine failed for %s", bundle_path.name)
+            return None
+        _forget_bundle(bundle_path)
+        _verification_marker_path(bundle_path.name).unlink(missing_ok=True)
+        _remove_faq_indexes(bundle_path.name)
+        BUNDLE_SCRUB_COUNTERS["quarantined"] += 1
+    logger.warning("bundle %s failed verification and was quarantined", bundle_path.name)
+    return target
+
+
+def scrub_bundles() -> dict[str, list[str]]:
+    verified: list[str] = []
+    quarantined: list[str] = []
+    for bundle_path in _list_cached_bundles():
+        with _BUNDLE_CACHE_LOCK:
+            pending = str(bundle_path) in BUNDLE_QUARANTINE_PENDING
+        if pending:
+            # Quarentena adiada por lease ou pin: tenta mover de novo, sem re-verificar.
+            if quarantine_bundle(bundle_path) is not None:
+                quarantined.append(bundle_path.name)
+            continue
+        recorded = _load_verification_marker(bundle_path.name)
+        if recorded is None:
+            continue
+        if verify_local_bundle(bundle_path):
+            BUNDLE_SCRUB_COUNTERS["verified"] += 1
+            verified.append(bundle_path.name)
+        elif quarantine_bundle(bundle_path) is not None:
+            quarantined.append(bundle_path.name)
+    return {"verified": verified, "quarantined": quarantined}
+
+
+def _resolve_bundle_scrub_interval() -> float:
+    env_value = os.getenv(BUNDLE_SCRUB_INTERVAL_ENV)
+    if not env_value:
+        return DEFAULT_BUNDLE_SCRUB_INTERVAL_SECONDS
+    try:
+        interval = float(env_value)
+    except ValueError as exc:
+        raise RuntimeConfigError("Bundle scrub interval invalid") from exc
+    if interval < 0:
+        raise RuntimeConfigError("Bundle scrub interval invalid")
+    return interval
+
+
+def _run_bundle_scrub(interval: float) -> None:
+    while not _BUNDLE_SCRUB_STOP.wait(interval):
+        try:
+            scrub_bundles()
+        except Exception:
+            # O scrub nunca derruba o processo; a próxima rodada tenta novamente.
+            logger.exception("bundle scrub failed")
+
+
+def _materialize_bundle_from_archive(
+    bundle_id: str,
+    expected_digest: str,
+    temp_dir: Path,
+    deadline: Deadline | None = None,
+) -> Path:
+    archive_path = temp_dir / "bundle.tar.gz"
+    extract_path = temp_dir / "extract"
+    extract_path.mkdir(parents=True, exist_ok=True)
+
+    _download_bundle_archive(bundle_id, archive_path, deadline)
+    received_digest = _digest_file(archive_path)
+    if received_digest != expected_digest:
+        raise RuntimeConfigError("Bundle digest mismatch")
+
+    _safe_extract_tar_gz(archive_path, extract_path)
+    source_path = extract_path
+    if not (source_path / "manifest.yaml").is_file():
+        subdirs = [p for p in extract_path.iterdir() if p.is_dir()]
+        if len(subdirs) == 1:
+            source_path = subdirs[0]
+    return source_path
+
+
+def _materialize_bundle_from_delta(
+    bundle_id: str,
+    base_bundle_id: str,
+    expected_tree_digest: str,
+    temp_dir: Path,
+    deadline: Deadline | None = None,
+) -> Path | None:
+    base_path = _bundle_root() / base_bundle_id
+    with _BUNDLE_CACHE_LOCK:
+        if not base_path.is_dir():
+            return None
+        _acquire_bundle_lease(base_path)
+    try:
+        delta_path = temp_dir / "delta.tar.gz"
+        _download_origin_artifact(
+            bundle_delta_artifact_name(bundle_id, base_bundle_id), delta_path, deadline
+        )
+        source_path = _apply_bundle_delta(
+            base_path, delta_path, temp_dir, bundle_id, base_bundle_id
+        )
+        if compute_bundle_tree_digest(source_path) != expected_tree_digest:
+            raise RuntimeConfigError("Bundle delta digest mismatch")
+        return source_path
+    except DeadlineExceededError:
+        raise
+    except (RuntimeConfigError, tarfile.TarError, OSError, EOFError) as exc:
+        # Delta é otimização: qualquer falha (inclusive artefato corrompido, truncado ou
+        # manifest que aponta para diretório) cai no download completo verificado.
+        logger.warning("bundle delta unavailable for %s: %s", bundle_id, exc)
+        return None
+    finally:
+        release_bundle_lease(base_path)
+
+
+def _delta_member_path(root: Path, relative_path: Any) -> Path:
+    if not isinstance(relative_path, str) or not relative_path:
+        raise RuntimeConfigError("Bundle delta invalid")
+    root_resolved = root.resolve()
+    member_path = (root / relative_path).resolve()
+    if os.path.commonpath([str(root_resolved), str(member_path)]) != str(
+        root_resolved
+    ) or member_path == root_resolved:
+        raise RuntimeConfigError("Bundle delta invalid")
+    return member_path
+
+
+def _apply_bundle_delta(
+    base_path: Path,
+    delta_path: Path,
+    temp_dir: Path,
+    bundle_id: str,
+    base_bundle_id: str,
+) -> Path:
+    delta_dir = temp_dir / "delta"
+    delta_dir.mkdir(parents=True, exist_ok=True)
+    _safe_extract_tar_gz(delta_path, delta_dir)
+    try:
+        delta_manifest = json.loads(
+            (delta_dir / "delta.json").read_text(encoding="utf-8")
+        )
+    except (FileNotFoundError, json.JSONDecodeError) as exc:
+        raise RuntimeConfigError("Bundle delta invalid") from exc
+    if (
+        not isinstance(delta_manifest, dict)
+        or delta_manifest.get("format") != BUNDLE_DELTA_FORMAT
+        or delta_manifest.get("bundle_id") != bundle_id
+        or delta_manifest.get("base_bundle_id") != base_bundle_id
+        or not isinstance(delta_manifest.get("removed"), list)
+        or not isinstance(delta_manifest.get("changed"), list)
+    ):
+        raise RuntimeConfigError("Bundle delta invalid")
+
+    target_path = temp_dir / "bundle"
+    shutil.copytree(base_path, target_path)
+    _make_tree_writable(target_path)
+    for relative_path in delta_manifest["removed"]:
+        _delta_member_path(target_path, relative_path).unlink(missing_ok=True)
+    for relative_path in delta_manifest["changed"]:
+        source_file = _delta_member_path(delta_dir / "files", relative_path)
+        if not source_file.is_file():
+            raise RuntimeConfigError("Bundle delta invalid")
+        target_file = _delta_member_path(target_path, relative_path)
+        target_file.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source_file, target_file)
+    return target_path
+
+
+def _acquire_bundle_lease(bundle_path: Path) -> None:
+    key = str(bundle_path)
+    with _BUNDLE_CACHE_LOCK:
+        BUNDLE_LEASES[key] = BUNDLE_LEASES.get(key, 0) + 1
+        BUNDLE_CACHE_LAST_USED[key] = time.time()
+
+
+def release_bundle_lease(bundle_path: Path) -> None:
+    key = str(bundle_path)
+    with _BUNDLE_CACHE_LOCK:
+        remaining = BUNDLE_LEASES.get(key, 0) - 1
+        if remaining > 0:
+            BUNDLE_LEASES[key] = remaining
+        else:
+            BUNDLE_LEASES.pop(key, None)
+            if key in BUNDLE_QUARANTINE_PENDING:
+                quarantine_bundle(bundle_path)
+
+
+def _resolve_optional_positive_int_env(name: str, message: str) -> int | None:
+    env_value = os.getenv(name)
+    if not env_value:
+        return None
+    try:
+        value = int(env_value)
+    except ValueError as exc:
+        raise RuntimeConfigError(message) from exc
+    if value <= 0:
+        raise RuntimeConfigError(message)
+    return value
+
+
+def _resolve_positive_float_env(name: str, default: float, message: str) -> float:
+    env_value = os.getenv(name)
+    if not env_value:
+        return default
+    try:
+        value = float(env_value)
+    except ValueError as exc:
+        raise RuntimeConfigError(message) from exc
+    if value <= 0:
+        raise RuntimeConfigError(message)
+    return value
+
+
+def _resolve_runtime_threadpool_size() -> int:
+    size = (
+        _resolve_optional_positive_int_env(
+            RUNTIME_THREADPOOL_SIZE_ENV, "Runtime threadpool config invalid"
+        )
+        or DEFAULT_RUNTIME_THREADPOOL_SIZE
+    )
+    if size <= RUNTIME_THREADPOOL_RESERVE:
+        raise RuntimeConfigError("Runtime threadpool config invalid")
+    return size
+
+
+def _admission_controller() -> AdmissionController:
+    message = "Admission control config invalid"
+    thread_budget = _resolve_runtime_threadpool_size() - RUNTIME_THREADPOOL_RESERVE
+    settings = (
+        _resolve_optional_positive_int_env(ADMISSION_INITIAL_LIMIT_ENV, message)
+        or DEFAULT_ADMISSION_INITIAL_LIMIT,
+        _resolve_optional_positive_int_env(ADMISSION_MAX_LIMIT_ENV, message)
+        or DEFAULT_ADMISSION_MAX_LIMIT,
+        _resolve_optional_positive_int_env(ADMISSION_MAX_QUEUE_ENV, message)
+        or DEFAULT_ADMISSION_MAX_QUEUE,
+        _resolve_positive_float_env(
+            ADMISSION_QUEUE_TARGET_ENV, DEFAULT_ADMISSION_QUEUE_TARGET_SECONDS, message
+        ),
+        _resolve_positive_float_env(
+            ADMISSION_LATENCY_TARGET_ENV, DEFAULT_ADMISSION_LATENCY_TARGET_SECONDS, message
+        ),
+    )
+    # Requests na fila bloqueiam threads: com slots + fila acima do pool, a espera passaria a
+    # ser no pool do anyio, sem fair queuing nem load shedding.
+    if settings[1] + settings[2] > thread_budget:
+        raise RuntimeConfigError(message)
+    with _ADMISSION_LOCK:
+        controller = ADMISSION_CONTROLLERS.get(settings)
+        if controller is None:
+            initial_limit, max_limit, max_queue, queue_target, latency_target = settings
+            controller = AdmissionController(
+                initial_limit=initial_limit,
+                max_limit=max_limit,
+                max_queue=max_queue,
+                queue_target_seconds=queue_target,
+                latency_target_seconds=latency_target,
+            )
+            ADMISSION_CONTROLLERS[settings] = controller
+        return controller
+
+
+def _resolve_bundle_download_timeout() -> float:
+    # Download de bundles tem timeout próprio: o timeout do Control Plane é curto
+    # demais para artefatos grandes.
+    return _resolve_positive_float_env(
+        BUNDLE_DOWNLOAD_TIMEOUT_ENV,
+        DEFAULT_BUNDLE_DOWNLOAD_TIMEOUT_SECONDS,
+        "Bundle download timeout invalid",
+    )
+
+
+def runtime_metrics_snapshot() -> dict[str, Any]:
+    with _BUNDLE_CACHE_LOCK:
+        bundle_cache = {**BUNDLE_CACHE_COUNTERS, "verified_bundles": len(VERIFIED_BUNDLES)}
+        bundle_scrub = dict(BUNDLE_SCRUB_COUNTERS)
+    with _BUNDLE_FETCH_LOCK:
+        bundle_fetch = {
+            **BUNDLE_FETCH_METRICS,
+            "in_flight_by_tenant": dict(BUNDLE_FETCH_TENANT_IN_FLIGHT),
+        }
+    with _NEGATIVE_CACHE_LOCK:
+        negative_cache = {**NEGATIVE_CACHE_COUNTERS, "entries": len(NEGATIVE_CACHE)}
+    with _SUGGESTION_LOCK:
+        suggestions = dict(SUGGESTION_COUNTERS)
+    with _RESPONSE_CACHE_LOCK:
+        response_cache = dict(RESPONSE_CACHE_COUNTERS)
+    with _COMPILE_LOCK:
+        faq_memory = {
+            compiled.bundle_id: compiled.answer_map.footprint()
+            for compiled in COMPILED_BUNDLES.values()
+        }
+    coalescing = {
+        "resolve": RESOLVE_FLIGHTS.shared_total,
+        "compile": COMPILE_FLIGHTS.shared_total,
+        "result": EXECUTE_FLIGHTS.shared_total,
+    }
+    with _CONTROL_PLANE_LOCK:
+        breakers = dict(CONTROL_PLANE_BREAKERS)
+        replicas = list(CONTROL_PLANE_REPLICA_LATENCIES)
+        hedging = dict(CONTROL_PLANE_HEDGE_COUNTERS)
+    hedging["p95_seconds"] = {replica: _control_plane_p95(replica) for replica in replicas}
+    return {
+        "bundle_cache": bundle_cache,
+        "bundle_fetch": bundle_fetch,
+        "bundle_scrub": bundle_scrub,
+        "control_plane_breakers": {
+            base_url: breaker.snapshot() for base_url, breaker in breakers.items()
+        },
+        "control_plane_hedging": hedging,
+        "negative_cache": negative_cache,
+        "coalescing": coalescing,
+        "suggestions": suggestions,
+        "faq_memory": faq_memory,
+        "response_cache": response_cache,
+        "admission": _admission_controller().snapshot(),
+    }
+
+
+def _resolve_bundle_cache_budget() -> tuple[int | None, int | None]:
+    return (
+        _resolve_optional_positive_int_env(
+            BUNDLE_CACHE_MAX_BYTES_ENV, "Bundle cache budget invalid"
+        ),
+        _resolve_optional_positive_int_env(
+            BUNDLE_CACHE_MAX_BUNDLES_ENV, "Bundle cache budget invalid"
+        ),
+    )
+
+
+def _list_cached_bundles() -> list[Path]:
+    bundle_root = _bundle_root()
+    if not bundle_root.is_dir():
+        return []
+    # Apenas diretórios canônicos data/bundles/{bundle_id}/ (ADR 0017); entradas
+    # ocultas são estado interno do cache e bundles-fonte aninhados não são elegíveis.
+    return sorted(
+        path
+        for path in bundle_root.iterdir()
+        if not path.name.startswith(".")
+        and path.is_dir()
+        and (path / "manifest.yaml").is_file()
+    )
+
+
+def _bundle_disk_size(bundle_path: Path) -> int:
+    key = str(bundle_path)
+    size = BUNDLE_CACHE_SIZES.get(key)
+    if size is None:
+        size = sum(
+            path.stat().st_size for path in bundle_path.rglob("*") if path.is_file()
+        )
+        BUNDLE_CACHE_SIZES[key] = size
+    return size
+
+
+def _bundle_last_used(bundle_path: Path) -> float:
+    key = str(bundle_path)
+    last_used = BUNDLE_CACHE_LAST_USED.get(key)
+    if last_used is None:
+        # Bundles herdados de execuções anteriores: usa o mtime como aproximação.
+        last_used = bundle_path.stat().st_mtime
+        BUNDLE_CACHE_LAST_USED[key] = last_used
+    return last_used
+
+
+def _forget_bundle(bundle_path: Path) -> None:
+    key = str(bundle_path)
+    BUNDLE_CACHE_LAST_USED.pop(key, None)
+    BUNDLE_CACHE_SIZES.pop(key, None)
+    VERIFIED_BUNDLES.pop(key, None)
+    BUNDLE_WARMUP_STATUS.pop(bundle_path.name, None)
+    with _COMPILE_LOCK:
+        for compiled_key in [k for k in COMPILED_BUNDLES if k[1] == key]:
+            COMPILED_BUNDLES.pop(compiled_key, None)
+
+
+def _make_tree_writable(path: Path) -> None:
+    # Inverso de _set_bundle_read_only, para cópias de trabalho e remoção.
+    for child in [path, *path.rglob("*")]:
+        try:
+            if child.is_symlink():
+                continue
+            child.chmod(0o755 if child.is_dir() else 0o644)
+        except OSError:
+            continue
+
+
+def _remove_bundle_tree(path: Path) -> None:
+    _make_tree_writable(path)
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def evict_bundles_over_budget() -> list[str]:
+    max_bytes, max_bundles = _resolve_bundle_cache_budget()
+    if max_bytes is None and max_bundles is None:
+        return []
+
+    evicted: list[str] = []
+    removed_paths: list[Path] = []
+    with _BUNDLE_CACHE_LOCK:
+        cached = _list_cached_bundles()
+        sizes = {str(path): _bundle_disk_size(path) for path in cached}
+        total_bytes = sum(sizes.values())
+        total_bundles = len(cached)
+        pinned = set(TENANT_CURRENT_BUNDLES.values()) | set(
+            TENANT_CANDIDATE_BUNDLES.values()
+        )
+
+        candidates = sorted(cached, key=lambda p: (_bundle_last_used(p), p.name))
+        for bundle_path in candidates:
+            over_bytes = max_bytes is not None and total_bytes > max_bytes
+            over_count = max_bundles is not None and total_bundles > max_bundles
+            if not over_bytes and not over_count:
+                break
+            if bundle_path.name in pinned or BUNDLE_LEASES.get(str(bundle_path)):
+                continue
+            # Rename atômico: leitores nunca observam um bundle parcialmente removido.
+            trash_path = bundle_path.with_name(
+                f".evicting-{bundle_path.name}-{uuid.uuid4().hex}"
+            )
+            try:
+                bundle_path.rename(trash_path)
+            except OSError:
+                logger.warning("bundle eviction failed for %s", bundle_path.name)
+                continue
+            total_bytes -= sizes[str(bundle_path)]
+            total_bundles -= 1
+            _forget_bundle(bundle_path)
+            _verification_marker_path(bundle_path.name).unlink(missing_ok=True)
+            _remove_faq_indexes(bundle_path.name)
+            BUNDLE_CACHE_COUNTERS["evict"] += 1
+            evicted.append(bundle_path.name)
+            removed_paths.append(trash_path)
+
+        if (max_bytes is not None and total_bytes > max_bytes) or (
+            max_bundles is not None and total_bundles > max_bundles
+        ):
+            logger.warning("bundle cache over budget; remaining bundles are pinned")
+
+    for trash_path in removed_paths:
+        _remove_bundle_tree(trash_path)
+    return evicted
+
+
 def _map_error_code(exc: Exception, http_status: int) -> str:
     if http_status == status.HTTP_401_UNAUTHORIZED:
         return "unauthorized"
@@ -470,6 +2758,14 @@ def _map_error_code(exc: Exception, http_status: int) -> str:
             return "rate_limit_exceeded"
         if exc.detail == "Quota exceeded":
             return "quota_exceeded"
+        if exc.detail == "Concurrency limit exceeded":
+            return "concurrency_limit_exceeded"
+    if (
+        http_status == status.HTTP_503_SERVICE_UNAVAILABLE
+        and isinstance(exc, HTTPException)
+        and exc.detail == "Global rate limit exceeded"
+    ):
+        return "global_rate_limit_exceeded"
     if http_status == status.HTTP_500_INTERNAL_SERVER_ERROR and isinstance(
         exc, HTTPException
     ):
@@ -491,6 +2787,10 @@ def resolve_bundle_from_alias_entry(tenant_entry: Any) -> tuple[Path, str]:
         bundle_id = tenant_entry.get("bundle_id")
     if not bundle_path_value:
         raise RuntimeConfigError("Bundle path missing for tenant alias")
+    cache_key = (str(bundle_path_value), str(bundle_id) if bundle_id else None)
+    cached = ALIAS_BUNDLE_RESOLUTIONS.get(cache_key)
+    if cached is not None:
+        return cached
     bundle_path = Path(bundle_path_value)
     if not bundle_path.is_absolute():
         bundle_path = REPO_ROOT / bundle_path
@@ -501,6 +2801,7 @@ def resolve_bundle_from_alias_entry(tenant_entry: Any) -> tuple[Path, str]:
         bundle_id = manifest.get("bundle_id")
     if not bundle_id:
         raise RuntimeConfigError("Bundle id missing")
+    ALIAS_BUNDLE_RESOLUTIONS[cache_key] = (bundle_path, str(bundle_id))
     return bundle_path, str(bundle_id)
 
 
@@ -536,39 +2837,1361 @@ def _parse_semver(value: str) -> tuple[int, int, int]:
         raise RuntimeConfigError("Invalid runtime version format") from exc
 
 
-def load_faq_index(bundle_path: Path) -> dict[str, str]:
-    faq_data = json.loads(
-        (bundle_path / "data" / "faq.json").read_text(encoding="utf-8")
+def faq_data_files(bundle_path: Path) -> list[Path]:
+    # Um único layout por bundle: data/faq.json (array), data/faq.jsonl ou shards
+    # data/faq/*.jsonl lidos em ordem de nome.
+    data_dir = bundle_path / "data"
+    shard_dir = data_dir / "faq"
+    layouts = [
+        [path] for path in (data_dir / "faq.json", data_dir / "faq.jsonl") if path.is_file()
+    ]
+    if shard_dir.is_dir():
+        layouts.append(sorted(shard_dir.glob("*.jsonl")))
+    if len(layouts) != 1 or not layouts[0]:
+        raise RuntimeConfigError("FAQ data invalid")
+    return layouts[0]
+
+
+def _iter_json_array(path: Path) -> Iterator[Any]:
+    # Parse incremental de um array JSON de objetos: memória limitada ao chunk + maior item.
+    decoder = json.JSONDecoder()
+    with path.open(encoding="utf-8") as file_obj:
+        buffer = ""
+        position = 0
+        eof = False
+        state = "start"
+        while True:
+            position = _JSON_WHITESPACE.match(buffer, position).end()  # type: ignore[union-attr]
+            if position == len(buffer) and not eof:
+                buffer = file_obj.read(FAQ_STREAM_CHUNK_CHARS)
+                position = 0
+                eof = not buffer
+                continue
+            token = buffer[position : position + 1]
+            if state == "done":
+                if token:
+                    raise RuntimeConfigError("FAQ data invalid")
+                return
+            if state == "start":
+                if token != "[":
+                    raise RuntimeConfigError("FAQ data invalid")
+                position += 1
+                state = "first"
+            elif token == "]" and state in ("first", "next"):
+                position += 1
+                state = "done"
+            elif state == "next":
+                if token != ",":
+                    raise RuntimeConfigError("FAQ data invalid")
+                position += 1
+                state = "value"
+            elif token != "{":
+                raise RuntimeConfigError("FAQ data invalid")
+            else:
+                try:
+                    item, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as exc:
+                    if eof:
+                        raise RuntimeConfigError("FAQ data invalid") from exc
+                    chunk = file_obj.read(FAQ_STREAM_CHUNK_CHARS)
+                    eof = not chunk
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                    continue
+                state = "next"
+                yield item
+
+
+def _iter_jsonl(path: Path) -> Iterator[Any]:
+    with path.open(encoding="utf-8") as file_obj:
+        for line in file_obj:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise RuntimeConfigError("FAQ data invalid") from exc
+
+
+def iter_faq_records(bundle_path: Path) -> Iterator[tuple[str, str]]:
+    for path in faq_data_files(bundle_path):
+        items = _iter_json_array(path) if path.suffix == ".json" else _iter_jsonl(path)
+        for item in items:
+            question = item.get("question") if isinstance(item, dict) else None
+            answer = item.get("answer") if isinstance(item, dict) else None
+            if not isinstance(question, str) or not isinstance(answer, str):
+                raise RuntimeConfigError("FAQ data invalid")
+            yield question, answer
+
+
+def _faq_key_hash(question: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(question, digest_size=8).digest(), "little")
+
+
+def _faq_arena_record(buffer: Any, arena_offset: int, offset: int) -> tuple[bytes, int, int]:
+    # (pergunta, início da resposta, tamanho da resposta) do registro no offset da arena.
+    start = arena_offset + offset
+    question_len, answer_len = _FAQ_RECORD_HEADER.unpack_from(buffer, start)
+    start += _FAQ_RECORD_HEADER.size
+    return bytes(buffer[start : start + question_len]), start + question_len, answer_len
+
+
+class FaqAnswerIndex(Mapping[str, str]):
+    """Índice pergunta -> resposta em disco, lido via mmap sem materializar o FAQ."""
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as file_obj:
+            self._mm = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, self._slots, self._count, self._arena = _FAQ_INDEX_HEADER.unpack_from(
+                self._mm, 0
+            )
+        except struct.error as exc:
+            raise RuntimeConfigError("FAQ index invalid") from exc
+        if magic != FAQ_INDEX_MAGIC:
+            raise RuntimeConfigError("FAQ index invalid")
+        self.path = path
+
+    def _find(self, question: str) -> int | None:
+        encoded = question.encode("utf-8")
+        key_hash = _faq_key_hash(encoded)
+        mask = self._slots - 1
+        slot = key_hash & mask
+        while True:
+            stored_hash, stored_offset = _FAQ_SLOT.unpack_from(
+                self._mm, _FAQ_INDEX_HEADER.size + slot * _FAQ_SLOT.size
+            )
+            if stored_offset == 0:
+                return None
+            if (
+                stored_hash == key_hash
+                and _faq_arena_record(self._mm, self._arena, stored_offset - 1)[0]
+                == encoded
+            ):
+                return stored_offset - 1
+            slot = (slot + 1) & mask
+
+    def __getitem__(self, question: str) -> str:
+        offset = self._find(question) if isinstance(question, str) else None
+        if offset is None:
+            raise KeyError(question)
+        _, start, answer_len = _faq_arena_record(self._mm, self._arena, offset)
+        return self._mm[start : start + answer_len].decode("utf-8")
+
+    def __contains__(self, question: object) -> bool:
+        return isinstance(question, str) and self._find(question) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for slot in range(self._slots):
+            _, stored_offset = _FAQ_SLOT.unpack_from(
+                self._mm, _FAQ_INDEX_HEADER.size + slot * _FAQ_SLOT.size
+            )
+            if stored_offset:
+                question, _, _ = _faq_arena_record(self._mm, self._arena, stored_offset - 1)
+                yield question.decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def footprint(self) -> dict[str, Any]:
+        return {
+            "layout": "disk",
+            "entries": self._count,
+            "resident_bytes": 0,
+            "mapped_bytes": len(self._mm),
+        }
+
+
+def _answer_zdict(answers: list[bytes]) -> bytes:
+    # Dicionário compartilhado: amostra uniforme das respostas até a janela do deflate.
+    total = sum(len(answer) for answer in answers)
+    step = max(1, math.ceil(total / FAQ_ZDICT_MAX_BYTES))
+    return b"".join(answers[::step])[-FAQ_ZDICT_MAX_BYTES:]
+
+
+class PackedFaqAnswers(Mapping[str, str]):
+    """Perguntas e respostas em um único buffer UTF-8, com hashes ordenados e offsets em array."""
+
+    def __init__(self, answers: dict[str, str], *, compression: str = "none") -> None:
+        entries = sorted(
+            (
+                (_faq_key_hash(question.encode("utf-8")), question.encode("utf-8"), answer)
+                for question, answer in answers.items()
+            ),
+            key=lambda entry: entry[0],
+        )
+        encoded_answers = [answer.encode("utf-8") for _, _, answer in entries]
+        self._zdict = _answer_zdict(encoded_answers) if compression == "zlib" else b""
+        self._hashes = array("Q", (key_hash for key_hash, _, _ in entries))
+        # Entrada i: pergunta em [offsets[2i], offsets[2i+1]), resposta até offsets[2i+2].
+        self._offsets = array("Q", [0])
+        self._compressed = bytearray(len(entries))
+        # Compressor já carregado com o dicionário; copy() evita reprocessá-lo a cada entrada.
+        primed = (
+            zlib.compressobj(9, zlib.DEFLATED, -15, zdict=self._zdict) if self._zdict else None
+        )
+        parts: list[bytes] = []
+        size = 0
+        pairs = zip(entries, encoded_answers, strict=True)
+        for index, ((_, question, _), answer) in enumerate(pairs):
+            if primed is not None:
+                compressor = primed.copy()
+                packed = compressor.compress(answer) + compressor.flush()
+                if len(packed) < len(answer):
+                    answer = packed
+                    self._compressed[index] = 1
+            parts.extend((question, answer))
+            size += len(question)
+            self._offsets.append(size)
+            size += len(answer)
+            self._offsets.append(size)
+        self._buffer = b"".join(parts)
+        self._dict_bytes = sys.getsizeof(answers) + sum(
+            sys.getsizeof(question) + sys.getsizeof(answer)
+            for question, answer in answers.items()
+        )
+
+    def _find(self, question: str) -> int | None:
+        encoded = question.encode("utf-8")
+        key_hash = _faq_key_hash(encoded)
+        index = bisect_left(self._hashes, key_hash)
+        while index < len(self._hashes) and self._hashes[index] == key_hash:
+            if self._buffer[self._offsets[2 * index] : self._offsets[2 * index + 1]] == encoded:
+                return index
+            index += 1
+        return None
+
+    def __getitem__(self, question: str) -> str:
+        index = self._find(question) if isinstance(question, str) else None
+        if index is None:
+            raise KeyError(question)
+        answer = self._buffer[self._offsets[2 * index + 1] : self._offsets[2 * index + 2]]
+        if self._compressed[index]:
+            answer = zlib.decompressobj(-15, zdict=self._zdict).decompress(answer)
+        return answer.decode("utf-8")
+
+    def __contains__(self, question: object) -> bool:
+        return isinstance(question, str) and self._find(question) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self._hashes)):
+            start, end = self._offsets[2 * index], self._offsets[2 * index + 1]
+            yield self._buffer[start:end].decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def footprint(self) -> dict[str, Any]:
+        return {
+            "layout": "packed",
+            "entries": len(self._hashes),
+            "compressed_entries": sum(self._compressed),
+            "dict_bytes": self._dict_bytes,
+            "resident_bytes": sum(
+                sys.getsizeof(part)
+                for part in (self._buffer, self._hashes, self._offsets, self._compressed)
+            )
+            + len(self._zdict),
+        }
+
+
+def build_faq_disk_index(bundle_path: Path, destination: Path) -> None:
+    # Formato: cabeçalho, tabela hash de slots (hash, offset + 1) com carga <= 0.5 e arena de
+    # registros (len pergunta, len resposta, bytes). 1ª passada grava arena e pares em
+    # arquivos temporários; 2ª preenche a tabela via mmap. Pergunta repetida: vale a última,
+    # como no dict.
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=destination.parent) as work_dir:
+        arena_path = Path(work_dir) / "arena"
+        pairs_path = Path(work_dir) / "pairs"
+        records = 0
+        arena_size = 0
+        with arena_path.open("wb") as arena, pairs_path.open("wb") as pairs:
+            for question, answer in iter_faq_records(bundle_path):
+                encoded_question = question.encode("utf-8")
+                encoded_answer = answer.encode("utf-8")
+                pairs.write(_FAQ_SLOT.pack(_faq_key_hash(encoded_question), arena_size + 1))
+                arena.write(
+                    _FAQ_RECORD_HEADER.pack(len(encoded_question), len(encoded_answer))
+                )
+                arena.write(encoded_question)
+                arena.write(encoded_answer)
+                arena_size += (
+                    _FAQ_RECORD_HEADER.size + len(encoded_question) + len(encoded_answer)
+                )
+                records += 1
+
+        slots = 8
+        while slots < 2 * records:
+            slots <<= 1
+        arena_offset = _FAQ_INDEX_HEADER.size + slots * _FAQ_SLOT.size
+        index_path = Path(work_dir) / "index"
+        with index_path.open("w+b") as index_file:
+            index_file.truncate(arena_offset)
+            index_file.seek(arena_offset)
+            with arena_path.open("rb") as arena:
+                shutil.copyfileobj(arena, index_file)
+            index_file.flush()
+            with mmap.mmap(index_file.fileno(), 0) as mm, pairs_path.open("rb") as pairs:
+                unique = 0
+                mask = slots - 1
+                while chunk := pairs.read(_FAQ_SLOT.size * 4096):
+                    for key_hash, offset in _FAQ_SLOT.iter_unpack(chunk):
+                        question = _faq_arena_record(mm, arena_offset, offset - 1)[0]
+                        slot = key_hash & mask
+                        while True:
+                            position = _FAQ_INDEX_HEADER.size + slot * _FAQ_SLOT.size
+                            stored_hash, stored_offset = _FAQ_SLOT.unpack_from(mm, position)
+                            if stored_offset == 0:
+                                unique += 1
+                                break
+                            if (
+                                stored_hash == key_hash
+                                and _faq_arena_record(mm, arena_offset, stored_offset - 1)[0]
+                                == question
+                            ):
+                                break
+                            slot = (slot + 1) & mask
+                        _FAQ_SLOT.pack_into(mm, position, key_hash, offset)
+                # Cabeçalho por último: índice só é válido depois de completo.
+                _FAQ_INDEX_HEADER.pack_into(
+                    mm, 0, FAQ_INDEX_MAGIC, slots, unique, arena_offset
+                )
+                mm.flush()
+        os.replace(index_path, destination)
+
+
+def _faq_index_path(bundle_path: Path, bundle_id: str, files: list[Path]) -> Path:
+    # O mesmo bundle_id pode apontar para paths diferentes (bundles-fonte, testes): o nome
+    # inclui o path e (tamanho, mtime) dos arquivos de dados.
+    hasher = hashlib.sha256(str(bundle_path.resolve()).encode("utf-8"))
+    for path in files:
+        stat = path.stat()
+        hasher.update(f"\0{path.name}\0{stat.st_size}\0{stat.st_mtime_ns}".encode())
+    return (
+        _bundle_root() / FAQ_INDEX_DIRNAME / f"{bundle_id}-{hasher.hexdigest()[:16]}.idx"
     )
-    return {item["question"]: item["answer"] for item in faq_data}
 
 
-def load_intent_questions(bundle_path: Path, intent_name: str) -> set[str]:
+def _remove_faq_indexes(bundle_id: str) -> None:
+    for path in (_bundle_root() / FAQ_INDEX_DIRNAME).glob(f"{bundle_id}-{'?' * 16}.idx"):
+        path.unlink(missing_ok=True)
+
+
+def _resolve_faq_compression() -> str:
+    compression = os.getenv(FAQ_ANSWER_COMPRESSION_ENV) or "none"
+    if compression not in ("none", "zlib"):
+        raise RuntimeConfigError("FAQ answer compression invalid")
+    return compression
+
+
+def load_faq_index(bundle_path: Path, bundle_id: str) -> PackedFaqAnswers | FaqAnswerIndex:
+    # FAQs pequenos ficam empacotados em memória; a partir do limite, tabela hash em disco
+    # montada uma vez (compartilhada entre workers pelo page cache) e lida via mmap.
+    files = faq_data_files(bundle_path)
+    min_bytes = (
+        _resolve_optional_positive_int_env(
+            FAQ_DISK_INDEX_MIN_BYTES_ENV, "FAQ disk index threshold invalid"
+        )
+        or DEFAULT_FAQ_DISK_INDEX_MIN_BYTES
+    )
+    if sum(path.stat().st_size for path in files) < min_bytes:
+        return PackedFaqAnswers(
+            dict(iter_faq_records(bundle_path)), compression=_resolve_faq_compression()
+        )
+    index_path = _faq_index_path(bundle_path, bundle_id, files)
+    if index_path.is_file():
+        try:
+            return FaqAnswerIndex(index_path)
+        except (RuntimeConfigError, OSError, ValueError):
+            logger.warning("FAQ index for %s is invalid; rebuilding", bundle_id)
+    build_faq_disk_index(bundle_path, index_path)
+    return FaqAnswerIndex(index_path)
+
+
+def normalize_question(text: str) -> str:
+    # NFKC + casefold, remove acentos (marcas combinantes após NFKD), troca pontuação por
+    # espaço e colapsa espaços.
+    folded = unicodedata.normalize("NFKD", unicodedata.normalize("NFKC", text).casefold())
+    chars = []
+    for char in folded:
+        category = unicodedata.category(char)
+        if category == "Mn":
+            continue
+        chars.append(" " if category.startswith("P") else char)
+    return " ".join("".join(chars).split())
+
+
+def load_intent_match(bundle_path: Path, intent_name: str) -> dict[str, Any]:
     ontology = _load_yaml_file(bundle_path / "ontology" / "ontology.yaml")
     intents = ontology.get("intents", [])
     for intent in intents:
         if intent.get("name") == intent_name:
             match = intent.get("match", {})
-            if match.get("type") != "exact":
-                raise RuntimeConfigError("Intent match type must be exact for demo")
-            return set(match.get("questions", []))
+            if match.get("type") not in INTENT_MATCH_TYPES:
+                raise RuntimeConfigError(
+                    "Intent match type must be exact, normalized, lexical, keyword or regex"
+                )
+            return match
     raise RuntimeConfigError("Intent not found in ontology")
 
 
-def load_response_validator(bundle_path: Path) -> Draft202012Validator:
+def load_ontology_intents(bundle_path: Path) -> list[dict[str, Any]]:
+    ontology = _load_yaml_file(bundle_path / "ontology" / "ontology.yaml")
+    intents = ontology.get("intents", [])
+    if not isinstance(intents, list) or not intents:
+        raise RuntimeConfigError("Intent not found in ontology")
+    names: set[str] = set()
+    for intent in intents:
+        name = intent.get("name") if isinstance(intent, dict) else None
+        if not isinstance(name, str) or not name or name in names:
+            raise RuntimeConfigError("Ontology intents invalid")
+        names.add(name)
+        if not isinstance(intent.get("match"), dict):
+            raise RuntimeConfigError("Ontology intents invalid")
+        if intent["match"].get("type") not in INTENT_MATCH_TYPES:
+            raise RuntimeConfigError(
+                "Intent match type must be exact, normalized, lexical, keyword or regex"
+            )
+        priority = intent.get("priority", 0)
+        if isinstance(priority, bool) or not isinstance(priority, int):
+            raise RuntimeConfigError("Ontology intents invalid")
+        if not isinstance(intent.get("answer", ""), str):
+            raise RuntimeConfigError("Ontology intents invalid")
+    return intents
+
+
+_REGEX_GLOBAL_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+
+
+def _scope_regex_flags(pattern: str) -> str:
+    # Flags globais ("(?i)preço") só valem no início da regex inteira; na alternação única
+    # viram um grupo com flags locais, "(?i:preço)", com o mesmo efeito sobre o padrão.
+    flags = ""
+    position = 0
+    while match := _REGEX_GLOBAL_FLAGS.match(pattern, position):
+        flags += match.group(1)
+        position = match.end()
+    body = pattern[position:]
+    if "x" in flags:
+        # Um comentário no fim do padrão verbose engoliria o ")" do grupo.
+        body += "\n"
+    return f"(?{''.join(dict.fromkeys(flags))}:{body})" if flags else f"(?:{body})"
+
+
+def _regex_references_groups(pattern: str) -> bool:
+    # Backreference numerada (\1..\99 fora de classe) ou condicional por grupo "(?(1)...)".
+    in_class = False
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            following = pattern[index + 1 : index + 2]
+            if not in_class and following.isdigit() and following != "0":
+                octal = pattern[index + 1 : index + 4]
+                if not (len(octal) == 3 and all(c in "01234567" for c in octal)):
+                    return True
+            index += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+            # "]" logo após "[" ou "[^" é literal.
+            if pattern.startswith("]", index + 1):
+                index += 1
+            elif pattern.startswith("^]", index + 1):
+                index += 2
+        elif pattern.startswith("(?(", index):
+            return True
+        index += 1
+    return False
+
+
+def build_intent_router(intents: list[dict[str, Any]]) -> IntentRouter:
+    question_intents = [
+        index
+        for index, intent in enumerate(intents)
+        if intent["match"]["type"] in QUESTION_MATCH_TYPES
+    ]
+    if len(question_intents) > 1:
+        raise RuntimeConfigError("Ontology must declare at most one question intent")
+    priorities = tuple(intent.get("priority", 0) for intent in intents)
+    keywords: list[tuple[str, int]] = []
+    alternatives: list[tuple[int, str]] = []
+    for index, intent in enumerate(intents):
+        match = intent["match"]
+        if match["type"] == "keyword":
+            values = match.get("keywords")
+            if not isinstance(values, list) or not values:
+                raise RuntimeConfigError("Intent keywords invalid")
+            for value in values:
+                keyword = normalize_question(value) if isinstance(value, str) else ""
+                if not keyword:
+                    raise RuntimeConfigError("Intent keywords invalid")
+                keywords.append((f" {keyword} ", index))
+        elif match["type"] == "regex":
+            patterns = match.get("patterns")
+            if not isinstance(patterns, list) or not patterns:
+                raise RuntimeConfigError("Intent regex invalid")
+            for pattern in patterns:
+                try:
+                    compiled = re.compile(pattern)
+                except (re.error, TypeError) as exc:
+                    raise RuntimeConfigError("Intent regex invalid") from exc
+                # Grupos nomeados colidiriam na alternação única.
+                if compiled.groupindex:
+                    raise RuntimeConfigError("Intent regex invalid")
+                # Na alternação única a numeração dos grupos muda: \1 ou (?(1)...) passariam
+                # a apontar para o grupo de outro padrão.
+                if _regex_references_groups(pattern):
+                    raise RuntimeConfigError("Intent regex backreferences not supported")
+            joined = "|".join(_scope_regex_flags(pattern) for pattern in patterns)
+            alternatives.append((index, f"(?=(?P<intent_{index}>{joined}))"))
+    alternatives.sort(key=lambda item: (-priorities[item[0]], item[0]))
+    try:
+        regex = (
+            re.compile("|".join(pattern for _, pattern in alternatives)) if alternatives else None
+        )
+    except re.error as exc:
+        raise RuntimeConfigError("Intent regex invalid") from exc
+    return IntentRouter(
+        names=tuple(intent["name"] for intent in intents),
+        priorities=priorities,
+        answers=tuple(intent.get("answer", "") for intent in intents),
+        question_intent=question_intents[0] if question_intents else None,
+        keywords=KeywordAutomaton(keywords) if keywords else None,
+        regex=regex,
+    )
+
+
+def load_intent_questions(bundle_path: Path, intent_name: str) -> set[str]:
+    return set(load_intent_match(bundle_path, intent_name).get("questions", []))
+
+
+def build_lexical_index(questions: set[str], threshold: Any) -> LexicalIndex:
+    # Threshold obrigatório e positivo: além de filtrar, limita o trabalho por request
+    # (termos comuns sozinhos não geram candidatos).
+    if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or threshold <= 0:
+        raise RuntimeConfigError("Intent lexical threshold invalid")
+    ordered = tuple(sorted(questions))
+    documents = [normalize_question(question).split() for question in ordered]
+    doc_lengths = array("I", (len(terms) for terms in documents))
+    average_length = (sum(doc_lengths) / len(documents)) if documents else 0.0
+    frequencies: dict[str, list[tuple[int, int]]] = {}
+    for doc_id, terms in enumerate(documents):
+        counts: dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, term_frequency in counts.items():
+            frequencies.setdefault(term, []).append((doc_id, term_frequency))
+    idf: dict[str, float] = {}
+    postings: dict[str, tuple[array, array]] = {}
+    max_weights: dict[str, float] = {}
+    for term, entries in frequencies.items():
+        idf[term] = math.log(1 + (len(documents) - len(entries) + 0.5) / (len(entries) + 0.5))
+        weights = array("d")
+        for doc_id, term_frequency in entries:
+            saturation = BM25_K1 * (
+                1 - BM25_B + BM25_B * doc_lengths[doc_id] / average_length
+            )
+            weights.append(
+                idf[term] * term_frequency * (BM25_K1 + 1) / (term_frequency + saturation)
+            )
+        postings[term] = (array("I", (doc_id for doc_id, _ in entries)), weights)
+        max_weights[term] = max(weights)
+    return LexicalIndex(
+        questions=ordered,
+        doc_lengths=doc_lengths,
+        idf=idf,
+        postings=postings,
+        max_weights=max_weights,
+        threshold=float(threshold),
+    )
+
+
+def match_lexical(
+    index: LexicalIndex, question: str, *, normalized: str | None = None
+) -> str | None:
+    if normalized is None:
+        normalized = normalize_question(question)
+    # Termos do maior para o menor peso máximo (empate pelo termo, para somas determinísticas).
+    terms = sorted(
+        {term for term in normalized.split() if term in index.postings},
+        key=lambda term: (-index.max_weights[term], term),
+    )
+    upper_bounds = [0.0] * (len(terms) + 1)
+    for position in range(len(terms) - 1, -1, -1):
+        upper_bounds[position] = upper_bounds[position + 1] + index.max_weights[terms[position]]
+    scores: dict[int, float] = {}
+    for position, term in enumerate(terms):
+        doc_ids, weights = index.postings[term]
+        best = max(scores.values(), default=0.0)
+        if upper_bounds[position] < index.threshold or best > upper_bounds[position]:
+            # MaxScore: quem ainda não pontuou não alcança o threshold nem o melhor; só os
+            # candidatos que ainda podem chegar lá são atualizados (busca binária na posting).
+            floor = max(best, index.threshold) - upper_bounds[position]
+            scores = {doc_id: score for doc_id, score in scores.items() if score >= floor}
+            for doc_id in scores:
+                slot = bisect_left(doc_ids, doc_id)
+                if slot < len(doc_ids) and doc_ids[slot] == doc_id:
+                    scores[doc_id] += weights[slot]
+        else:
+            for doc_id, weight in zip(doc_ids, weights, strict=True):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+    if not scores:
+        return None
+    best_doc = min(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+    if scores[best_doc] < index.threshold:
+        return None
+    return index.questions[best_doc]
+
+
+def build_question_index(match_type: str, questions: set[str]) -> dict[str, str]:
+    if match_type == "exact":
+        return {question: question for question in questions}
+    if match_type == "lexical":
+        return {}
+    index: dict[str, str] = {}
+    for question in sorted(questions):
+        key = normalize_question(question)
+        if key in index:
+            raise RuntimeConfigError("Intent questions collide after normalization")
+        index[key] = question
+    return index
+
+
+def _hashed_ngram_counts(text: str) -> dict[int, int]:
+    # crc32 (e não hash()) para o bucket ser estável entre processos.
+    padded = f" {normalize_question(text)} "
+    counts: dict[int, int] = {}
+    for start in range(len(padded) - SUGGESTION_NGRAM + 1):
+        gram = padded[start : start + SUGGESTION_NGRAM]
+        bucket = zlib.crc32(gram.encode("utf-8")) % SUGGESTION_HASH_BUCKETS
+        counts[bucket] = counts.get(bucket, 0) + 1
+    return counts
+
+
+def _tfidf_unit_vector(
+    counts: dict[int, int], idf: dict[int, float], unseen_idf: float
+) -> dict[int, float]:
+    vector = {bucket: count * idf.get(bucket, unseen_idf) for bucket, count in counts.items()}
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    if not norm:
+        return {}
+    return {bucket: weight / norm for bucket, weight in vector.items()}
+
+
+def build_suggestion_index(questions: set[str], config: Any) -> SuggestionIndex:
+    if not isinstance(config, dict):
+        raise RuntimeConfigError("Intent suggestions config invalid")
+    top_k = config.get("top_k", 3)
+    min_similarity = config.get("min_similarity", 0.3)
+    if isinstance(top_k, bool) or not isinstance(top_k, int) or not 1 <= top_k <= 20:
+        raise RuntimeConfigError("Intent suggestions config invalid")
+    if (
+        isinstance(min_similarity, bool)
+        or not isinstance(min_similarity, (int, float))
+        or not 0 < min_similarity <= 1
+    ):
+        raise RuntimeConfigError("Intent suggestions config invalid")
+    ordered = tuple(sorted(questions))
+    documents = [_hashed_ngram_counts(question) for question in ordered]
+    document_frequency: dict[int, int] = {}
+    for counts in documents:
+        for bucket in counts:
+            document_frequency[bucket] = document_frequency.get(bucket, 0) + 1
+    idf = {
+        bucket: math.log(1 + len(documents) / frequency)
+        for bucket, frequency in document_frequency.items()
+    }
+    # Buckets comuns demais não viram coluna (seriam quase todo o custo da consulta), mas
+    # continuam na norma: o score fica abaixo do cosseno real, nunca acima.
+    max_df = max(SUGGESTION_MAX_DF_FLOOR, int(SUGGESTION_MAX_DF_RATIO * len(documents)))
+    unseen_idf = math.log(1 + len(documents))
+    columns: dict[int, tuple[array, array]] = {}
+    for doc_id, counts in enumerate(documents):
+        for bucket, weight in _tfidf_unit_vector(counts, idf, unseen_idf).items():
+            if document_frequency[bucket] > max_df:
+                continue
+            column = columns.get(bucket)
+            if column is None:
+                column = columns[bucket] = (array("I"), array("d"))
+            column[0].append(doc_id)
+            column[1].append(weight)
+    return SuggestionIndex(
+        questions=ordered,
+        columns=columns,
+        max_weights={bucket: max(column[1]) for bucket, column in columns.items()},
+        idf=idf,
+        top_k=top_k,
+        min_similarity=float(min_similarity),
+    )
+
+
+def _resolve_suggestions_max_seconds() -> float:
+    return (
+        _resolve_positive_float_env(
+            SUGGESTIONS_MAX_MS_ENV,
+            DEFAULT_SUGGESTIONS_MAX_MS,
+            "Suggestions latency cap invalid",
+        )
+        / 1000
+    )
+
+
+def suggest_questions(
+    index: SuggestionIndex, question: str, *, max_seconds: float
+) -> list[dict[str, Any]] | None:
+    # None = limite de latência estourado; nada de resultado parcial, que dependeria do tempo.
+    started_at = time.perf_counter()
+    query = {
+        bucket: weight
+        for bucket, weight in _tfidf_unit_vector(
+            _hashed_ngram_counts(question), index.idf, math.log(1 + len(index.questions))
+        ).items()
+        if bucket in index.columns
+    }
+    # Colunas da maior para a menor contribuição possível (empate pelo bucket): somas sempre
+    # na mesma ordem.
+    buckets = sorted(query, key=lambda bucket: (-query[bucket] * index.max_weights[bucket], bucket))
+    upper_bounds = [0.0] * (len(buckets) + 1)
+    for position in range(len(buckets) - 1, -1, -1):
+        bucket = buckets[position]
+        upper_bounds[position] = (
+            upper_bounds[position + 1] + query[bucket] * index.max_weights[bucket]
+        )
+    scores: dict[int, float] = {}
+    for position, bucket in enumerate(buckets):
+        if time.perf_counter() - started_at > max_seconds:
+            with _SUGGESTION_LOCK:
+                SUGGESTION_COUNTERS["capped"] += 1
+            return None
+        doc_ids, weights = index.columns[bucket]
+        query_weight = query[bucket]
+        if upper_bounds[position] < index.min_similarity:
+            # Quem ainda não pontuou não chega a min_similarity: só candidatos viáveis são
+            # atualizados (busca binária na coluna).
+            floor = index.min_similarity - upper_bounds[position]
+            scores = {doc_id: score for doc_id, score in scores.items() if score >= floor}
+            for doc_id in scores:
+                slot = bisect_left(doc_ids, doc_id)
+                if slot < len(doc_ids) and doc_ids[slot] == doc_id:
+                    scores[doc_id] += query_weight * weights[slot]
+        else:
+            for doc_id, weight in zip(doc_ids, weights, strict=True):
+                scores[doc_id] = scores.get(doc_id, 0.0) + query_weight * weight
+    ranked = heapq.nsmallest(
+        index.top_k,
+        (
+            (-score, doc_id)
+            for doc_id, score in scores.items()
+            if score >= index.min_similarity
+        ),
+    )
+    with _SUGGESTION_LOCK:
+        SUGGESTION_COUNTERS["computed"] += 1
+    return [
+        {"question": index.questions[doc_id], "similarity": round(-score, 4)}
+        for score, doc_id in ranked
+    ]
+
+
+def lookup_question(
+    compiled: CompiledBundle, question: str, *, normalized: str | None = None
+) -> str | None:
+    if compiled.match_type != "exact" and normalized is None:
+        normalized = normalize_question(question)
+    if compiled.lexical_index is not None:
+        return match_lexical(compiled.lexical_index, question, normalized=normalized)
+    key = normalized if compiled.match_type == "normalized" else question
+    return compiled.question_index.get(key)  # type: ignore[arg-type]
+
+
+def load_response_schema(bundle_path: Path) -> Any:
     schema = _load_yaml_file(bundle_path / "entities" / "faq_answer.schema.yaml")
-    return Draft202012Validator(schema)
+    try:
+        Draft202012Validator.check_schema(schema)
+    except SchemaError as exc:
+        raise RuntimeConfigError("Response schema invalid") from exc
+    return schema
+
+
+def _string_value_checks(
+    schema: Any,
+    domain: frozenset[str] | None,
+    subject: str,
+    root: Any,
+    refs: tuple[str, ...] = (),
+) -> list[str] | None:
+    # Fontes Python sobre a variável `subject` que um valor string precisa passar; None quando
+    # o schema usa keyword fora do subconjunto suportado. Com domínio finito, checks que todo
+    # valor do domínio passa já ficam provados aqui.
+    if schema is True:
+        return []
+    if schema is False:
+        return ["False"]
+    if not isinstance(schema, dict):
+        return None
+
+    def _branch(subschema: Any, branch_refs: tuple[str, ...]) -> list[str] | None:
+        return _string_value_checks(subschema, domain, subject, root, branch_refs)
+
+    checks: list[str] = []
+    for keyword, expected in schema.items():
+        if keyword == "$id" and schema is not root:
+            # $id aninhado muda a base das referências: fica com o jsonschema.
+            return None
+        if keyword in RESPONSE_SCHEMA_ANNOTATIONS or keyword in RESPONSE_SCHEMA_NON_STRING:
+            continue
+        if keyword in RESPONSE_SCHEMA_APPLICATORS:
+            applied = _applicator_checks(schema, keyword, root, refs, _branch)
+            if applied is None:
+                return None
+            checks.extend(applied)
+        elif keyword == "type":
+            types = [expected] if isinstance(expected, str) else expected
+            if "string" not in types:
+                checks.append("False")
+        elif keyword == "enum":
+            allowed = frozenset(item for item in expected if isinstance(item, str))
+            checks.append(f"{subject} in {sorted(allowed)!r}")
+        elif keyword == "const":
+            checks.append(f"{subject} == {expected!r}" if isinstance(expected, str) else "False")
+        elif keyword == "minLength" and type(expected) is int:
+            checks.append(f"len({subject}) >= {expected}")
+        elif keyword == "maxLength" and type(expected) is int:
+            checks.append(f"len({subject}) <= {expected}")
+        elif keyword == "pattern" and isinstance(expected, str):
+            # jsonschema também usa re.search do Python: a semântica é a mesma.
+            try:
+                re.compile(expected)
+            except re.error:
+                return None
+            checks.append(f"re.search({expected!r}, {subject}) is not None")
+        else:
+            return None
+    if domain is None:
+        return checks
+    unproven = []
+    for source in checks:
+        predicate = eval(f"lambda {subject}: {source}", {"re": re})
+        if not all(predicate(value) for value in domain):
+            unproven.append(source)
+    return unproven
+
+
+def _applicator_checks(
+    schema: dict[str, Any],
+    keyword: str,
+    root: Any,
+    refs: tuple[str, ...],
+    branch: Callable[[Any, tuple[str, ...]], list[str] | None],
+) -> list[str] | None:
+    # Composição e referências locais: cada subschema vira uma conjunção de checks do mesmo
+    # nível (valor ou objeto) e as conjunções são combinadas em uma expressão Python.
+    if keyword == "$ref":
+        target = _resolve_local_schema_ref(root, schema[keyword], refs)
+        if target is None:
+            return None
+        return branch(target, (*refs, schema[keyword]))
+    if keyword in ("then", "else"):
+        # Avaliados junto do if; sem if, não têm efeito.
+        return []
+    if keyword == "not":
+        subschemas = [schema[keyword]]
+    elif keyword == "if":
+        subschemas = [schema["if"], schema.get("then", True), schema.get("else", True)]
+    else:
+        subschemas = schema[keyword]
+    branches = [branch(subschema, refs) for subschema in subschemas]
+    if any(checks is None for checks in branches):
+        return None
+    if keyword == "allOf":
+        return [source for checks in branches for source in checks or ()]
+    conjunctions = [
+        "(" + " and ".join(f"({source})" for source in checks) + ")" if checks else "True"
+        for checks in branches
+    ]
+    if keyword == "not":
+        return [f"not {conjunctions[0]}"]
+    if keyword == "anyOf":
+        return [] if "True" in conjunctions else [" or ".join(conjunctions)]
+    if keyword == "oneOf":
+        return [f"({' + '.join(conjunctions)}) == 1"]
+    condition, then_source, else_source = conjunctions
+    if then_source == else_source == "True":
+        return []
+    return [f"({then_source} if {condition} else {else_source})"]
+
+
+def _resolve_local_schema_ref(root: Any, ref: Any, refs: tuple[str, ...]) -> Any:
+    # Só JSON pointers no próprio schema; referências externas, âncoras e ciclos ficam com o
+    # jsonschema (None).
+    if not isinstance(ref, str) or ref in refs or not (ref == "#" or ref.startswith("#/")):
+        return None
+    node = root
+    for token in ref[2:].split("/") if ref != "#" else ():
+        token = urllib_parse.unquote(token).replace("~1", "/").replace("~0", "~")
+        if isinstance(node, dict) and token in node:
+            node = node[token]
+        elif isinstance(node, list) and token.isdigit() and int(token) < len(node):
+            node = node[int(token)]
+        else:
+            return None
+    return node
+
+
+def _payload_subject(domains: dict[str, frozenset[str] | None], name: str) -> str:
+    return f"value{list(domains).index(name)}"
+
+
+def _payload_checks(
+    schema: Any,
+    domains: dict[str, frozenset[str] | None],
+    root: Any,
+    refs: tuple[str, ...] = (),
+) -> list[str] | None:
+    # Fontes Python ainda não provadas, sobre as variáveis de _payload_subject. As chaves do
+    # payload são fixas: keywords sobre nomes de propriedades se decidem aqui.
+    if schema is True:
+        return []
+    if schema is False:
+        return ["False"]
+    if not isinstance(schema, dict):
+        return None
+
+    def _branch(subschema: Any, branch_refs: tuple[str, ...]) -> list[str] | None:
+        return _payload_checks(subschema, domains, root, branch_refs)
+
+    properties = schema.get("properties", {})
+    try:
+        patterns = [re.compile(pattern) for pattern in schema.get("patternProperties", {})]
+    except re.error:
+        return None
+    checks: list[str] = []
+    for keyword, expected in schema.items():
+        if keyword == "$id" and schema is not root:
+            return None
+        if keyword in RESPONSE_SCHEMA_ANNOTATIONS or keyword in RESPONSE_SCHEMA_NON_OBJECT:
+            continue
+        value_schemas: list[tuple[str, Any]] = []
+        if keyword in RESPONSE_SCHEMA_APPLICATORS:
+            applied = _applicator_checks(schema, keyword, root, refs, _branch)
+            if applied is None:
+                return None
+            checks.extend(applied)
+        elif keyword == "type":
+            types = [expected] if isinstance(expected, str) else expected
+            if "object" not in types:
+                checks.append("False")
+        elif keyword == "required":
+            if any(name not in domains for name in expected):
+                checks.append("False")
+        elif keyword == "dependentRequired":
+            if any(
+                name in domains and dependency not in domains
+                for name, dependencies in expected.items()
+                for dependency in dependencies
+            ):
+                checks.append("False")
+        elif keyword == "dependentSchemas":
+            for name, subschema in expected.items():
+                dependent = _branch(subschema, refs) if name in domains else []
+                if dependent is None:
+                    return None
+                checks.extend(dependent)
+        elif keyword == "propertyNames":
+            name_checks = _string_value_checks(expected, frozenset(domains), "value", root, refs)
+            if name_checks is None:
+                return None
+            if name_checks:
+                checks.append("False")
+        elif keyword == "minProperties" and type(expected) is int:
+            if len(domains) < expected:
+                checks.append("False")
+        elif keyword == "maxProperties" and type(expected) is int:
+            if len(domains) > expected:
+                checks.append("False")
+        elif keyword == "properties":
+            value_schemas = [(name, expected[name]) for name in domains if name in expected]
+        elif keyword == "patternProperties":
+            value_schemas = [
+                (name, subschema)
+                for pattern, subschema in zip(patterns, expected.values(), strict=True)
+                for name in domains
+                if pattern.search(name)
+            ]
+        elif keyword == "additionalProperties":
+            value_schemas = [
+                (name, expected)
+                for name in domains
+                if name not in properties and not any(p.search(name) for p in patterns)
+            ]
+        else:
+            return None
+        for name, value_schema in value_schemas:
+            value_checks = _string_value_checks(
+                value_schema, domains[name], _payload_subject(domains, name), root, refs
+            )
+            if value_checks is None:
+                return None
+            checks.extend(value_checks)
+    return checks
+
+
+def build_response_check(
+    schema: Any, domains: dict[str, frozenset[str] | None]
+) -> tuple[str, Callable[[dict[str, str]], bool] | None]:
+    # O payload do runtime tem sempre as mesmas chaves string; `domains` traz os valores
+    # possíveis de cada uma (None: qualquer string). "proven": o schema aceita todo payload
+    # possível e não há check por request. "generated": só os checks não provados, compilados
+    # numa função Python. "jsonschema": schema fora do subconjunto suportado (ADR 0042).
+    checks = _payload_checks(schema, domains, schema)
+    if checks is None:
+        return "jsonschema", Draft202012Validator(schema).is_valid
+    if not checks:
+        return "proven", None
+    lines = ["def check(payload):"]
+    for name in domains:
+        subject = _payload_subject(domains, name)
+        if any(re.search(rf"\b{subject}\b", source) for source in checks):
+            lines.append(f"    {subject} = payload[{name!r}]")
+    for source in checks:
+        lines.extend((f"    if not ({source}):", "        return False"))
+    lines.append("    return True")
+    namespace: dict[str, Any] = {"re": re}
+    exec(compile("\n".join(lines), "<response-check>", "exec"), namespace)
+    return "generated", namespace["check"]
+
+
+def _template_cache_key(name: str, source: str) -> str:
+    # A chave ignora o path: bundles com o mesmo template reaproveitam o bytecode.
+    return hashlib.sha256(
+        f"{jinja2.__version__}\0{TEMPLATE_ENV_TAG}\0{name}\0{source}".encode()
+    ).hexdigest()
 
 
-def render_output(bundle_path: Path, payload: dict[str, Any]) -> str:
+class ContentHashBytecodeCache(FileSystemBytecodeCache):
+    """Bytecode Jinja em disco com chave pelo conteúdo do template, compartilhado entre workers."""
+
+    def get_bucket(
+        self, environment: Environment, name: str, filename: str | None, source: str
+    ) -> Bucket:
+        bucket = Bucket(
+            environment, _template_cache_key(name, source), self.get_source_checksum(source)
+        )
+        self.load_bytecode(bucket)
+        return bucket
+
+    def _references_path(self, name: str, source: str) -> Path:
+        return Path(self.directory) / f"__jinja2_{_template_cache_key(name, source)}.refs.json"
+
+    def load_references(self, name: str, source: str) -> list[str] | None:
+        # Templates referenciados por nome fixo, gravados junto do bytecode: com o cache
+        # quente, a compilação do bundle não refaz o parse do template.
+        try:
+            referenced = json.loads(self._references_path(name, source).read_text("utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(referenced, list) or not all(isinstance(r, str) for r in referenced):
+            return None
+        return referenced
+
+    def dump_references(self, name: str, source: str, referenced: list[str]) -> None:
+        try:
+            _write_json_atomic(self._references_path(name, source), referenced)
+        except OSError:
+            logger.warning("template reference cache write failed for %s", name)
+
+
+def _template_bytecode_cache() -> ContentHashBytecodeCache | None:
+    directory = _bundle_root() / TEMPLATE_CACHE_DIRNAME
+    try:
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        cache_stat = directory.stat()
+    except OSError:
+        # Sem diretório gravável o template ainda compila, só não é compartilhado.
+        logger.warning("template bytecode cache unavailable at %s", directory)
+        return None
+    # Bytecode é executado sem verificação: só vale um diretório do próprio usuário do
+    # processo e sem escrita de grupo/outros (mesma regra do cache default do Jinja).
+    if cache_stat.st_uid != os.getuid() or cache_stat.st_mode & 0o022:
+        logger.warning("template bytecode cache at %s is not private; disabled", directory)
+        return None
+    return ContentHashBytecodeCache(str(directory))
+
+
+def _precompile_template(env: Environment, name: str, seen: set[str]) -> None:
+    # Compila (ou carrega do bytecode) o template e os que ele referencia. Referência
+    # dinâmica exigiria compilar no request: o bundle é rejeitado.
+    if name in seen:
+        return
+    seen.add(name)
+    source, _, _ = env.loader.get_source(env, name)  # type: ignore[union-attr]
+    cache = env.bytecode_cache
+    referenced = (
+        cache.load_references(name, source)
+        if isinstance(cache, ContentHashBytecodeCache)
+        else None
+    )
+    if referenced is None:
+        found = list(jinja2_meta.find_referenced_templates(env.parse(source)))
+        if None in found:
+            raise RuntimeConfigError("Template requires runtime compilation")
+        referenced = [str(child) for child in found]
+        if isinstance(cache, ContentHashBytecodeCache):
+            cache.dump_references(name, source, referenced)
+    env.get_template(name)
+    for child in referenced:
+        _precompile_template(env, child, seen)
+
+
+def load_output_template(bundle_path: Path) -> Template:
+    # auto_reload desligado e cache sem limite: depois da compilação do bundle, render não
+    # toca o disco nem recompila (bundles são imutáveis, ADR 0002).
     env = Environment(
         loader=FileSystemLoader(bundle_path / "templates"),
         autoescape=select_autoescape(),
         trim_blocks=True,
         lstrip_blocks=True,
+        auto_reload=False,
+        cache_size=-1,
+        bytecode_cache=_template_bytecode_cache(),
+    )
+    _precompile_template(env, OUTPUT_TEMPLATE_NAME, set())
+    return env.get_template(OUTPUT_TEMPLATE_NAME)
+
+
+def compile_bundle(bundle_path: Path, bundle_id: str) -> CompiledBundle:
+    intents = load_ontology_intents(bundle_path)
+    router = build_intent_router(intents)
+    if router.question_intent is not None:
+        question_intent = intents[router.question_intent]
+        match = question_intent["match"]
+    else:
+        question_intent = intents[0]
+        match = {"type": "exact"}
+    match_type = match["type"]
+    questions = set(match.get("questions", []))
+    response_validation, response_check = build_response_check(
+        load_response_schema(bundle_path),
+        {
+            "answer": None,
+            "intent": frozenset((*router.names, question_intent["name"])),
+            "status": frozenset(("ok", "no_match")),
+        },
+    )
+    if response_validation == "jsonschema":
+        logger.warning(
+            "response schema of bundle %s validated by jsonschema per request", bundle_id
+        )
+    return CompiledBundle(
+        bundle_id=bundle_id,
+        bundle_path=bundle_path,
+        intent_questions=frozenset(questions),
+        answer_map=load_faq_index(bundle_path, bundle_id),
+        response_validation=response_validation,
+        response_check=response_check,
+        template=load_output_template(bundle_path),
+        intent_name=question_intent["name"],
+        router=router,
+        match_type=match_type,
+        question_index=build_question_index(match_type, questions),
+        lexical_index=(
+            build_lexical_index(questions, match.get("threshold"))
+            if match_type == "lexical"
+            else None
+        ),
+        suggestion_index=(
+            build_suggestion_index(questions, question_intent["suggestions"])
+            if router.question_intent is not None and "suggestions" in question_intent
+            else None
+        ),
+        response_cache=ResponseFragmentCache(
+            _resolve_optional_positive_int_env(
+                RESPONSE_CACHE_MAX_ENTRIES_ENV, "Response cache size invalid"
+            )
+            or DEFAULT_RESPONSE_CACHE_MAX_ENTRIES
+        ),
+    )
+
+
+def get_compiled_bundle(bundle_path: Path, bundle_id: str) -> CompiledBundle:
+    # Bundles são imutáveis (ADR 0002): compila uma vez por (bundle_id, path).
+    key = (bundle_id, str(bundle_path))
+    compiled = COMPILED_BUNDLES.get(key)
+    if compiled is not None:
+        return compiled
+
+    def _compile() -> CompiledBundle:
+        with _COMPILE_LOCK:
+            cached = COMPILED_BUNDLES.get(key)
+        if cached is not None:
+            return cached
+        fresh = compile_bundle(bundle_path, bundle_id)
+        with _COMPILE_LOCK:
+            COMPILED_BUNDLES[key] = fresh
+        return fresh
+
+    # Single-flight por bundle: bundles diferentes compilam em paralelo.
+    compiled, _ = COMPILE_FLIGHTS.do(key, _compile)
+    return compiled
+
+
+def compute_execute_result(
+    compiled: CompiledBundle, question: str
+) -> tuple[dict[str, str], str]:
+    router = compiled.router
+    # Normalização uma vez por request, compartilhada por lookup e keywords.
+    normalized = (
+        normalize_question(question)
+        if compiled.match_type != "exact" or router.keywords is not None
+        else None
+    )
+    matched = lookup_question(compiled, question, normalized=normalized)
+    routed = router.route(question, normalized or "", question_matched=matched is not None)
+    if routed is None:
+        payload = {
+            "answer": compiled.answer_map.get(question, ""),
+            "intent": compiled.intent_name,
+            "status": "no_match",
+        }
+    elif routed == router.question_intent:
+        payload = {
+            "answer": compiled.answer_map.get(matched, ""),  # type: ignore[arg-type]
+            "intent": router.names[routed],
+            "status": "ok",
+        }
+    else:
+        payload = {
+            "answer": router.answers[routed],
+            "intent": router.names[routed],
+            "status": "ok",
+        }
+    if compiled.response_check is not None and not compiled.response_check(payload):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Invalid response payload",
+        )
+    return payload, compiled.template.render(**payload)
+
+
+def encode_execute_response(
+    bundle_id: str,
+    payload: dict[str, str],
+    output_text: str,
+    suggestions: list[dict[str, Any]] | None,
+) -> ExecuteResponseFragments:
+    rest: dict[str, Any] = {
+        "intent": payload["intent"],
+        "status": payload["status"],
+        "output_text": output_text,
+        "result": payload,
+    }
+    if suggestions is not None:
+        rest["suggestions"] = suggestions
+    return ExecuteResponseFragments(
+        middle=b',"bundle_id":' + _json_bytes(bundle_id) + b',"tenant_id":',
+        tail=b"," + _json_bytes(rest)[1:],
+    )
+
+
+def prewarm_bundle(
+    bundle_id: str,
+    expected_digest: str | None,
+    expected_tree_digest: str | None = None,
+) -> None:
+    try:
+        bundle_path, _ = ensure_local_bundle(
+            bundle_id,
+            expected_digest=expected_digest,
+            expected_tree_digest=expected_tree_digest,
+        )
+        try:
+            get_compiled_bundle(bundle_path, bundle_id)
+        finally:
+            release_bundle_lease(bundle_path)
+    except Exception as exc:
+        logger.warning("bundle prewarm failed for %s: %s", bundle_id, exc)
+        with _BUNDLE_CACHE_LOCK:
+            BUNDLE_WARMUP_STATUS[bundle_id] = "failed"
+        return
+    with _BUNDLE_CACHE_LOCK:
+        BUNDLE_WARMUP_STATUS[bundle_id] = "warm"
+
+
+def _resolve_warmup_enabled() -> bool:
+    env_value = os.getenv(WARMUP_ENABLED_ENV, "true").strip().lower()
+    if env_value not in {"true", "false", "1", "0"}:
+        raise RuntimeConfigError("Warmup config invalid")
+    return env_value in {"true", "1"}
+
+
+def _warmup_tenant(tenant_id: str) -> dict[str, str]:
+    bundle_path, bundle_id, _, cache_status, _ = resolve_current_bundle(
+        tenant_id, request_id=f"warmup:{tenant_id}"
+    )
+    try:
+        get_compiled_bundle(bundle_path, bundle_id)
+    finally:
+        if cache_status is not None:
+            release_bundle_lease(bundle_path)
+    return {"status": "warm", "bundle_id": bundle_id}
+
+
+def warmup_runtime() -> dict[str, Any]:
+    # Resolve, baixa e compila o current de cada tenant configurado com pool
+    # limitado; /readyz só reporta ready quando a fase termina com pelo menos um
+    # tenant aquecido. Todos falhando (Control Plane fora, origem fora) é falha do nó.
+    with _READINESS_LOCK:
+        RUNTIME_READINESS.update({"status": "warming", "tenants": {}})
+    try:
+        tenant_ids = sorted(load_tenant_keys())
+        workers = (
+            _resolve_optional_positive_int_env(
+                WARMUP_WORKERS_ENV, "Warmup config invalid"
+            )
+            or DEFAULT_WARMUP_WORKERS
+        )
+    except RuntimeConfigError as exc:
+        logger.error("runtime warmup aborted: %s", exc)
+        with _READINESS_LOCK:
+            RUNTIME_READINESS["status"] = "failed"
+            return dict(RUNTIME_READINESS)
+
+    results: dict[str, dict[str, str]] = {}
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="contractor-warmup"
+    ) as pool:
+        futures = {pool.submit(_warmup_tenant, tenant_id): tenant_id for tenant_id in tenant_ids}
+        for future in as_completed(futures):
+            tenant_id = futures[future]
+            try:
+                results[tenant_id] = future.result()
+            except Exception as exc:
+                # Falha de um tenant não bloqueia o warmup (nem a prontidão) dos demais.
+                logger.warning("runtime warmup failed for tenant %s: %s", tenant_id, exc)
+                results[tenant_id] = {"status": "failed"}
+
+    all_failed = bool(results) and all(
+        result["status"] == "failed" for result in results.values()
     )
-    template = env.get_template("faq_answer.j2")
-    return template.render(**payload)
+    with _READINESS_LOCK:
+        RUNTIME_READINESS.update(
+            {
+                "status": "failed" if all_failed else "ready",
+                "tenants": dict(sorted(results.items())),
+            }
+        )
+        return dict(RUNTIME_READINESS)
+
+
+def _run_warmup(retry_interval: float) -> None:
+    # Warmup falho é repetido em background: o nó fica fora do balanceador até um
+    # Control Plane ou origem indisponível voltar, sem precisar de restart.
+    while warmup_runtime()["status"] == "failed" and not _WARMUP_STOP.wait(retry_interval):
+        logger.warning("runtime warmup failed; retrying in %ss", retry_interval)
 
 
 def authenticate(
@@ -593,7 +4216,40 @@ def authenticate(
     return normalized_tenant_id
 
 
-app = FastAPI()
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    to_thread.current_default_thread_limiter().total_tokens = _resolve_runtime_threadpool_size()
+    scrub_interval = _resolve_bundle_scrub_interval()
+    _BUNDLE_SCRUB_STOP.clear()
+    if scrub_interval > 0:
+        threading.Thread(
+            target=_run_bundle_scrub,
+            args=(scrub_interval,),
+            name="contractor-bundle-scrub",
+            daemon=True,
+        ).start()
+    _WARMUP_STOP.clear()
+    if _resolve_warmup_enabled():
+        retry_interval = _resolve_positive_float_env(
+            WARMUP_RETRY_ENV, DEFAULT_WARMUP_RETRY_SECONDS, "Warmup config invalid"
+        )
+        threading.Thread(
+            target=_run_warmup,
+            args=(retry_interval,),
+            name="contractor-warmup",
+            daemon=True,
+        ).start()
+    else:
+        with _READINESS_LOCK:
+            RUNTIME_READINESS.update({"status": "ready", "tenants": {}})
+    try:
+        yield
+    finally:
+        _BUNDLE_SCRUB_STOP.set()
+        _WARMUP_STOP.set()
+
+
+app = FastAPI(lifespan=_lifespan)
 
 
 @app.get("/healthz")
@@ -601,6 +4257,126 @@ def healthz() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/readyz")
+def readyz(response: Response) -> dict[str, Any]:
+    with _READINESS_LOCK:
+        readiness = {
+            "status": RUNTIME_READINESS["status"],
+            "tenants": dict(RUNTIME_READINESS["tenants"]),
+        }
+    if readiness["status"] != "ready":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return readiness
+
+
+def authenticate_internal(authorization: str | None) -> None:
+    # API interna entre nós do Runtime/Control Plane: desabilitada (404) sem token
+    # configurado, fail-closed para credencial ausente ou divergente.
+    expected_token = os.getenv(INTERNAL_TOKEN_ENV)
+    if not expected_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not authorization:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized"
+        )
+    if authorization != f"Bearer {expected_token}":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+@app.get("/internal/bundles/{bundle_id}.tar")
+def get_internal_bundle(
+    bundle_id: str,
+    authorization: str | None = Header(default=None, alias="Authorization"),
+) -> FileResponse:
+    authenticate_internal(authorization)
+    if bundle_id.startswith(".") or "/" in bundle_id or "\\" in bundle_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Bundle not found"
+        )
+    bundle_path = _bundle_root() / bundle_id
+    with _BUNDLE_CACHE_LOCK:
+        verified = str(bundle_path) in VERIFIED_BUNDLES
+    # Verificação (hash de todos os arquivos) fora do lock global; sem marker, não é servido.
+    if not verified and not (bundle_path.is_dir() and verify_local_bundle(bundle_path)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bundle not found")
+    with _BUNDLE_CACHE_LOCK:
+        if str(bundle_path) not in VERIFIED_BUNDLES:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Bundle not found"
+            )
+        _acquire_bundle_lease(bundle_path)
+    handle, tar_path_str = tempfile.mkstemp(suffix=".tar")
+    os.close(handle)
+    try:
+        write_bundle_tar(bundle_path, Path(tar_path_str))
+    except OSError:
+        os.unlink(tar_path_str)
+        raise
+    finally:
+        release_bundle_lease(bundle_path)
+    return FileResponse(
+        tar_path_str,
+        media_type="application/x-tar",
+        background=BackgroundTask(os.unlink, tar_path_str),
+    )
+
+
+@app.get("/internal/metrics")
+def get_internal_metrics(
+    authorization: str | None = Header(default=None, alias="Authorization"),
+) -> dict[str, Any]:
+    authenticate_internal(authorization)
+    return runtime_metrics_snapshot()
+
+
+@app.post("/internal/warmup", status_code=status.HTTP_202_ACCEPTED)
+def request_bundle_warmup(
+    warmup_request: BundleWarmupRequest,
+    authorization: str | None = Header(default=None, alias="Authorization"),
+) -> dict[str, str]:
+    authenticate_internal(authorization)
+    bundle_id = warmup_request.bundle_id
+    with _BUNDLE_CACHE_LOCK:
+        TENANT_CANDIDATE_BUNDLES[warmup_request.tenant_id] = bundle_id
+        current_status = BUNDLE_WARMUP_STATUS.get(bundle_id)
+        if current_status in {"pending", "warm"}:
+            return {"bundle_id": bundle_id, "status": current_status}
+        BUNDLE_WARMUP_STATUS[bundle_id] = "pending"
+    _BUNDLE_WARMUP_EXECUTOR.submit(
+        prewarm_bundle,
+        bundle_id,
+        warmup_request.bundle_sha256,
+        warmup_request.bundle_tree_sha256,
+    )
+    return {"bundle_id": bundle_id, "status": "pending"}
+
+
+@app.post("/internal/aliases/{tenant_id}/changed")
+def notify_alias_changed(
+    tenant_id: str,
+    notification: AliasChangeNotification,
+    authorization: str | None = Header(default=None, alias="Authorization"),
+) -> dict[str, Any]:
+    authenticate_internal(authorization)
+    invalidated = invalidate_negative_cache(tenant_id, notification.bundle_id)
+    with _BUNDLE_CACHE_LOCK:
+        # Promote ou rollback: o candidate pré-aquecido deixa de ser pinado (ADR 0024); se
+        # virou current, o pin de current assume no próximo request do tenant.
+        TENANT_CANDIDATE_BUNDLES.pop(tenant_id, None)
+    return {"tenant_id": tenant_id, "invalidated": invalidated}
+
+
+@app.get("/internal/warmup/{bundle_id}")
+def get_bundle_warmup(
+    bundle_id: str,
+    authorization: str | None = Header(default=None, alias="Authorization"),
+) -> dict[str, str]:
+    authenticate_internal(authorization)
+    with _BUNDLE_CACHE_LOCK:
+        warmup_status = BUNDLE_WARMUP_STATUS.get(bundle_id, "unknown")
+    return {"bundle_id": bundle_id, "status": warmup_status}
+
+
 @app.post("/execute")
 def execute(
     request: ExecuteRequest,
@@ -608,7 +4384,11 @@ def execute(
     x_tenant_id: str | None = Header(default=None, alias="X-Tenant-Id"),
     x_api_key: str | None = Header(default=None, alias="X-Api-Key"),
     x_request_id: str | None = Header(default=None, alias="X-Request-Id"),
-) -> dict[str, Any]:
+    x_request_deadline: str | None = Header(default=None, alias="X-Request-Deadline"),
+    x_request_timeout_ms: str | None = Header(
+        default=None, alias="X-Request-Timeout-Ms"
+    ),
+) -> Response:
     started_at = time.time()
     request_id = (
         x_request_id
@@ -625,70 +4405,116 @@ def execute(
     bundle_id: str | None = None
     rate_limit_info: dict[str, int] | None = None
     control_plane_status: int | None = None
+    control_plane_state: str | None = None
     bundle_cache_status: str | None = None
+    bundle_path: Path | None = None
     error_code: str | None = None
+    coalesced = False
+    admission: AdmissionController | None = None
+    admitted_at: float | None = None
+    in_flight_acquired = False
 
     try:
         tenant_id = authenticate(tenant_id=x_tenant_id, api_key=x_api_key)
 
         try:
-            rate_limit_headers = enforce_rate_limit_and_quota(tenant_id)
+            tenant_policy = resolve_tenant_policy(tenant_id)
+        except RuntimeConfigError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+
+        deadline = resolve_request_deadline(x_request_deadline, x_request_timeout_ms)
+        # Admission antes do rate limit: request rejeitada por sobrecarga não consome a janela
+        # nem a quota do tenant.
+        admission = _admission_controller()
+        admission.acquire(tenant_id, weight=tenant_policy["weight"], deadline=deadline)
+        admitted_at = time.monotonic()
+
+        try:
+            rate_limit_headers = enforce_rate_limit_and_quota(tenant_id, tenant_policy)
             rate_limit_info = {
                 "limit": int(rate_limit_headers["X-RateLimit-Limit"]),
                 "remaining": int(rate_limit_headers["X-RateLimit-Remaining"]),
                 "reset": int(rate_limit_headers["X-RateLimit-Reset"]),
             }
+            if "X-RateLimit-Borrowed" in rate_limit_headers:
+                rate_limit_info["borrowed"] = True
+            if tenant_policy["max_in_flight"] is not None:
+                rate_limit_info["max_in_flight"] = tenant_policy["max_in_flight"]
+            in_flight_headers = acquire_tenant_in_flight(
+                tenant_id, tenant_policy, rate_limit_headers
+            )
+            in_flight_acquired = bool(in_flight_headers)
+            rate_limit_headers = {**rate_limit_headers, **in_flight_headers}
+            if in_flight_headers:
+                rate_limit_info["in_flight"] = int(in_flight_headers["X-RateLimit-InFlight"])
         except RuntimeConfigError as exc:
             raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
 
         for header_name, header_value in rate_limit_headers.items():
             response.headers[header_name] = header_value
 
-        bundle_path, bundle_id, control_plane_status, bundle_cache_status = (
-            resolve_current_bundle(tenant_id, request_id=request_id)
+        bundle_path, bundle_id, control_plane_status, bundle_cache_status, served_stale = (
+            resolve_current_bundle(tenant_id, request_id=request_id, deadline=deadline)
         )
+        if served_stale:
+            control_plane_state = "stale"
 
-        intent_name = "faq_query"
-        intent_questions = load_intent_questions(bundle_path, intent_name)
-        answer_map = load_faq_index(bundle_path)
-
-        status_value = "ok" if request.question in intent_questions else "no_match"
-        answer = answer_map.get(request.question, "")
+        compiled = get_compiled_bundle(bundle_path, bundle_id)
 
-        payload = {
-            "answer": answer,
-            "intent": intent_name,
-            "status": status_value,
-        }
+        if deadline is not None:
+            deadline.check()
 
-        validator = load_response_validator(bundle_path)
-        errors = sorted(validator.iter_errors(payload), key=lambda err: err.path)
-        if errors:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Invalid response payload",
+        def _compute() -> ExecuteResponseFragments:
+            payload, output_text = compute_execute_result(compiled, request.question)
+            suggestions = None
+            if payload["status"] == "no_match" and compiled.suggestion_index is not None:
+                suggestions = suggest_questions(
+                    compiled.suggestion_index,
+                    request.question,
+                    max_seconds=_resolve_suggestions_max_seconds(),
+                )
+            fragments = encode_execute_response(
+                compiled.bundle_id, payload, output_text, suggestions
             )
+            # Sugestões dependem do limite de latência: só resultados sem elas são cacheados.
+            if payload["status"] == "ok" or compiled.suggestion_index is None:
+                compiled.response_cache.put(request.question, fragments)
+            return fragments
 
-        output_text = render_output(bundle_path, payload)
-
-        return {
-            "request_id": request_id,
-            "bundle_id": bundle_id,
-            "tenant_id": tenant_id,
-            "intent": intent_name,
-            "status": status_value,
-            "output_text": output_text,
-            "result": payload,
-        }
+        # Resultado determinístico por (bundle, pergunta): o corpo JSON fica pré-codificado e
+        # só request_id e tenant_id são inseridos. Requests idênticas em andamento compartilham
+        # o cálculo; rate limit e auditoria continuam por request.
+        fragments = compiled.response_cache.get(request.question)
+        with _RESPONSE_CACHE_LOCK:
+            RESPONSE_CACHE_COUNTERS["hit" if fragments is not None else "miss"] += 1
+        if fragments is None:
+            fragments, coalesced = EXECUTE_FLIGHTS.do(
+                (bundle_id, str(bundle_path), sha256_hex(request.question)), _compute
+            )
+        return Response(
+            content=fragments.render(request_id, tenant_id),
+            media_type="application/json",
+            headers=rate_limit_headers,
+        )
     except HTTPException as exc:
         status_code = exc.status_code
         error_code = _map_error_code(exc, exc.status_code)
         raise
     except RuntimeConfigError as exc:
         status_code = exc.status_code
-        error_code = (
-            "config_error" if "config" in str(exc).lower() else "internal_error"
-        )
+        if isinstance(exc, ControlPlaneCircuitOpenError):
+            control_plane_state = "circuit_open"
+            error_code = "control_plane_circuit_open"
+        elif isinstance(exc, DeadlineExceededError):
+            error_code = "deadline_exceeded"
+        elif isinstance(exc, LoadShedError):
+            error_code = "load_shed"
+        elif exc.status_code == status.HTTP_400_BAD_REQUEST:
+            error_code = "invalid_request"
+        else:
+            error_code = (
+                "config_error" if "config" in str(exc).lower() else "internal_error"
+            )
         raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
     except Exception as exc:
         status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -697,6 +4523,12 @@ def execute(
             status_code=status_code, detail="Internal server error"
         ) from exc
     finally:
+        if in_flight_acquired:
+            release_tenant_in_flight(tenant_id)
+        if admission is not None and admitted_at is not None:
+            admission.release(time.monotonic() - admitted_at)
+        if bundle_cache_status is not None and bundle_path is not None:
+            release_bundle_lease(bundle_path)
         latency_ms = int((time.time() - started_at) * 1000)
         event: dict[str, Any] = {
             "ts_utc": now_utc_iso(),
@@ -715,13 +4547,20 @@ def execute(
             event["bundle_id"] = bundle_id
         if control_plane_status is not None:
             event["control_plane_status"] = control_plane_status
+        if control_plane_state is not None:
+            event["control_plane_state"] = control_plane_state
         if bundle_cache_status is not None and bundle_id is not None:
+            with _BUNDLE_CACHE_LOCK:
+                cache_counters = dict(BUNDLE_CACHE_COUNTERS)
             event["bundle_cache"] = {
                 "status": bundle_cache_status,
                 "bundle_id": bundle_id,
+                "counters": cache_counters,
             }
         if rate_limit_info is not None:
             event["rate_limit"] = rate_limit_info
+        if coalesced:
+            event["coalesced"] = True
         if error_code is not None:
             event["error_code"] = error_code
         if error_code == "config_error":
@@ -0,0 +1,63 @@
+# benchmarks/bench_execute_response.py
+"""Micro-benchmark da serialização do /execute: dict + JSONResponse vs bytes pré-codificados.
+
+Uso: python benchmarks/bench_execute_response.py [iterações]
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app import runtime  # noqa: E402
+
+BUNDLE_PATH = Path(__file__).resolve().parents[1] / "data" / "bundles" / "demo" / "faq"
+QUESTION = "O que é o alias current?"
+
+
+def _dict_path(result: dict[str, Any]) -> bytes:
+    # Caminho anterior: FastAPI percorre o dict com jsonable_encoder e o JSONResponse codifica.
+    return JSONResponse(jsonable_encoder(result)).body
+
+
+def _measure(label: str, func: Any, iterations: int) -> float:
+    seconds = min(timeit.repeat(func, number=iterations, repeat=5)) / iterations
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<12} {seconds * 1e6:8.2f} us/op  {peak:7d} B peak alloc")
+    return seconds
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    compiled = runtime.compile_bundle(BUNDLE_PATH, "demo-faq-0001")
+    payload, output_text = runtime.compute_execute_result(compiled, QUESTION)
+    result = {
+        "request_id": "rid-bench",
+        "bundle_id": compiled.bundle_id,
+        "tenant_id": "tenant_a",
+        "intent": payload["intent"],
+        "status": payload["status"],
+        "output_text": output_text,
+        "result": payload,
+    }
+    fragments = runtime.encode_execute_response(compiled.bundle_id, payload, output_text, None)
+    assert fragments.render("rid-bench", "tenant_a") == _dict_path(result)
+
+    before = _measure("dict", lambda: _dict_path(result), iterations)
+    after = _measure("fragments", lambda: fragments.render("rid-bench", "tenant_a"), iterations)
+    print(f"speedup      {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
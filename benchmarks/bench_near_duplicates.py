@@ -0,0 +1,45 @@
+# benchmarks/bench_near_duplicates.py
+"""Escala da detecção de perguntas quase duplicadas com perguntas de template.
+
+Uso: python benchmarks/bench_near_duplicates.py [tamanhos...]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.control_plane import find_near_duplicate_questions  # noqa: E402
+
+CITIES = ["São Paulo", "Rio de Janeiro", "Belo Horizonte", "Curitiba", "Recife", "Manaus"]
+
+
+def _templated_answers(count: int) -> dict[str, str | None]:
+    generator = random.Random(count)
+    return {
+        f"Qual é o prazo de entrega do pedido {index} para {generator.choice(CITIES)}?": str(
+            index % 7
+        )
+        for index in range(count)
+    }
+
+
+def main() -> None:
+    sizes = [int(value) for value in sys.argv[1:]] or [1_000, 4_000, 20_000, 100_000]
+    for size in sizes:
+        answers = _templated_answers(size)
+        started = time.perf_counter()
+        report = find_near_duplicate_questions(answers, 0.8)
+        seconds = time.perf_counter() - started
+        print(
+            f"{size:>9} perguntas  {seconds:8.2f} s  {seconds / size * 1e6:7.1f} us/pergunta  "
+            f"{report['near_duplicates']:>9} pares  {report['conflicts']:>9} conflitos"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,21 @@
 # tests/conftest.py
 from __future__ import annotations
 
+import hashlib
+import json
+import shutil
 import sys
+import tarfile
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 
+import pytest
+import yaml
+from fastapi.testclient import TestClient
+
 
 def _ensure_repo_root_on_syspath() -> None:
     repo_root = Path(__file__).resolve().parents[1]
@@ -13,3 +25,365 @@ def _ensure_repo_root_on_syspath() -> None:
 
 
 _ensure_repo_root_on_syspath()
+
+# Import de app só depois do ajuste de sys.path acima.
+from app import control_plane, runtime  # noqa: E402
+
+INTERNAL_TOKEN = "internal-test-token"
+
+
+def _repo_root() -> Path:
+    return Path(__file__).resolve().parent.parent
+
+
+def _source_bundle_path() -> Path:
+    return _repo_root() / "data" / "bundles" / "demo" / "faq"
+
+
+def _bundle_id() -> str:
+    manifest = yaml.safe_load(
+        (_source_bundle_path() / "manifest.yaml").read_text(encoding="utf-8")
+    )
+    return str(manifest["bundle_id"])
+
+
+def _make_bundle_tarball(tmp_path: Path, bundle_id: str) -> tuple[Path, str]:
+    archive = tmp_path / f"{bundle_id}.tar.gz"
+    with tarfile.open(archive, mode="w:gz") as tar:
+        tar.add(_source_bundle_path(), arcname=bundle_id)
+    digest = hashlib.sha256(archive.read_bytes()).hexdigest()
+    return archive, digest
+
+
+def _seed_verified_bundle(
+    bundle_root: Path, bundle_id: str, source: Path | None = None
+) -> Path:
+    # Bundle já baixado e verificado por um processo anterior: árvore + marker em disco.
+    target = bundle_root / bundle_id
+    shutil.copytree(source or _source_bundle_path(), target)
+    marker = bundle_root / runtime.BUNDLE_VERIFIED_DIRNAME / f"{bundle_id}.json"
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.write_text(
+        json.dumps(
+            {
+                "bundle_id": bundle_id,
+                "tree_sha256": runtime.compute_bundle_tree_digest(target),
+                "files": runtime.bundle_file_digests(target),
+            }
+        ),
+        encoding="utf-8",
+    )
+    return target
+
+
+def _runtime_headers(request_id: str = "rid-0017") -> dict[str, str]:
+    return {
+        "X-Tenant-Id": "tenant_a",
+        "X-Api-Key": "runtime_test_key_a",
+        "X-Request-Id": request_id,
+    }
+
+
+@contextmanager
+def _control_plane_server(
+    tenant_id: str,
+    payload: dict[str, object],
+    status_code: int = 200,
+) -> Iterator[str]:
+    body = json.dumps(payload).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            expected_path = f"/tenants/{tenant_id}/resolve/current"
+            if self.path != expected_path:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A003
+            return
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=1)
+
+
+@contextmanager
+def _origin_server(directory: Path) -> Iterator[str]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            requested = self.path.lstrip("/")
+            archive_path = directory / requested
+            if not archive_path.exists():
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/gzip")
+            self.end_headers()
+            self.wfile.write(archive_path.read_bytes())
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A003
+            return
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=1)
+
+
+@pytest.fixture
+def runtime_client(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> TestClient:
+    runtime.RATE_LIMIT_COUNTERS.clear()
+    runtime.RATE_LIMIT_EXPIRY.clear()
+    runtime.BUNDLE_CACHE_LAST_USED.clear()
+    runtime.BUNDLE_CACHE_SIZES.clear()
+    runtime.BUNDLE_LEASES.clear()
+    runtime.TENANT_CURRENT_BUNDLES.clear()
+    runtime.VERIFIED_BUNDLES.clear()
+    monkeypatch.setattr(
+        runtime, "BUNDLE_CACHE_COUNTERS", {"hit": 0, "miss": 0, "evict": 0}
+    )
+    monkeypatch.setenv(
+        "CONTRACTOR_AUDIT_CONFIG_JSON",
+        json.dumps(
+            {
+                "enabled": True,
+                "sink": "stdout",
+                "file_path": "data/audit/audit.log.jsonl",
+                "retention_days": 7,
+            }
+        ),
+    )
+    monkeypatch.setenv(
+        "CONTRACTOR_TENANT_KEYS", json.dumps({"tenant_a": "runtime_test_key_a"})
+    )
+    monkeypatch.setenv(
+        "CONTRACTOR_RATE_LIMIT_POLICY_JSON",
+        json.dumps(
+            {
+                "rate_limit": {"window_seconds": 60, "max_requests": 100},
+                "quota": {"window_seconds": 86400, "max_requests": 100},
+                "tenants": {
+                    "*": {
+                        "rate_limit": {"window_seconds": 60, "max_requests": 100},
+                        "quota": {"window_seconds": 86400, "max_requests": 100},
+                    }
+                },
+            }
+        ),
+    )
+    bundle_root = tmp_path / "data" / "bundles"
+    bundle_root.mkdir(parents=True, exist_ok=True)
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: bundle_root)
+    return TestClient(runtime.app)
+
+
+@contextmanager
+def _switchable_control_plane(state: dict[str, int]) -> Iterator[str]:
+    # state["status"] define a resposta; state["calls"] conta as chamadas recebidas.
+    body = json.dumps(
+        {"bundle_id": _bundle_id(), "runtime_compatibility": {"min_version": "0.0.0"}}
+    ).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            state["calls"] += 1
+            self.send_response(state["status"])
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            if state["status"] == 200:
+                self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A003
+            return
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=1)
+
+
+def _runtime_events(captured: str) -> list[dict[str, object]]:
+    events = [json.loads(line) for line in captured.splitlines() if line.strip()]
+    return [e for e in events if e.get("service") == "runtime"]
+
+
+@pytest.fixture
+def breaker_env(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    monkeypatch.setattr(runtime, "CONTROL_PLANE_BREAKERS", {})
+    monkeypatch.setattr(runtime, "LAST_KNOWN_GOOD", {})
+    monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BREAKER_WINDOW", "2")
+    monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BREAKER_MIN_CALLS", "1")
+    monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BREAKER_OPEN_SECONDS", "60")
+    bundle_root = tmp_path / "data" / "bundles"
+    _seed_verified_bundle(bundle_root, _bundle_id())
+    return bundle_root
+
+
+def _set_cp_env(
+    monkeypatch: pytest.MonkeyPatch, auth_path: Path, alias_path: Path
+) -> None:
+    monkeypatch.setenv(control_plane.AUTH_CONFIG_PATH_ENV, str(auth_path))
+    monkeypatch.setenv(control_plane.ALIAS_CONFIG_PATH_ENV, str(alias_path))
+    monkeypatch.delenv(control_plane.AUTH_CONFIG_JSON_ENV, raising=False)
+
+
+@pytest.fixture
+def control_plane_auth_config_path(tmp_path: Path) -> Path:
+    config = {
+        "tenants": {
+            "tenant_a": {"token": "cp_test_key_a"},
+            "tenant_b": {"token": "cp_test_key_b"},
+        }
+    }
+    path = tmp_path / "tenants.json"
+    path.write_text(json.dumps(config), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def control_plane_alias_config_path(tmp_path: Path) -> Path:
+    alias_config = {
+        "tenants": {
+            "tenant_a": {
+                "current_bundle_path": "data/bundles/demo/faq",
+                "bundle_id": "demo-faq-0001",
+            }
+        }
+    }
+    path = tmp_path / "aliases.json"
+    path.write_text(json.dumps(alias_config), encoding="utf-8")
+    return path
+
+
+def _mk_bundle(tmp_path: Path, bundle_id: str) -> Path:
+    bundle_path = tmp_path / "bundles" / bundle_id
+    bundle_path.mkdir(parents=True, exist_ok=True)
+    (bundle_path / "manifest.yaml").write_text(
+        f"bundle_id: {bundle_id}\nruntime_compatibility:\n  min_version: '1.0.0'\n",
+        encoding="utf-8",
+    )
+    return bundle_path
+
+
+def _write_gate_pass(
+    root: Path, tenant_id: str, bundle_id: str, gate_id: str = "gate-1"
+) -> None:
+    path = root / tenant_id / bundle_id / f"{gate_id}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "gate_id": gate_id,
+        "request_id": "req-gate",
+        "tenant_id": tenant_id,
+        "bundle_id": bundle_id,
+        "status": "completed",
+        "outcome": "pass",
+    }
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def _headers(token: str, tenant_id: str) -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {token}",
+        "X-Tenant-Id": tenant_id,
+        "X-Request-Id": "req-1",
+    }
+
+
+@contextmanager
+def _runtime_node(warm: bool, observed: list[dict[str, object]]) -> Iterator[str]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:  # noqa: N802
+            length = int(self.headers.get("Content-Length", "0"))
+            observed.append(
+                {
+                    "path": self.path,
+                    "authorization": self.headers.get("Authorization"),
+                    "body": json.loads(self.rfile.read(length)),
+                }
+            )
+            self._reply(202, {"status": "pending"})
+
+        def do_GET(self) -> None:  # noqa: N802
+            bundle_id = self.path.rsplit("/", 1)[-1]
+            self._reply(
+                200, {"bundle_id": bundle_id, "status": "warm" if warm else "pending"}
+            )
+
+        def _reply(self, code: int, payload: dict[str, str]) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A003
+            return
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=1)
+
+
+@pytest.fixture
+def cp_client(
+    tmp_path: Path,
+    control_plane_auth_config_path: Path,
+    control_plane_alias_config_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> TestClient:
+    _set_cp_env(
+        monkeypatch, control_plane_auth_config_path, control_plane_alias_config_path
+    )
+    monkeypatch.setattr(control_plane, "ALIAS_STATE_ROOT", tmp_path / "alias_state")
+    monkeypatch.setattr(control_plane, "GATE_STORAGE_ROOT", tmp_path / "gates")
+    monkeypatch.setattr(control_plane, "WARMUP_POLL_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setenv("CONTRACTOR_INTERNAL_TOKEN", INTERNAL_TOKEN)
+    bundle_path = _mk_bundle(tmp_path, "demo-faq-0002")
+    monkeypatch.setattr(
+        control_plane, "_find_bundle_path_by_bundle_id", lambda _bundle_id: bundle_path
+    )
+    _write_gate_pass(tmp_path / "gates", "tenant_a", "demo-faq-0002")
+    return TestClient(control_plane.app)
+
+
+def _bundle_with_match(tmp_path: Path, match_type: str, extra: list[str] | None = None) -> Path:
+    bundle_path = tmp_path / "faq"
+    shutil.copytree(_source_bundle_path(), bundle_path)
+    ontology_path = bundle_path / "ontology" / "ontology.yaml"
+    ontology = yaml.safe_load(ontology_path.read_text(encoding="utf-8"))
+    ontology["intents"][0]["match"]["type"] = match_type
+    ontology["intents"][0]["match"]["questions"].extend(extra or [])
+    ontology_path.write_text(yaml.safe_dump(ontology, allow_unicode=True), encoding="utf-8")
+    return bundle_path
@@ -104,8 +104,13 @@ def test_runtime_control_plane_e2e_executes_with_current_alias(
     tenant_keys = _load_tenant_keys()
     tenant_id = _select_tenant_id(tenant_keys)
     bundle_path, bundle_id, min_version = _load_bundle_metadata()
+    # O bundle pré-copiado não tem marker: só é adotado com o tree digest do Control Plane.
     response_body = json.dumps(
-        {"bundle_id": bundle_id, "runtime_compatibility": {"min_version": min_version}}
+        {
+            "bundle_id": bundle_id,
+            "bundle_tree_sha256": runtime.compute_bundle_tree_digest(bundle_path),
+            "runtime_compatibility": {"min_version": min_version},
+        }
     ).encode("utf-8")
     bundle_root = _prepare_bundle_cache_hit(tmp_path, bundle_id, bundle_path)
     monkeypatch.setattr(runtime, "_bundle_root", lambda: bundle_root)
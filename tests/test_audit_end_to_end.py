@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import json
-import shutil
 import threading
 from contextlib import contextmanager
 from datetime import UTC, datetime
@@ -15,6 +14,7 @@ from fastapi.testclient import TestClient
 
 from app import control_plane, runtime
 from app.audit import audit_emit
+from tests.conftest import _seed_verified_bundle
 
 
 def _repo_root() -> Path:
@@ -42,10 +42,8 @@ def _runtime_audit_lines(captured: str) -> list[dict[str, Any]]:
 
 
 def _prepare_bundle_cache_hit(tmp_path: Path, bundle_id: str) -> Path:
-    source = _bundle_path()
     bundle_root = tmp_path / "bundles"
-    target = bundle_root / bundle_id
-    shutil.copytree(source, target)
+    _seed_verified_bundle(bundle_root, bundle_id, _bundle_path())
     return bundle_root
 
 
@@ -58,6 +56,7 @@ def _control_plane_audit_lines(captured: str) -> list[dict[str, Any]]:
 @pytest.fixture
 def runtime_client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
     runtime.RATE_LIMIT_COUNTERS.clear()
+    runtime.RATE_LIMIT_EXPIRY.clear()
     monkeypatch.setenv(
         "CONTRACTOR_AUDIT_CONFIG_JSON",
         json.dumps(
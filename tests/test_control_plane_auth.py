@@ -7,7 +7,8 @@ from pathlib import Path
 import pytest
 from fastapi.testclient import TestClient
 
-from app import control_plane
+from app import control_plane, runtime
+from tests.conftest import _set_cp_env
 
 
 @pytest.fixture
@@ -42,14 +43,6 @@ def control_plane_alias_config_path(tmp_path: Path) -> Path:
     return path
 
 
-def _set_cp_env(
-    monkeypatch: pytest.MonkeyPatch, auth_path: Path, alias_path: Path
-) -> None:
-    monkeypatch.setenv(control_plane.AUTH_CONFIG_PATH_ENV, str(auth_path))
-    monkeypatch.setenv(control_plane.ALIAS_CONFIG_PATH_ENV, str(alias_path))
-    monkeypatch.delenv(control_plane.AUTH_CONFIG_JSON_ENV, raising=False)
-
-
 def test_control_plane_rejects_missing_authorization_header(
     control_plane_auth_config_path: Path,
     control_plane_alias_config_path: Path,
@@ -131,6 +124,37 @@ def test_control_plane_returns_current_bundle_for_valid_request(
     assert response.status_code == 200
     assert response.json()["bundle_id"] == "demo-faq-0001"
     assert response.json()["runtime_compatibility"]["min_version"]
+    # Calculado pelo Control Plane mesmo sem digest na alias config: habilita delta e peers.
+    assert response.json()["bundle_tree_sha256"] == runtime.compute_bundle_tree_digest(
+        control_plane.REPO_ROOT / "data" / "bundles" / "demo" / "faq"
+    )
+
+
+def test_control_plane_rejects_alias_tree_digest_that_does_not_match_bundle(
+    control_plane_auth_config_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    alias_path = tmp_path / "aliases_mismatch.json"
+    alias_config = {
+        "tenants": {
+            "tenant_a": {
+                "current_bundle_path": "data/bundles/demo/faq",
+                "bundle_tree_sha256": "f" * 64,
+            }
+        }
+    }
+    alias_path.write_text(json.dumps(alias_config), encoding="utf-8")
+    _set_cp_env(monkeypatch, control_plane_auth_config_path, alias_path)
+    client = TestClient(control_plane.app)
+
+    response = client.get(
+        "/tenants/tenant_a/resolve/current",
+        headers={"Authorization": "Bearer cp_test_key_a", "X-Tenant-Id": "tenant_a"},
+    )
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Bundle metadata invalid"
 
 
 def test_control_plane_fails_closed_with_missing_auth_config(
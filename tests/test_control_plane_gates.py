@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import json
+import time
+from array import array
 from pathlib import Path
 
 import pytest
@@ -125,6 +127,7 @@ def test_post_gate_executes_bundle_suite_and_returns_completed_result(
     assert body["summary"]["total"] == expected_total
     assert body["summary"]["passed"] == expected_total
     assert body["summary"]["failed"] == 0
+    assert body["validation"]["conflicts"] == 0
 
 
 def test_get_gate_status_reads_local_storage(
@@ -255,3 +258,170 @@ def test_post_gate_rejects_suite_with_cross_tenant_case(
 
     assert response.status_code == 422
     assert response.json() == {"detail": "Suite invalid"}
+
+
+def test_find_near_duplicate_questions_reports_conflicts_first() -> None:
+    answers = {
+        "Qual é o horário de funcionamento?": "Das 9h às 18h.",
+        "Qual o horario de funcionamento": "Das 8h às 17h.",
+        "Como cancelar meu pedido?": "Pelo app.",
+        "como cancelar meu pedido": "Pelo app.",
+        "Onde fica a loja?": "No centro.",
+    }
+
+    report = control_plane.find_near_duplicate_questions(answers, 0.8)
+
+    assert report["questions"] == 5
+    assert report["near_duplicates"] == 2
+    assert report["conflicts"] == 1
+    assert report["pairs"][0]["conflict"] is True
+    assert set(report["pairs"][0]["questions"]) == {
+        "Qual é o horário de funcionamento?",
+        "Qual o horario de funcionamento",
+    }
+    assert report["pairs"][1] == {
+        "questions": ["Como cancelar meu pedido?", "como cancelar meu pedido"],
+        "similarity": 1.0,
+        "conflict": False,
+    }
+
+
+def test_find_near_duplicate_questions_counts_missing_answers_apart() -> None:
+    # Pergunta só da ontologia (sem resposta no faq.json) não é conflito.
+    answers: dict[str, str | None] = {
+        "Como cancelar meu pedido?": "Pelo app.",
+        "como cancelar meu pedido": None,
+    }
+
+    report = control_plane.find_near_duplicate_questions(answers, 0.8)
+
+    assert report["near_duplicates"] == 1
+    assert report["conflicts"] == 0
+    assert report["unanswered"] == 1
+    assert report["pairs"][0]["conflict"] is False
+
+
+def test_lsh_bands_keep_candidate_threshold_near_requested() -> None:
+    assert control_plane._lsh_bands(0.8) == (16, 8)
+    for threshold in (0.8, 0.9):
+        bands, rows = control_plane._lsh_bands(threshold)
+        assert threshold - 0.1 < (1 / bands) ** (1 / rows) < threshold
+        assert 1 - (1 - threshold**rows) ** bands >= control_plane.NEAR_DUPLICATE_MIN_RECALL
+
+
+def test_oversized_lsh_run_is_verified_in_linear_window() -> None:
+    # 200 perguntas com a mesma chave de banda: só pares dentro da janela são verificados.
+    size = 200
+    window = control_plane.NEAR_DUPLICATE_RUN_WINDOW
+    shingles = array("I", [1, 2, 3] * size)
+    offsets = array("q", range(0, 3 * size + 1, 3))
+
+    found = control_plane._band_near_duplicates(
+        array("q", [7] * size), 0.8, (shingles, offsets)
+    )
+
+    assert len(found) == size * window - window * (window + 1) // 2
+    assert all(0 < right - left <= window for left, right, _ in found)
+
+
+def test_templated_questions_scale_linearly() -> None:
+    def _questions(count: int) -> dict[str, str | None]:
+        return {
+            f"Qual é o prazo de entrega do pedido {index} para a loja {index % 13}?": str(
+                index % 7
+            )
+            for index in range(count)
+        }
+
+    started = time.perf_counter()
+    small = control_plane.find_near_duplicate_questions(_questions(1_000), 0.8)
+    small_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    large = control_plane.find_near_duplicate_questions(_questions(8_000), 0.8)
+    large_seconds = time.perf_counter() - started
+
+    bands, _ = control_plane._lsh_bands(0.8)
+    assert large["near_duplicates"] <= 8_000 * bands * control_plane.NEAR_DUPLICATE_RUN_WINDOW
+    assert large["conflicts"] > 0
+    assert small["near_duplicates"] > 0
+    # 8x mais perguntas: tempo linear com folga, longe do quadrático (64x).
+    assert large_seconds < max(small_seconds, 0.05) * 24
+
+
+def test_post_gate_reports_conflicts_and_fails_only_with_max_conflicts(
+    tmp_path: Path,
+    control_plane_auth_config_path: Path,
+    control_plane_alias_config_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _set_cp_env(
+        monkeypatch, control_plane_auth_config_path, control_plane_alias_config_path
+    )
+    monkeypatch.setattr(control_plane, "GATE_STORAGE_ROOT", tmp_path / "gates")
+
+    bundle_path = tmp_path / "bundle"
+    (bundle_path / "suites").mkdir(parents=True)
+    (bundle_path / "data").mkdir()
+    (bundle_path / "ontology").mkdir()
+    (bundle_path / "suites" / "faq_golden.json").write_text(
+        json.dumps(
+            [{"tenant_id": "tenant_a", "question": "q1", "expected_answer": "a1"}]
+        ),
+        encoding="utf-8",
+    )
+    (bundle_path / "data" / "faq.json").write_text(
+        json.dumps(
+            [
+                {"question": "O que é um bundle?", "answer": "Um pacote."},
+                {"question": "O que é um bundle", "answer": "Um artefato."},
+            ]
+        ),
+        encoding="utf-8",
+    )
+    (bundle_path / "ontology" / "ontology.yaml").write_text(
+        "intents:\n"
+        "  - name: faq_query\n"
+        "    match:\n"
+        "      type: exact\n"
+        "      questions: ['O que é um bundle?', 'O que é o bundle?']\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(
+        control_plane, "_find_bundle_path_by_bundle_id", lambda _bundle_id: bundle_path
+    )
+    monkeypatch.setattr(
+        control_plane, "_run_suite_cases", lambda cases, _request_id: ([], 1, 0)
+    )
+
+    client = TestClient(control_plane.app)
+    headers = {
+        "Authorization": "Bearer cp_test_key_a",
+        "X-Tenant-Id": "tenant_a",
+        "X-Request-Id": "req-gate-conflicts",
+    }
+    report_only = client.post(
+        "/tenants/tenant_a/bundles/demo-faq-0001/gates",
+        headers=headers,
+        json={"suite_id": "faq_golden"},
+    )
+    response = client.post(
+        "/tenants/tenant_a/bundles/demo-faq-0001/gates",
+        headers=headers,
+        json={"suite_id": "faq_golden", "max_conflicts": 0},
+    )
+
+    assert report_only.status_code == 200
+    assert report_only.json()["outcome"] == "pass"
+    assert report_only.json()["criteria"]["max_conflicts"] is None
+    assert report_only.json()["validation"]["conflicts"] == 1
+    assert response.status_code == 200
+    body = response.json()
+    assert body["outcome"] == "fail"
+    assert body["summary"]["failed"] == 0
+    assert body["criteria"]["max_conflicts"] == 0
+    assert body["validation"]["questions"] == 3
+    assert body["validation"]["conflicts"] == 1
+    assert body["validation"]["pairs"][0]["questions"] == [
+        "O que é um bundle",
+        "O que é um bundle?",
+    ]
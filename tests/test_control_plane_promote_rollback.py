@@ -2,75 +2,14 @@
 from __future__ import annotations
 
 import json
+import tarfile
 from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
 
-from app import control_plane
-from tests.test_control_plane_auth import _set_cp_env  # type: ignore
-
-
-@pytest.fixture
-def control_plane_auth_config_path(tmp_path: Path) -> Path:
-    config = {
-        "tenants": {
-            "tenant_a": {"token": "cp_test_key_a"},
-            "tenant_b": {"token": "cp_test_key_b"},
-        }
-    }
-    path = tmp_path / "tenants.json"
-    path.write_text(json.dumps(config), encoding="utf-8")
-    return path
-
-
-@pytest.fixture
-def control_plane_alias_config_path(tmp_path: Path) -> Path:
-    alias_config = {
-        "tenants": {
-            "tenant_a": {
-                "current_bundle_path": "data/bundles/demo/faq",
-                "bundle_id": "demo-faq-0001",
-            }
-        }
-    }
-    path = tmp_path / "aliases.json"
-    path.write_text(json.dumps(alias_config), encoding="utf-8")
-    return path
-
-
-def _mk_bundle(tmp_path: Path, bundle_id: str) -> Path:
-    bundle_path = tmp_path / "bundles" / bundle_id
-    bundle_path.mkdir(parents=True, exist_ok=True)
-    (bundle_path / "manifest.yaml").write_text(
-        f"bundle_id: {bundle_id}\nruntime_compatibility:\n  min_version: '1.0.0'\n",
-        encoding="utf-8",
-    )
-    return bundle_path
-
-
-def _write_gate_pass(
-    root: Path, tenant_id: str, bundle_id: str, gate_id: str = "gate-1"
-) -> None:
-    path = root / tenant_id / bundle_id / f"{gate_id}.json"
-    path.parent.mkdir(parents=True, exist_ok=True)
-    payload = {
-        "gate_id": gate_id,
-        "request_id": "req-gate",
-        "tenant_id": tenant_id,
-        "bundle_id": bundle_id,
-        "status": "completed",
-        "outcome": "pass",
-    }
-    path.write_text(json.dumps(payload), encoding="utf-8")
-
-
-def _headers(token: str, tenant_id: str) -> dict[str, str]:
-    return {
-        "Authorization": f"Bearer {token}",
-        "X-Tenant-Id": tenant_id,
-        "X-Request-Id": "req-1",
-    }
+from app import control_plane, runtime
+from tests.conftest import _headers, _mk_bundle, _set_cp_env, _write_gate_pass
 
 
 def test_set_candidate_persists_and_is_idempotent(
@@ -95,8 +34,12 @@ def test_set_candidate_persists_and_is_idempotent(
         headers=_headers("cp_test_key_a", "tenant_a"),
         json={"bundle_id": "demo-faq-0001"},
     )
+    expected = {
+        "bundle_id": "demo-faq-0001",
+        "bundle_tree_sha256": runtime.compute_bundle_tree_digest(bundle_path),
+    }
     assert response.status_code == 200
-    assert response.json()["aliases"]["candidate"] == {"bundle_id": "demo-faq-0001"}
+    assert response.json()["aliases"]["candidate"] == expected
 
     response2 = client.post(
         "/tenants/tenant_a/aliases/candidate",
@@ -107,7 +50,7 @@ def test_set_candidate_persists_and_is_idempotent(
     state = json.loads(
         (tmp_path / "alias_state" / "tenant_a.json").read_text(encoding="utf-8")
     )
-    assert state["aliases"]["candidate"] == {"bundle_id": "demo-faq-0001"}
+    assert state["aliases"]["candidate"] == expected
 
 
 def test_promote_requires_candidate(
@@ -191,15 +134,19 @@ def test_promote_happy_path_and_idempotent(
         "/tenants/tenant_a/aliases/promote",
         headers=_headers("cp_test_key_a", "tenant_a"),
     )
+    expected = {
+        "bundle_id": "demo-faq-0001",
+        "bundle_tree_sha256": runtime.compute_bundle_tree_digest(bundle_path),
+    }
     assert response.status_code == 200
-    assert response.json()["aliases"]["current"] == {"bundle_id": "demo-faq-0001"}
+    assert response.json()["aliases"]["current"] == expected
 
     response2 = client.post(
         "/tenants/tenant_a/aliases/promote",
         headers=_headers("cp_test_key_a", "tenant_a"),
     )
     assert response2.status_code == 200
-    assert response2.json()["aliases"]["current"] == {"bundle_id": "demo-faq-0001"}
+    assert response2.json()["aliases"]["current"] == expected
 
 
 def test_rollback_requires_gate_pass(
@@ -266,3 +213,75 @@ def test_alias_endpoints_enforce_tenant_isolation(
         },
     )
     assert response.status_code == 403
+
+
+def test_candidate_tree_digest_is_computed_by_control_plane(
+    tmp_path: Path,
+    control_plane_auth_config_path: Path,
+    control_plane_alias_config_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _set_cp_env(
+        monkeypatch, control_plane_auth_config_path, control_plane_alias_config_path
+    )
+    monkeypatch.setattr(control_plane, "ALIAS_STATE_ROOT", tmp_path / "alias_state")
+    bundle_path = _mk_bundle(tmp_path, "demo-faq-0001")
+    monkeypatch.setattr(
+        control_plane, "_find_bundle_path_by_bundle_id", lambda _bundle_id: bundle_path
+    )
+
+    client = TestClient(control_plane.app)
+    response = client.post(
+        "/tenants/tenant_a/aliases/candidate",
+        headers=_headers("cp_test_key_a", "tenant_a"),
+        json={"bundle_id": "demo-faq-0001", "bundle_tree_sha256": "f" * 64},
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Bundle tree digest mismatch"
+
+
+def test_promote_publishes_delta_from_current_to_origin(
+    tmp_path: Path,
+    control_plane_auth_config_path: Path,
+    control_plane_alias_config_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _set_cp_env(
+        monkeypatch, control_plane_auth_config_path, control_plane_alias_config_path
+    )
+    monkeypatch.setattr(control_plane, "ALIAS_STATE_ROOT", tmp_path / "alias_state")
+    monkeypatch.setattr(control_plane, "GATE_STORAGE_ROOT", tmp_path / "gates")
+    origin_dir = tmp_path / "origin"
+    monkeypatch.setenv("CONTRACTOR_BUNDLE_ORIGIN_DIR", str(origin_dir))
+    bundles = {
+        bundle_id: _mk_bundle(tmp_path, bundle_id)
+        for bundle_id in ("demo-faq-0001", "demo-faq-0002")
+    }
+    (bundles["demo-faq-0002"] / "extra.txt").write_text("novo\n", encoding="utf-8")
+    monkeypatch.setattr(control_plane, "_find_bundle_path_by_bundle_id", bundles.__getitem__)
+    for bundle_id in bundles:
+        _write_gate_pass(tmp_path / "gates", "tenant_a", bundle_id)
+
+    client = TestClient(control_plane.app)
+    headers = _headers("cp_test_key_a", "tenant_a")
+    client.post(
+        "/tenants/tenant_a/aliases/candidate", headers=headers, json={"bundle_id": "demo-faq-0001"}
+    )
+    client.post("/tenants/tenant_a/aliases/promote", headers=headers)
+    client.post(
+        "/tenants/tenant_a/aliases/candidate", headers=headers, json={"bundle_id": "demo-faq-0002"}
+    )
+    response = client.post("/tenants/tenant_a/aliases/promote", headers=headers)
+
+    assert response.status_code == 200
+    delta_path = origin_dir / runtime.bundle_delta_artifact_name("demo-faq-0002", "demo-faq-0001")
+    with tarfile.open(delta_path, mode="r:gz") as tar:
+        manifest_file = tar.extractfile("delta.json")
+        assert manifest_file is not None
+        delta_manifest = json.loads(manifest_file.read())
+    assert delta_manifest["changed"] == ["extra.txt", "manifest.yaml"]
+    assert delta_manifest["bundle_tree_sha256"] == (
+        response.json()["aliases"]["current"]["bundle_tree_sha256"]
+    )
+    assert [p.name for p in origin_dir.iterdir()] == [delta_path.name]
@@ -0,0 +1,196 @@
+# tests/test_control_plane_warmup.py
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import control_plane, runtime
+from tests.conftest import INTERNAL_TOKEN, _headers, _runtime_node, _seed_verified_bundle
+
+SOURCE_BUNDLE = Path(__file__).resolve().parents[1] / "data" / "bundles" / "demo" / "faq"
+
+
+def _tree_digest(tmp_path: Path) -> str:
+    return runtime.compute_bundle_tree_digest(tmp_path / "bundles" / "demo-faq-0002")
+
+
+def test_set_candidate_notifies_runtimes_to_prewarm(
+    cp_client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    observed: list[dict[str, object]] = []
+    with _runtime_node(True, observed) as node_a, _runtime_node(True, observed) as node_b:
+        monkeypatch.setenv("CONTRACTOR_RUNTIME_INTERNAL_URLS", f"{node_a},{node_b}")
+        response = cp_client.post(
+            "/tenants/tenant_a/aliases/candidate",
+            headers=_headers("cp_test_key_a", "tenant_a"),
+            json={"bundle_id": "demo-faq-0002", "bundle_sha256": "a" * 64},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["aliases"]["candidate"] == {
+        "bundle_id": "demo-faq-0002",
+        "bundle_sha256": "a" * 64,
+        "bundle_tree_sha256": _tree_digest(tmp_path),
+    }
+    assert len(observed) == 2
+    assert all(item["path"] == "/internal/warmup" for item in observed)
+    assert all(item["authorization"] == f"Bearer {INTERNAL_TOKEN}" for item in observed)
+    assert observed[0]["body"] == {
+        "tenant_id": "tenant_a",
+        "bundle_id": "demo-faq-0002",
+        "bundle_sha256": "a" * 64,
+        "bundle_tree_sha256": _tree_digest(tmp_path),
+    }
+
+
+def test_promote_waits_for_warm_quorum(
+    cp_client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    observed: list[dict[str, object]] = []
+    with _runtime_node(True, observed) as warm, _runtime_node(False, observed) as cold:
+        monkeypatch.setenv("CONTRACTOR_RUNTIME_INTERNAL_URLS", f"{warm},{cold}")
+        cp_client.post(
+            "/tenants/tenant_a/aliases/candidate",
+            headers=_headers("cp_test_key_a", "tenant_a"),
+            json={"bundle_id": "demo-faq-0002"},
+        )
+        reached = cp_client.post(
+            "/tenants/tenant_a/aliases/promote",
+            params={"wait_for_warm": "true", "warm_quorum": 1},
+            headers=_headers("cp_test_key_a", "tenant_a"),
+        )
+        not_reached = cp_client.post(
+            "/tenants/tenant_a/aliases/promote",
+            params={
+                "wait_for_warm": "true",
+                "warm_quorum": 2,
+                "warm_timeout_seconds": 0.05,
+            },
+            headers=_headers("cp_test_key_a", "tenant_a"),
+        )
+
+    assert reached.status_code == 200
+    assert reached.json()["aliases"]["current"] == {
+        "bundle_id": "demo-faq-0002",
+        "bundle_tree_sha256": _tree_digest(tmp_path),
+    }
+    assert not_reached.status_code == 409
+    assert not_reached.json()["detail"] == "Warmup quorum not reached"
+
+
+def test_promote_wait_for_warm_requires_runtime_targets(
+    cp_client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv("CONTRACTOR_RUNTIME_INTERNAL_URLS", raising=False)
+    cp_client.post(
+        "/tenants/tenant_a/aliases/candidate",
+        headers=_headers("cp_test_key_a", "tenant_a"),
+        json={"bundle_id": "demo-faq-0002"},
+    )
+
+    response = cp_client.post(
+        "/tenants/tenant_a/aliases/promote",
+        params={"wait_for_warm": "true"},
+        headers=_headers("cp_test_key_a", "tenant_a"),
+    )
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Runtime warmup config missing"
+
+
+def test_runtime_prewarms_candidate_bundle(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    bundle_root = tmp_path / "bundles"
+    _seed_verified_bundle(bundle_root, "demo-faq-0001", SOURCE_BUNDLE)
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: bundle_root)
+    monkeypatch.setattr(runtime, "BUNDLE_WARMUP_STATUS", {})
+    monkeypatch.setattr(runtime, "TENANT_CANDIDATE_BUNDLES", {})
+    monkeypatch.setattr(runtime, "COMPILED_BUNDLES", {})
+    monkeypatch.setenv("CONTRACTOR_INTERNAL_TOKEN", INTERNAL_TOKEN)
+    client = TestClient(runtime.app)
+    headers = {"Authorization": f"Bearer {INTERNAL_TOKEN}"}
+
+    accepted = client.post(
+        "/internal/warmup",
+        json={"tenant_id": "tenant_a", "bundle_id": "demo-faq-0001"},
+        headers=headers,
+    )
+    deadline = time.time() + 5
+    status_response = client.get("/internal/warmup/demo-faq-0001", headers=headers)
+    while status_response.json()["status"] == "pending" and time.time() < deadline:
+        time.sleep(0.01)
+        status_response = client.get("/internal/warmup/demo-faq-0001", headers=headers)
+
+    assert accepted.status_code == 202
+    assert status_response.json() == {"bundle_id": "demo-faq-0001", "status": "warm"}
+    assert runtime.TENANT_CANDIDATE_BUNDLES == {"tenant_a": "demo-faq-0001"}
+    assert ("demo-faq-0001", str(bundle_root / "demo-faq-0001")) in (
+        runtime.COMPILED_BUNDLES
+    )
+    assert runtime.BUNDLE_LEASES.get(str(bundle_root / "demo-faq-0001")) is None
+
+
+def test_candidate_warmup_carries_digests_looked_up_by_control_plane(
+    cp_client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    alias_path = tmp_path / "aliases_with_digest.json"
+    alias_config = {
+        "tenants": {
+            "tenant_b": {
+                "current_bundle_path": "data/bundles/demo/faq",
+                "bundle_id": "demo-faq-0002",
+                "bundle_sha256": "b" * 64,
+            }
+        }
+    }
+    alias_path.write_text(json.dumps(alias_config), encoding="utf-8")
+    monkeypatch.setenv(control_plane.ALIAS_CONFIG_PATH_ENV, str(alias_path))
+    observed: list[dict[str, object]] = []
+    with _runtime_node(True, observed) as node:
+        monkeypatch.setenv("CONTRACTOR_RUNTIME_INTERNAL_URLS", node)
+        response = cp_client.post(
+            "/tenants/tenant_a/aliases/candidate",
+            headers=_headers("cp_test_key_a", "tenant_a"),
+            json={"bundle_id": "demo-faq-0002"},
+        )
+
+    assert response.status_code == 200
+    assert observed[0]["body"] == {
+        "tenant_id": "tenant_a",
+        "bundle_id": "demo-faq-0002",
+        "bundle_sha256": "b" * 64,
+        "bundle_tree_sha256": _tree_digest(tmp_path),
+    }
+
+
+def test_alias_change_releases_candidate_pin(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    bundle_root = tmp_path / "bundles"
+    _seed_verified_bundle(bundle_root, "demo-faq-0001", SOURCE_BUNDLE)
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: bundle_root)
+    monkeypatch.setattr(runtime, "BUNDLE_WARMUP_STATUS", {"demo-faq-0001": "warm"})
+    monkeypatch.setattr(runtime, "TENANT_CANDIDATE_BUNDLES", {})
+    monkeypatch.setenv("CONTRACTOR_INTERNAL_TOKEN", INTERNAL_TOKEN)
+    client = TestClient(runtime.app)
+    headers = {"Authorization": f"Bearer {INTERNAL_TOKEN}"}
+
+    client.post(
+        "/internal/warmup",
+        json={"tenant_id": "tenant_a", "bundle_id": "demo-faq-0001"},
+        headers=headers,
+    )
+    assert runtime.TENANT_CANDIDATE_BUNDLES == {"tenant_a": "demo-faq-0001"}
+    response = client.post(
+        "/internal/aliases/tenant_a/changed",
+        json={"bundle_id": "demo-faq-0001"},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert runtime.TENANT_CANDIDATE_BUNDLES == {}
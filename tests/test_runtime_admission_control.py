@@ -0,0 +1,175 @@
+# tests/test_runtime_admission_control.py
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import runtime
+from tests.conftest import _runtime_events, _runtime_headers
+
+
+def _controller(**overrides: float) -> runtime.AdmissionController:
+    settings: dict[str, float] = {
+        "initial_limit": 1,
+        "max_limit": 1,
+        "max_queue": 8,
+        "queue_target_seconds": 2.0,
+        "latency_target_seconds": 1.0,
+    }
+    settings.update(overrides)
+    return runtime.AdmissionController(**settings)  # type: ignore[arg-type]
+
+
+@pytest.fixture(autouse=True)
+def admission_state(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(runtime, "ADMISSION_CONTROLLERS", {})
+    monkeypatch.setattr(runtime, "RATE_LIMIT_COUNTERS", {})
+    monkeypatch.setattr(runtime, "RATE_LIMIT_EXPIRY", [])
+
+
+def test_weighted_fair_queuing_interleaves_tenants() -> None:
+    controller = _controller()
+    controller.acquire("tenant_a")
+    admitted: list[str] = []
+    threads: list[threading.Thread] = []
+
+    def _wait_turn(name: str, tenant_id: str, weight: int) -> None:
+        controller.acquire(tenant_id, weight=weight)
+        admitted.append(name)
+
+    # tenant_a enfileira três requests antes de tenant_b (peso 2) chegar.
+    for name, tenant_id, weight in [
+        ("a1", "tenant_a", 1),
+        ("a2", "tenant_a", 1),
+        ("a3", "tenant_a", 1),
+        ("b1", "tenant_b", 2),
+        ("b2", "tenant_b", 2),
+    ]:
+        thread = threading.Thread(target=_wait_turn, args=(name, tenant_id, weight))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02)
+    assert controller.snapshot()["queued_by_tenant"] == {"tenant_a": 3, "tenant_b": 2}
+
+    for expected in range(1, 6):
+        controller.release(0.0)
+        deadline = time.monotonic() + 1
+        while len(admitted) < expected and time.monotonic() < deadline:
+            time.sleep(0.005)
+    for thread in threads:
+        thread.join(timeout=1)
+
+    assert admitted == ["b1", "a1", "b2", "a2", "a3"]
+    assert controller.snapshot()["queued"] == 0
+
+
+def test_limit_adapts_to_latency() -> None:
+    controller = _controller(initial_limit=10, max_limit=20)
+
+    for _ in range(3):
+        controller.acquire("tenant_a")
+        controller.release(1.5)
+    assert controller.snapshot()["limit"] == pytest.approx(10 * 0.9**3, abs=0.001)
+
+    limit_before = controller.limit
+    controller.acquire("tenant_a")
+    controller.release(0.1)
+    assert controller.limit == pytest.approx(limit_before + 1 / limit_before)
+
+
+def test_sheds_when_queue_is_full_or_wait_exceeds_target() -> None:
+    controller = _controller(max_queue=1, queue_target_seconds=0.05)
+    controller.acquire("tenant_a")
+
+    # Espera além do alvo: a request sai da fila com 503.
+    with pytest.raises(runtime.LoadShedError):
+        controller.acquire("tenant_b")
+
+    def _queued_then_shed() -> None:
+        with pytest.raises(runtime.LoadShedError):
+            controller.acquire("tenant_b")
+
+    blocker = threading.Thread(target=_queued_then_shed)
+    blocker.start()
+    time.sleep(0.01)
+    with pytest.raises(runtime.LoadShedError):
+        controller.acquire("tenant_c")
+    blocker.join(timeout=1)
+
+    # Com tempo de serviço observado, a espera estimada já rejeita sem enfileirar.
+    controller.release(1.0)
+    controller.acquire("tenant_a")
+    with pytest.raises(runtime.LoadShedError):
+        controller.acquire("tenant_b")
+
+    assert controller.snapshot()["shed_by_reason"] == {
+        "queue_full": 1,
+        "wait_estimate": 1,
+        "wait_timeout": 2,
+    }
+
+
+def test_execute_is_shed_with_distinct_error_code(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.setenv("CONTRACTOR_ADMISSION_INITIAL_LIMIT", "1")
+    monkeypatch.setenv("CONTRACTOR_ADMISSION_MAX_LIMIT", "1")
+    monkeypatch.setenv("CONTRACTOR_ADMISSION_QUEUE_TARGET_SECONDS", "0.05")
+    monkeypatch.setenv("CONTRACTOR_INTERNAL_TOKEN", "internal-test-token")
+    controller = runtime._admission_controller()
+    controller.acquire("tenant_busy")
+
+    response = runtime_client.post(
+        "/execute", json={"question": "x"}, headers=_runtime_headers("rid-shed")
+    )
+    metrics = runtime_client.get(
+        "/internal/metrics", headers={"Authorization": "Bearer internal-test-token"}
+    ).json()
+    events = _runtime_events(capsys.readouterr().out)
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Runtime overloaded"
+    assert events[-1]["error_code"] == "load_shed"
+    # Rejeitada antes do rate limit: não consome janela nem quota do tenant.
+    assert "rate_limit" not in events[-1]
+    assert runtime.RATE_LIMIT_COUNTERS == {}
+    assert metrics["admission"]["in_flight"] == 1
+    assert metrics["admission"]["shed_total"] == 1
+
+
+def test_policy_weight_is_validated(monkeypatch: pytest.MonkeyPatch) -> None:
+    policy = {
+        "rate_limit": {"window_seconds": 60, "max_requests": 10},
+        "quota": {"window_seconds": 60, "max_requests": 10},
+        "tenants": {"*": {}, "tenant_a": {"weight": 3}},
+    }
+    monkeypatch.setenv("CONTRACTOR_RATE_LIMIT_POLICY_JSON", json.dumps(policy))
+    assert runtime.resolve_tenant_policy("tenant_a")["weight"] == 3
+    assert runtime.resolve_tenant_policy("tenant_b")["weight"] == 1
+
+    policy["tenants"]["tenant_a"] = {"weight": 0}
+    monkeypatch.setenv("CONTRACTOR_RATE_LIMIT_POLICY_JSON", json.dumps(policy))
+    with pytest.raises(runtime.RuntimeConfigError, match="Rate limit policy invalid"):
+        runtime.resolve_tenant_policy("tenant_a")
+
+
+def test_admission_slots_and_queue_fit_the_threadpool(monkeypatch: pytest.MonkeyPatch) -> None:
+    controller = runtime._admission_controller()
+    assert controller.max_limit + controller.max_queue <= (
+        runtime.DEFAULT_RUNTIME_THREADPOOL_SIZE - runtime.RUNTIME_THREADPOOL_RESERVE
+    )
+
+    monkeypatch.setenv("CONTRACTOR_ADMISSION_MAX_LIMIT", "256")
+    with pytest.raises(runtime.RuntimeConfigError, match="Admission control config invalid"):
+        runtime._admission_controller()
+
+    monkeypatch.setenv("CONTRACTOR_RUNTIME_THREADPOOL_SIZE", "300")
+    assert runtime._admission_controller().max_limit == 256
+
+    monkeypatch.setenv("CONTRACTOR_RUNTIME_THREADPOOL_SIZE", "8")
+    with pytest.raises(runtime.RuntimeConfigError, match="Runtime threadpool config invalid"):
+        runtime._admission_controller()
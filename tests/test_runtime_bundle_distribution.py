@@ -1,153 +1,25 @@
 # tests/test_runtime_bundle_distribution.py
 import hashlib
+import io
 import json
 import shutil
 import tarfile
-import threading
-from collections.abc import Iterator
-from contextlib import contextmanager
-from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 
 import pytest
 import yaml
 from fastapi.testclient import TestClient
 
-from app import runtime
-
-
-def _repo_root() -> Path:
-    return Path(__file__).resolve().parent.parent
-
-
-def _source_bundle_path() -> Path:
-    return _repo_root() / "data" / "bundles" / "demo" / "faq"
-
-
-def _bundle_id() -> str:
-    manifest = yaml.safe_load(
-        (_source_bundle_path() / "manifest.yaml").read_text(encoding="utf-8")
-    )
-    return str(manifest["bundle_id"])
-
-
-def _make_bundle_tarball(tmp_path: Path, bundle_id: str) -> tuple[Path, str]:
-    archive = tmp_path / f"{bundle_id}.tar.gz"
-    with tarfile.open(archive, mode="w:gz") as tar:
-        tar.add(_source_bundle_path(), arcname=bundle_id)
-    digest = hashlib.sha256(archive.read_bytes()).hexdigest()
-    return archive, digest
-
-
-def _runtime_headers(request_id: str = "rid-0017") -> dict[str, str]:
-    return {
-        "X-Tenant-Id": "tenant_a",
-        "X-Api-Key": "runtime_test_key_a",
-        "X-Request-Id": request_id,
-    }
-
-
-@contextmanager
-def _control_plane_server(
-    tenant_id: str,
-    payload: dict[str, object],
-    status_code: int = 200,
-) -> Iterator[str]:
-    body = json.dumps(payload).encode("utf-8")
-
-    class Handler(BaseHTTPRequestHandler):
-        def do_GET(self) -> None:  # noqa: N802
-            expected_path = f"/tenants/{tenant_id}/resolve/current"
-            if self.path != expected_path:
-                self.send_response(404)
-                self.end_headers()
-                return
-            self.send_response(status_code)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(body)
-
-        def log_message(self, format: str, *args: object) -> None:  # noqa: A003
-            return
-
-    server = HTTPServer(("127.0.0.1", 0), Handler)
-    thread = threading.Thread(target=server.serve_forever, daemon=True)
-    thread.start()
-    try:
-        host, port = server.server_address
-        yield f"http://{host}:{port}"
-    finally:
-        server.shutdown()
-        server.server_close()
-        thread.join(timeout=1)
-
-
-@contextmanager
-def _origin_server(directory: Path) -> Iterator[str]:
-    class Handler(BaseHTTPRequestHandler):
-        def do_GET(self) -> None:  # noqa: N802
-            requested = self.path.lstrip("/")
-            archive_path = directory / requested
-            if not archive_path.exists():
-                self.send_response(404)
-                self.end_headers()
-                return
-            self.send_response(200)
-            self.send_header("Content-Type", "application/gzip")
-            self.end_headers()
-            self.wfile.write(archive_path.read_bytes())
-
-        def log_message(self, format: str, *args: object) -> None:  # noqa: A003
-            return
-
-    server = HTTPServer(("127.0.0.1", 0), Handler)
-    thread = threading.Thread(target=server.serve_forever, daemon=True)
-    thread.start()
-    try:
-        host, port = server.server_address
-        yield f"http://{host}:{port}"
-    finally:
-        server.shutdown()
-        server.server_close()
-        thread.join(timeout=1)
-
-
-@pytest.fixture
-def runtime_client(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> TestClient:
-    runtime.RATE_LIMIT_COUNTERS.clear()
-    monkeypatch.setenv(
-        "CONTRACTOR_AUDIT_CONFIG_JSON",
-        json.dumps(
-            {
-                "enabled": True,
-                "sink": "stdout",
-                "file_path": "data/audit/audit.log.jsonl",
-                "retention_days": 7,
-            }
-        ),
-    )
-    monkeypatch.setenv(
-        "CONTRACTOR_TENANT_KEYS", json.dumps({"tenant_a": "runtime_test_key_a"})
-    )
-    monkeypatch.setenv(
-        "CONTRACTOR_RATE_LIMIT_POLICY_JSON",
-        json.dumps(
-            {
-                "rate_limit": {"window_seconds": 60, "max_requests": 100},
-                "quota": {"window_seconds": 86400, "max_requests": 100},
-                "tenants": {
-                    "*": {
-                        "rate_limit": {"window_seconds": 60, "max_requests": 100},
-                        "quota": {"window_seconds": 86400, "max_requests": 100},
-                    }
-                },
-            }
-        ),
-    )
-    bundle_root = tmp_path / "data" / "bundles"
-    bundle_root.mkdir(parents=True, exist_ok=True)
-    monkeypatch.setattr(runtime, "_bundle_root", lambda: bundle_root)
-    return TestClient(runtime.app)
+from app import control_plane, runtime
+from tests.conftest import (
+    _bundle_id,
+    _control_plane_server,
+    _make_bundle_tarball,
+    _origin_server,
+    _runtime_headers,
+    _seed_verified_bundle,
+    _source_bundle_path,
+)
 
 
 def test_bundle_cache_hit(
@@ -157,8 +29,7 @@ def test_bundle_cache_hit(
     capsys: pytest.CaptureFixture[str],
 ) -> None:
     bundle_id = _bundle_id()
-    target = tmp_path / "data" / "bundles" / bundle_id
-    shutil.copytree(_source_bundle_path(), target)
+    _seed_verified_bundle(tmp_path / "data" / "bundles", bundle_id)
     cp_payload = {
         "bundle_id": bundle_id,
         "runtime_compatibility": {"min_version": "0.0.0"},
@@ -176,7 +47,12 @@ def test_bundle_cache_hit(
     assert response.status_code == 200
     events = [json.loads(line) for line in captured.splitlines() if line.strip()]
     runtime_event = [e for e in events if e.get("service") == "runtime"][0]
-    assert runtime_event["bundle_cache"] == {"status": "hit", "bundle_id": bundle_id}
+    assert runtime_event["bundle_cache"] == {
+        "status": "hit",
+        "bundle_id": bundle_id,
+        "counters": {"hit": 1, "miss": 0, "evict": 0},
+    }
+    assert runtime.BUNDLE_LEASES == {}
 
 
 def test_bundle_cache_miss_download_unpack_execute(
@@ -291,3 +167,255 @@ def test_bundle_not_found_in_origin_returns_503(
 
     assert response.status_code == 503
     assert response.json()["detail"] == "Bundle not found in origin"
+
+
+def _seed_cached_bundle(bundle_root: Path, name: str, last_used: float) -> Path:
+    target = bundle_root / name
+    shutil.copytree(_source_bundle_path(), target)
+    runtime.BUNDLE_CACHE_LAST_USED[str(target)] = last_used
+    return target
+
+
+def test_bundle_cache_evicts_least_recently_used_over_budget(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    bundle_root = tmp_path / "data" / "bundles"
+    oldest = _seed_cached_bundle(bundle_root, "old-bundle-0001", 1000.0)
+    recent = _seed_cached_bundle(bundle_root, "old-bundle-0002", 2000.0)
+    bundle_id = _bundle_id()
+    archive, digest = _make_bundle_tarball(tmp_path, bundle_id)
+    cp_payload = {
+        "bundle_id": bundle_id,
+        "bundle_sha256": digest,
+        "runtime_compatibility": {"min_version": "0.0.0"},
+    }
+    monkeypatch.setenv("CONTRACTOR_BUNDLE_CACHE_MAX_BUNDLES", "2")
+
+    with _origin_server(archive.parent) as origin_base:
+        with _control_plane_server("tenant_a", cp_payload) as cp_base:
+            monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+            monkeypatch.setenv("CONTRACTOR_BUNDLE_BASE_URL", origin_base)
+            response = runtime_client.post(
+                "/execute",
+                json={"question": "O que é o CONTRACTOR?"},
+                headers=_runtime_headers("rid-evict"),
+            )
+    captured = capsys.readouterr().out
+
+    assert response.status_code == 200
+    assert not oldest.exists()
+    assert recent.exists()
+    assert (bundle_root / bundle_id / "manifest.yaml").exists()
+    assert not [p for p in bundle_root.iterdir() if p.name.startswith(".evicting")]
+    events = [json.loads(line) for line in captured.splitlines() if line.strip()]
+    runtime_event = [e for e in events if e.get("service") == "runtime"][0]
+    assert runtime_event["bundle_cache"]["status"] == "miss"
+    assert runtime_event["bundle_cache"]["counters"] == {
+        "hit": 0,
+        "miss": 1,
+        "evict": 1,
+    }
+
+
+def test_bundle_cache_eviction_skips_pinned_and_leased_bundles(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    bundle_root = tmp_path / "data" / "bundles"
+    pinned = _seed_cached_bundle(bundle_root, "pinned-bundle", 1000.0)
+    leased = _seed_cached_bundle(bundle_root, "leased-bundle", 1500.0)
+    idle = _seed_cached_bundle(bundle_root, "idle-bundle", 2000.0)
+    runtime.TENANT_CURRENT_BUNDLES["tenant_b"] = "pinned-bundle"
+    runtime.BUNDLE_LEASES[str(leased)] = 1
+    monkeypatch.setenv("CONTRACTOR_BUNDLE_CACHE_MAX_BUNDLES", "1")
+
+    evicted = runtime.evict_bundles_over_budget()
+
+    assert evicted == ["idle-bundle"]
+    assert pinned.exists()
+    assert leased.exists()
+    assert not idle.exists()
+
+
+def test_bundle_cache_evicts_by_byte_budget(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    bundle_root = tmp_path / "data" / "bundles"
+    first = _seed_cached_bundle(bundle_root, "bundle-a", 1000.0)
+    second = _seed_cached_bundle(bundle_root, "bundle-b", 2000.0)
+    size = sum(p.stat().st_size for p in second.rglob("*") if p.is_file())
+    monkeypatch.setenv("CONTRACTOR_BUNDLE_CACHE_MAX_BYTES", str(size))
+
+    evicted = runtime.evict_bundles_over_budget()
+
+    assert evicted == ["bundle-a"]
+    assert not first.exists()
+    assert second.exists()
+
+
+def _make_next_bundle(tmp_path: Path, bundle_id: str) -> Path:
+    target = tmp_path / "next" / bundle_id
+    shutil.copytree(_source_bundle_path(), target)
+    manifest = yaml.safe_load((target / "manifest.yaml").read_text(encoding="utf-8"))
+    manifest["bundle_id"] = bundle_id
+    (target / "manifest.yaml").write_text(yaml.safe_dump(manifest), encoding="utf-8")
+    faq_path = target / "data" / "faq.json"
+    faq = json.loads(faq_path.read_text(encoding="utf-8"))
+    faq[0]["answer"] = "Resposta atualizada via delta."
+    faq_path.write_text(json.dumps(faq, ensure_ascii=False), encoding="utf-8")
+    (target / "suites" / "faq_golden_tenant_b.json").unlink()
+    return target
+
+
+def test_bundle_cache_miss_applies_delta_from_base_bundle(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    base_bundle_id = _bundle_id()
+    shutil.copytree(
+        _source_bundle_path(), tmp_path / "data" / "bundles" / base_bundle_id
+    )
+    next_bundle_id = "demo-faq-0002"
+    next_bundle = _make_next_bundle(tmp_path, next_bundle_id)
+    origin_dir = tmp_path / "origin"
+    delta_manifest = control_plane.build_bundle_delta(
+        _source_bundle_path(),
+        next_bundle,
+        origin_dir / runtime.bundle_delta_artifact_name(next_bundle_id, base_bundle_id),
+    )
+    assert delta_manifest["changed"] == ["data/faq.json", "manifest.yaml"]
+    assert delta_manifest["removed"] == ["suites/faq_golden_tenant_b.json"]
+    runtime.TENANT_CURRENT_BUNDLES["tenant_a"] = base_bundle_id
+    cp_payload = {
+        "bundle_id": next_bundle_id,
+        "bundle_tree_sha256": runtime.compute_bundle_tree_digest(next_bundle),
+        "runtime_compatibility": {"min_version": "0.0.0"},
+    }
+
+    with _origin_server(origin_dir) as origin_base:
+        with _control_plane_server("tenant_a", cp_payload) as cp_base:
+            monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+            monkeypatch.setenv("CONTRACTOR_BUNDLE_BASE_URL", origin_base)
+            response = runtime_client.post(
+                "/execute",
+                json={"question": "O que é um bundle no CONTRACTOR?"},
+                headers=_runtime_headers("rid-delta"),
+            )
+
+    assert response.status_code == 200
+    assert response.json()["bundle_id"] == next_bundle_id
+    assert response.json()["result"]["answer"] == "Resposta atualizada via delta."
+    local_bundle = tmp_path / "data" / "bundles" / next_bundle_id
+    assert not (local_bundle / "suites" / "faq_golden_tenant_b.json").exists()
+    assert runtime.compute_bundle_tree_digest(local_bundle) == (
+        cp_payload["bundle_tree_sha256"]
+    )
+
+
+def test_bundle_delta_digest_mismatch_falls_back_to_full_archive(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    base_bundle_id = "demo-faq-base"
+    base_bundle = _make_next_bundle(tmp_path, base_bundle_id)
+    shutil.copytree(base_bundle, tmp_path / "data" / "bundles" / base_bundle_id)
+    bundle_id = _bundle_id()
+    archive, digest = _make_bundle_tarball(tmp_path, bundle_id)
+    control_plane.build_bundle_delta(
+        base_bundle,
+        _source_bundle_path(),
+        archive.parent / runtime.bundle_delta_artifact_name(bundle_id, base_bundle_id),
+    )
+    runtime.TENANT_CURRENT_BUNDLES["tenant_a"] = base_bundle_id
+    cp_payload = {
+        "bundle_id": bundle_id,
+        "bundle_sha256": digest,
+        "bundle_tree_sha256": "0" * 64,
+        "runtime_compatibility": {"min_version": "0.0.0"},
+    }
+
+    with _origin_server(archive.parent) as origin_base:
+        with _control_plane_server("tenant_a", cp_payload) as cp_base:
+            monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+            monkeypatch.setenv("CONTRACTOR_BUNDLE_BASE_URL", origin_base)
+            response = runtime_client.post(
+                "/execute",
+                json={"question": "O que é o CONTRACTOR?"},
+                headers=_runtime_headers("rid-delta-fallback"),
+            )
+
+    assert response.status_code == 200
+    assert response.json()["bundle_id"] == bundle_id
+
+
+def _write_delta_artifact(path: Path, kind: str, bundle_id: str, base_bundle_id: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if kind == "html":
+        path.write_bytes(b"<html><body>502 Bad Gateway</body></html>")
+        return
+    if kind == "truncated":
+        with tarfile.open(path, mode="w:gz") as tar:
+            tar.add(_source_bundle_path(), arcname=".")
+        path.write_bytes(path.read_bytes()[:200])
+        return
+    manifest = json.dumps(
+        {
+            "format": runtime.BUNDLE_DELTA_FORMAT,
+            "bundle_id": bundle_id,
+            "base_bundle_id": base_bundle_id,
+            "removed": ["data"],
+            "changed": [],
+        }
+    ).encode("utf-8")
+    with tarfile.open(path, mode="w:gz") as tar:
+        info = tarfile.TarInfo("delta.json")
+        info.size = len(manifest)
+        tar.addfile(info, io.BytesIO(manifest))
+
+
+@pytest.mark.parametrize("kind", ["html", "truncated", "removes_directory"])
+def test_garbage_bundle_delta_falls_back_to_full_archive(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    kind: str,
+) -> None:
+    base_bundle_id = "demo-faq-base"
+    base_bundle = _make_next_bundle(tmp_path, base_bundle_id)
+    shutil.copytree(base_bundle, tmp_path / "data" / "bundles" / base_bundle_id)
+    bundle_id = _bundle_id()
+    archive, digest = _make_bundle_tarball(tmp_path, bundle_id)
+    _write_delta_artifact(
+        archive.parent / runtime.bundle_delta_artifact_name(bundle_id, base_bundle_id),
+        kind,
+        bundle_id,
+        base_bundle_id,
+    )
+    runtime.TENANT_CURRENT_BUNDLES["tenant_a"] = base_bundle_id
+    cp_payload = {
+        "bundle_id": bundle_id,
+        "bundle_sha256": digest,
+        "bundle_tree_sha256": runtime.compute_bundle_tree_digest(_source_bundle_path()),
+        "runtime_compatibility": {"min_version": "0.0.0"},
+    }
+
+    with _origin_server(archive.parent) as origin_base:
+        with _control_plane_server("tenant_a", cp_payload) as cp_base:
+            monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+            monkeypatch.setenv("CONTRACTOR_BUNDLE_BASE_URL", origin_base)
+            response = runtime_client.post(
+                "/execute",
+                json={"question": "O que é o CONTRACTOR?"},
+                headers=_runtime_headers(f"rid-delta-{kind}"),
+            )
+
+    assert response.status_code == 200
+    assert response.json()["bundle_id"] == bundle_id
@@ -0,0 +1,172 @@
+# tests/test_runtime_bundle_fetch_pool.py
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import runtime
+
+INTERNAL_TOKEN = "internal-test-token"
+
+
+@pytest.fixture
+def fetch_state(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> dict[str, object]:
+    root = tmp_path / "data" / "bundles"
+    root.mkdir(parents=True)
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: root)
+    monkeypatch.setattr(runtime, "VERIFIED_BUNDLES", {})
+    monkeypatch.setattr(runtime, "BUNDLE_LEASES", {})
+    monkeypatch.setattr(runtime, "BUNDLE_FETCHES", {})
+    monkeypatch.setattr(runtime, "BUNDLE_FETCH_TENANT_IN_FLIGHT", {})
+    monkeypatch.setattr(
+        runtime, "BUNDLE_FETCH_METRICS", dict.fromkeys(runtime.BUNDLE_FETCH_METRICS, 0)
+    )
+    release = threading.Event()
+    calls: list[str] = []
+
+    def _slow_ensure_local_bundle(
+        bundle_id: str, expected_digest: str | None, **_: object
+    ) -> tuple[Path, str]:
+        calls.append(bundle_id)
+        release.wait(timeout=5)
+        bundle_path = root / bundle_id
+        with runtime._BUNDLE_CACHE_LOCK:
+            runtime.VERIFIED_BUNDLES[str(bundle_path)] = "0" * 64
+            runtime._acquire_bundle_lease(bundle_path)
+        return bundle_path, "miss"
+
+    monkeypatch.setattr(runtime, "ensure_local_bundle", _slow_ensure_local_bundle)
+    return {"root": root, "release": release, "calls": calls}
+
+
+def _fetch_in_thread(
+    tenant_id: str, bundle_id: str, results: list[object]
+) -> threading.Thread:
+    def _target() -> None:
+        try:
+            results.append(runtime.fetch_bundle(tenant_id, bundle_id, "0" * 64))
+        except runtime.RuntimeConfigError as exc:
+            results.append(str(exc))
+
+    thread = threading.Thread(target=_target)
+    thread.start()
+    return thread
+
+
+def _wait_for(predicate: object, timeout: float = 5.0) -> None:
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:  # type: ignore[operator]
+        time.sleep(0.01)
+
+
+def test_concurrent_misses_share_one_fetch(fetch_state: dict[str, object]) -> None:
+    results: list[object] = []
+    threads = [_fetch_in_thread("tenant_a", "demo-faq-0001", results) for _ in range(3)]
+    _wait_for(lambda: len(fetch_state["calls"]) == 1)  # type: ignore[arg-type]
+    fetch_state["release"].set()  # type: ignore[attr-defined]
+    for thread in threads:
+        thread.join(timeout=5)
+
+    bundle_path = fetch_state["root"] / "demo-faq-0001"  # type: ignore[operator]
+    assert fetch_state["calls"] == ["demo-faq-0001"]
+    assert results == [(bundle_path, "miss")] * 3
+    assert runtime.BUNDLE_LEASES == {str(bundle_path): 3}
+    assert runtime.BUNDLE_FETCHES == {}
+    assert runtime.BUNDLE_FETCH_METRICS["completed"] == 1
+    assert runtime.BUNDLE_FETCH_METRICS["queued"] == 0
+    assert runtime.BUNDLE_FETCH_METRICS["running"] == 0
+
+
+def test_tenant_bulkhead_and_wait_deadline(
+    fetch_state: dict[str, object], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("CONTRACTOR_BUNDLE_FETCH_MAX_PER_TENANT", "1")
+    monkeypatch.setenv("CONTRACTOR_BUNDLE_FETCH_WAIT_SECONDS", "0.05")
+
+    with pytest.raises(runtime.RuntimeConfigError, match="Bundle fetch timed out"):
+        runtime.fetch_bundle("tenant_a", "demo-faq-0001", "0" * 64)
+    with pytest.raises(
+        runtime.RuntimeConfigError, match="Bundle fetch capacity exceeded"
+    ) as exc_info:
+        runtime.fetch_bundle("tenant_a", "demo-faq-0002", "0" * 64)
+    assert exc_info.value.status_code == 503
+
+    # Outro tenant não é afetado pelo bulkhead de tenant_a.
+    results: list[object] = []
+    thread = _fetch_in_thread("tenant_b", "demo-faq-0002", results)
+    _wait_for(lambda: len(fetch_state["calls"]) == 2)  # type: ignore[arg-type]
+    monkeypatch.setenv("CONTRACTOR_BUNDLE_FETCH_WAIT_SECONDS", "5")
+    fetch_state["release"].set()  # type: ignore[attr-defined]
+    thread.join(timeout=5)
+
+    assert results == [(fetch_state["root"] / "demo-faq-0002", "miss")]  # type: ignore[operator]
+    assert runtime.BUNDLE_FETCH_METRICS["rejected"] == 1
+    assert runtime.BUNDLE_FETCH_METRICS["timed_out"] == 1
+    _wait_for(lambda: runtime.BUNDLE_FETCH_TENANT_IN_FLIGHT == {})
+    # O fetch que estourou o deadline terminou no pool e vira hit na próxima request.
+    path, _ = runtime.fetch_bundle("tenant_a", "demo-faq-0001", "0" * 64)
+    assert path == fetch_state["root"] / "demo-faq-0001"  # type: ignore[operator]
+
+
+def test_internal_metrics_endpoint(
+    fetch_state: dict[str, object], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client = TestClient(runtime.app)
+    monkeypatch.delenv("CONTRACTOR_INTERNAL_TOKEN", raising=False)
+    assert client.get("/internal/metrics").status_code == 404
+
+    monkeypatch.setenv("CONTRACTOR_INTERNAL_TOKEN", INTERNAL_TOKEN)
+    response = client.get(
+        "/internal/metrics", headers={"Authorization": f"Bearer {INTERNAL_TOKEN}"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {
+        "admission",
+        "bundle_cache",
+        "bundle_fetch",
+        "bundle_scrub",
+        "coalescing",
+        "control_plane_breakers",
+        "control_plane_hedging",
+        "negative_cache",
+        "suggestions",
+        "faq_memory",
+        "response_cache",
+    }
+    assert body["bundle_fetch"]["queued"] == 0
+    assert body["bundle_fetch"]["in_flight_by_tenant"] == {}
+
+
+def test_short_leader_deadline_does_not_cancel_shared_fetch(
+    fetch_state: dict[str, object], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    slow_ensure = runtime.ensure_local_bundle
+    deadlines: list[object] = []
+
+    def _ensure_honoring_deadline(
+        bundle_id: str, expected_digest: str | None, **kwargs: object
+    ) -> tuple[Path, str]:
+        deadlines.append(kwargs.get("deadline"))
+        result = slow_ensure(bundle_id, expected_digest)
+        if kwargs.get("deadline") is not None:
+            kwargs["deadline"].check()  # type: ignore[attr-defined]
+        return result
+
+    monkeypatch.setattr(runtime, "ensure_local_bundle", _ensure_honoring_deadline)
+
+    with pytest.raises(runtime.DeadlineExceededError):
+        runtime.fetch_bundle(
+            "tenant_a", "demo-faq-0001", "0" * 64, deadline=runtime.Deadline.after(0.001)
+        )
+    results: list[object] = []
+    thread = _fetch_in_thread("tenant_a", "demo-faq-0001", results)
+    fetch_state["release"].set()  # type: ignore[attr-defined]
+    thread.join(timeout=5)
+
+    assert results == [(fetch_state["root"] / "demo-faq-0001", "miss")]  # type: ignore[operator]
+    assert fetch_state["calls"] == ["demo-faq-0001"]
+    assert deadlines == [None]
@@ -0,0 +1,209 @@
+# tests/test_runtime_bundle_peers.py
+import io
+import shutil
+import tarfile
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import runtime
+from tests.conftest import (
+    INTERNAL_TOKEN,
+    _bundle_id,
+    _control_plane_server,
+    _make_bundle_tarball,
+    _origin_server,
+    _runtime_headers,
+    _seed_verified_bundle,
+    _source_bundle_path,
+)
+
+
+@contextmanager
+def _peer_runtime_server(
+    bundle_root: Path, observed: list[str], tamper: bool = False
+) -> Iterator[str]:
+    # Simula outro nó do Runtime expondo GET /internal/bundles/{bundle_id}.tar.
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            observed.append(self.path)
+            prefix, suffix = "/internal/bundles/", ".tar"
+            bundle_id = self.path[len(prefix) : -len(suffix)]
+            bundle_path = bundle_root / bundle_id
+            if (
+                not self.path.startswith(prefix)
+                or self.headers.get("Authorization") != f"Bearer {INTERNAL_TOKEN}"
+                or not bundle_path.is_dir()
+            ):
+                self.send_response(404)
+                self.end_headers()
+                return
+            tar_path = bundle_root / f".{bundle_id}.tar"
+            runtime.write_bundle_tar(bundle_path, tar_path)
+            body = tar_path.read_bytes()
+            if tamper:
+                body = _tampered_tar(body)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-tar")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A003
+            return
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=1)
+
+
+def _tampered_tar(body: bytes) -> bytes:
+    output = io.BytesIO()
+    with tarfile.open(fileobj=io.BytesIO(body), mode="r:") as source:
+        with tarfile.open(fileobj=output, mode="w") as target:
+            for member in source.getmembers():
+                data = source.extractfile(member).read()  # type: ignore[union-attr]
+                if member.name == "data/faq.json":
+                    data = data.replace(b"bundle", b"BUNDLE")
+                    member.size = len(data)
+                target.addfile(member, io.BytesIO(data))
+    return output.getvalue()
+
+
+def test_internal_bundle_endpoint_requires_token(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    missing = runtime_client.get(f"/internal/bundles/{_bundle_id()}.tar")
+    monkeypatch.setenv("CONTRACTOR_INTERNAL_TOKEN", INTERNAL_TOKEN)
+    unauthorized = runtime_client.get(f"/internal/bundles/{_bundle_id()}.tar")
+    forbidden = runtime_client.get(
+        f"/internal/bundles/{_bundle_id()}.tar",
+        headers={"Authorization": "Bearer wrong"},
+    )
+
+    assert missing.status_code == 404
+    assert unauthorized.status_code == 401
+    assert forbidden.status_code == 403
+
+
+def test_internal_bundle_endpoint_serves_verified_tar(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    bundle_id = _bundle_id()
+    cached = _seed_verified_bundle(tmp_path / "data" / "bundles", bundle_id)
+    # Sem marker nada garante a origem do conteúdo: não é servido a peers.
+    shutil.copytree(_source_bundle_path(), tmp_path / "data" / "bundles" / "unmarked")
+    monkeypatch.setenv("CONTRACTOR_INTERNAL_TOKEN", INTERNAL_TOKEN)
+    headers = {"Authorization": f"Bearer {INTERNAL_TOKEN}"}
+
+    response = runtime_client.get(f"/internal/bundles/{bundle_id}.tar", headers=headers)
+    missing = runtime_client.get("/internal/bundles/unknown.tar", headers=headers)
+    unmarked = runtime_client.get("/internal/bundles/unmarked.tar", headers=headers)
+
+    assert response.status_code == 200
+    extract_path = tmp_path / "extracted"
+    with tarfile.open(fileobj=io.BytesIO(response.content), mode="r:") as tar:
+        tar.extractall(extract_path, filter="data")
+    assert runtime.compute_bundle_tree_digest(extract_path) == (
+        runtime.compute_bundle_tree_digest(cached)
+    )
+    assert missing.status_code == 404
+    assert unmarked.status_code == 404
+    assert runtime.BUNDLE_LEASES == {}
+
+
+def test_bundle_cache_miss_fetches_from_peer_before_origin(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    bundle_id = _bundle_id()
+    holder_root = tmp_path / "peer-holder"
+    shutil.copytree(_source_bundle_path(), holder_root / bundle_id)
+    empty_root = tmp_path / "peer-empty"
+    empty_root.mkdir()
+    cp_payload = {
+        "bundle_id": bundle_id,
+        "bundle_tree_sha256": runtime.compute_bundle_tree_digest(_source_bundle_path()),
+        "runtime_compatibility": {"min_version": "0.0.0"},
+    }
+    observed_holder: list[str] = []
+    observed_empty: list[str] = []
+    monkeypatch.setenv("CONTRACTOR_INTERNAL_TOKEN", INTERNAL_TOKEN)
+
+    with _peer_runtime_server(holder_root, observed_holder) as holder:
+        with _peer_runtime_server(empty_root, observed_empty) as empty:
+            with _control_plane_server("tenant_a", cp_payload) as cp_base:
+                monkeypatch.setenv("CONTRACTOR_BUNDLE_PEERS", f"{holder},{empty}")
+                monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+                monkeypatch.delenv("CONTRACTOR_BUNDLE_BASE_URL", raising=False)
+                response = runtime_client.post(
+                    "/execute",
+                    json={"question": "O que é um bundle no CONTRACTOR?"},
+                    headers=_runtime_headers("rid-peer"),
+                )
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+    assert observed_holder == [f"/internal/bundles/{bundle_id}.tar"]
+    assert (tmp_path / "data" / "bundles" / bundle_id / "manifest.yaml").exists()
+
+
+def test_bundle_peer_digest_mismatch_falls_back_to_origin(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    bundle_id = _bundle_id()
+    holder_root = tmp_path / "peer-holder"
+    shutil.copytree(_source_bundle_path(), holder_root / bundle_id)
+    archive, digest = _make_bundle_tarball(tmp_path, bundle_id)
+    cp_payload = {
+        "bundle_id": bundle_id,
+        "bundle_sha256": digest,
+        "bundle_tree_sha256": runtime.compute_bundle_tree_digest(_source_bundle_path()),
+        "runtime_compatibility": {"min_version": "0.0.0"},
+    }
+    observed: list[str] = []
+    monkeypatch.setenv("CONTRACTOR_INTERNAL_TOKEN", INTERNAL_TOKEN)
+
+    with _peer_runtime_server(holder_root, observed, tamper=True) as peer:
+        with _origin_server(archive.parent) as origin_base:
+            with _control_plane_server("tenant_a", cp_payload) as cp_base:
+                monkeypatch.setenv("CONTRACTOR_BUNDLE_PEERS", peer)
+                monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+                monkeypatch.setenv("CONTRACTOR_BUNDLE_BASE_URL", origin_base)
+                response = runtime_client.post(
+                    "/execute",
+                    json={"question": "O que é um bundle no CONTRACTOR?"},
+                    headers=_runtime_headers("rid-peer-tampered"),
+                )
+
+    assert response.status_code == 200
+    assert observed == [f"/internal/bundles/{bundle_id}.tar"]
+    cached_faq = tmp_path / "data" / "bundles" / bundle_id / "data" / "faq.json"
+    assert b"BUNDLE" not in cached_faq.read_bytes()
+
+
+def test_rendezvous_peer_order_is_stable_per_bundle() -> None:
+    peers = [f"http://runtime-{index}:8000" for index in range(5)]
+
+    first = runtime._rendezvous_peers("demo-faq-0001", peers)
+    again = runtime._rendezvous_peers("demo-faq-0001", list(reversed(peers)))
+
+    assert first == again
+    assert sorted(first) == sorted(peers)
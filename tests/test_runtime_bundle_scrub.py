@@ -0,0 +1,160 @@
+# tests/test_runtime_bundle_scrub.py
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app import runtime
+from tests.conftest import _source_bundle_path
+
+
+@pytest.fixture
+def bundle_root(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    root = tmp_path / "data" / "bundles"
+    root.mkdir(parents=True)
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: root)
+    monkeypatch.setattr(runtime, "VERIFIED_BUNDLES", {})
+    monkeypatch.setattr(runtime, "BUNDLE_LEASES", {})
+    monkeypatch.setattr(runtime, "BUNDLE_QUARANTINE_PENDING", set())
+    monkeypatch.setattr(
+        runtime, "BUNDLE_SCRUB_COUNTERS", {"verified": 0, "quarantined": 0}
+    )
+    monkeypatch.setattr(
+        runtime, "BUNDLE_CACHE_COUNTERS", {"hit": 0, "miss": 0, "evict": 0}
+    )
+    return root
+
+
+def _cached_bundle(bundle_root: Path, bundle_id: str) -> Path:
+    bundle_path = bundle_root / bundle_id
+    shutil.copytree(_source_bundle_path(), bundle_path)
+    runtime.ensure_local_bundle(
+        bundle_id, "0" * 64, expected_tree_digest=runtime.compute_bundle_tree_digest(bundle_path)
+    )
+    runtime.release_bundle_lease(bundle_path)
+    return bundle_path
+
+
+def _corrupt(bundle_path: Path) -> None:
+    runtime._make_tree_writable(bundle_path)
+    (bundle_path / "manifest.yaml").write_text("bundle_id: tampered\n", encoding="utf-8")
+
+
+def test_first_hit_verifies_once_and_writes_marker(
+    bundle_root: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    bundle_path = _cached_bundle(bundle_root, "demo-faq-0001")
+
+    marker = json.loads(
+        (bundle_root / ".verified" / "demo-faq-0001.json").read_text(encoding="utf-8")
+    )
+    assert marker["bundle_id"] == "demo-faq-0001"
+    assert marker["files"] == runtime.bundle_file_digests(bundle_path)
+    assert marker["tree_sha256"] == runtime.compute_bundle_tree_digest(bundle_path)
+    assert runtime.VERIFIED_BUNDLES == {str(bundle_path): marker["tree_sha256"]}
+
+    def _no_filesystem(_: Path) -> bool:
+        raise AssertionError("hot path must not touch the filesystem")
+
+    monkeypatch.setattr(runtime, "verify_local_bundle", _no_filesystem)
+    monkeypatch.setattr(runtime, "_ensure_bundle_structure", _no_filesystem)
+    path, status = runtime.ensure_local_bundle("demo-faq-0001", "0" * 64)
+    runtime.release_bundle_lease(path)
+
+    assert (path, status) == (bundle_path, "hit")
+    assert runtime.BUNDLE_CACHE_COUNTERS["hit"] == 2
+
+
+def test_scrub_quarantines_corrupted_bundle(bundle_root: Path) -> None:
+    healthy = _cached_bundle(bundle_root, "demo-faq-0001")
+    corrupted = _cached_bundle(bundle_root, "demo-faq-0002")
+    _corrupt(corrupted)
+
+    result = runtime.scrub_bundles()
+
+    assert result == {"verified": ["demo-faq-0001"], "quarantined": ["demo-faq-0002"]}
+    assert healthy.is_dir()
+    assert not corrupted.exists()
+    assert str(corrupted) not in runtime.VERIFIED_BUNDLES
+    assert not (bundle_root / ".verified" / "demo-faq-0002.json").exists()
+    quarantined = list((bundle_root / ".quarantine").iterdir())
+    assert [p.name.startswith("demo-faq-0002-") for p in quarantined] == [True]
+    assert runtime.BUNDLE_SCRUB_COUNTERS == {"verified": 1, "quarantined": 1}
+
+
+def test_marker_mismatch_on_first_sight_quarantines_and_refetches(
+    bundle_root: Path,
+) -> None:
+    bundle_path = _cached_bundle(bundle_root, "demo-faq-0001")
+    _corrupt(bundle_path)
+    # Novo processo: nada verificado em memória, apenas o marker em disco.
+    runtime.VERIFIED_BUNDLES.clear()
+
+    with pytest.raises(runtime.RuntimeConfigError, match="Bundle digest missing"):
+        runtime.ensure_local_bundle("demo-faq-0001", None)
+
+    assert not bundle_path.exists()
+    assert runtime.BUNDLE_SCRUB_COUNTERS["quarantined"] == 1
+
+
+def test_alias_entry_resolution_is_cached(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    bundle_path = tmp_path / "bundle"
+    shutil.copytree(_source_bundle_path(), bundle_path)
+    monkeypatch.setattr(runtime, "ALIAS_BUNDLE_RESOLUTIONS", {})
+    entry = {"current_bundle_path": str(bundle_path)}
+
+    first = runtime.resolve_bundle_from_alias_entry(entry)
+
+    def _no_manifest_parse(_: Path) -> dict[str, str]:
+        raise AssertionError("manifest must not be re-parsed")
+
+    monkeypatch.setattr(runtime, "_load_yaml_file", _no_manifest_parse)
+    assert runtime.resolve_bundle_from_alias_entry(entry) == first
+    assert first[0] == bundle_path
+
+
+def test_bundle_without_marker_is_adopted_only_with_matching_tree_digest(
+    bundle_root: Path,
+) -> None:
+    bundle_path = bundle_root / "demo-faq-0001"
+    shutil.copytree(_source_bundle_path(), bundle_path)
+    tree_digest = runtime.compute_bundle_tree_digest(bundle_path)
+
+    assert not runtime.verify_local_bundle(bundle_path)
+    assert not runtime.verify_local_bundle(bundle_path, "f" * 64)
+    assert not (bundle_root / ".verified" / "demo-faq-0001.json").exists()
+    assert runtime.verify_local_bundle(bundle_path, tree_digest)
+    assert runtime.VERIFIED_BUNDLES == {str(bundle_path): tree_digest}
+
+
+def test_quarantine_waits_for_leases_and_skips_pinned_bundles(
+    bundle_root: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(runtime, "TENANT_CURRENT_BUNDLES", {})
+    monkeypatch.setattr(runtime, "TENANT_CANDIDATE_BUNDLES", {})
+    leased = _cached_bundle(bundle_root, "demo-faq-0001")
+    pinned = _cached_bundle(bundle_root, "demo-faq-0002")
+    runtime.TENANT_CURRENT_BUNDLES["tenant_a"] = "demo-faq-0002"
+    path, _ = runtime.ensure_local_bundle("demo-faq-0001", "0" * 64)
+    _corrupt(leased)
+    _corrupt(pinned)
+
+    result = runtime.scrub_bundles()
+
+    assert result == {"verified": [], "quarantined": []}
+    assert leased.is_dir() and pinned.is_dir()
+    assert runtime.VERIFIED_BUNDLES == {}
+    with pytest.raises(runtime.BundleFetchUnavailableError, match="quarantine pending"):
+        runtime.ensure_local_bundle("demo-faq-0001", "0" * 64)
+
+    runtime.release_bundle_lease(path)
+    assert not leased.exists()
+    # O request do tenant pinado move o bundle e segue para o download.
+    with pytest.raises(runtime.RuntimeConfigError, match="Bundle digest missing"):
+        runtime.ensure_local_bundle("demo-faq-0002", None)
+    assert not pinned.exists()
+    assert runtime.BUNDLE_QUARANTINE_PENDING == set()
+    assert runtime.BUNDLE_SCRUB_COUNTERS["quarantined"] == 2
@@ -0,0 +1,223 @@
+# tests/test_runtime_coalescing.py
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app import runtime
+from tests.conftest import _bundle_id, _runtime_events, _runtime_headers, _seed_verified_bundle
+
+
+@contextmanager
+def _slow_control_plane(delay: float, calls: list[str]) -> Iterator[str]:
+    body = json.dumps(
+        {"bundle_id": _bundle_id(), "runtime_compatibility": {"min_version": "0.0.0"}}
+    ).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            calls.append(self.path)
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A003
+            return
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=1)
+
+
+@pytest.fixture(autouse=True)
+def coalescing_state(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(runtime, "RESOLVE_FLIGHTS", runtime.SingleFlight())
+    monkeypatch.setattr(runtime, "COMPILE_FLIGHTS", runtime.SingleFlight())
+    monkeypatch.setattr(runtime, "EXECUTE_FLIGHTS", runtime.SingleFlight())
+    monkeypatch.setattr(runtime, "CONTROL_PLANE_BREAKERS", {})
+    monkeypatch.setattr(runtime, "LAST_KNOWN_GOOD", {})
+    monkeypatch.setattr(runtime, "NEGATIVE_CACHE", {})
+    monkeypatch.setattr(runtime, "RESPONSE_CACHE_COUNTERS", {"hit": 0, "miss": 0})
+
+
+def test_single_flight_shares_result_and_exception() -> None:
+    flight = runtime.SingleFlight()
+    calls: list[int] = []
+    release = threading.Event()
+    results: list[tuple[object, bool]] = []
+
+    def _slow() -> str:
+        calls.append(1)
+        release.wait(timeout=2)
+        return "value"
+
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("k", _slow)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert {value for value, _ in results} == {"value"}
+    assert flight.shared_total == 4
+
+    # Concluída a chamada, a chave é liberada: nada fica em cache.
+    def _fail() -> str:
+        raise runtime.RuntimeConfigError("boom")
+
+    with pytest.raises(runtime.RuntimeConfigError, match="boom"):
+        flight.do("k", _fail)
+
+
+def test_execute_stampede_resolves_and_computes_once(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    _seed_verified_bundle(tmp_path / "data" / "bundles", _bundle_id())
+    computed: list[str] = []
+    original_compute = runtime.compute_execute_result
+
+    def _slow_compute(
+        compiled: runtime.CompiledBundle, question: str
+    ) -> tuple[dict[str, str], str]:
+        computed.append(question)
+        time.sleep(0.2)
+        return original_compute(compiled, question)
+
+    monkeypatch.setattr(runtime, "compute_execute_result", _slow_compute)
+    calls: list[str] = []
+    barrier = threading.Barrier(4)
+    responses: dict[str, object] = {}
+
+    def _call(request_id: str) -> None:
+        barrier.wait(timeout=2)
+        responses[request_id] = runtime_client.post(
+            "/execute", json={"question": "x"}, headers=_runtime_headers(request_id)
+        )
+
+    with _slow_control_plane(0.3, calls) as cp_base:
+        monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+        threads = [
+            threading.Thread(target=_call, args=(f"rid-coalesce-{i}",)) for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+    events = _runtime_events(capsys.readouterr().out)
+
+    assert len(calls) == 1
+    assert len(computed) == 1
+    assert [r.status_code for r in responses.values()] == [200] * 4  # type: ignore[attr-defined]
+    # Rate limit e auditoria continuam por request.
+    remaining = sorted(
+        int(r.headers["X-RateLimit-Remaining"]) for r in responses.values()  # type: ignore
+    )
+    assert remaining == [96, 97, 98, 99]
+    assert sorted(e["request_id"] for e in events) == sorted(responses)
+    assert sum(1 for e in events if e.get("coalesced")) == 3
+    assert runtime.runtime_metrics_snapshot()["coalescing"] == {
+        "resolve": 3,
+        "compile": 3,
+        "result": 3,
+    }
+
+
+@pytest.mark.parametrize(
+    "suggestions", [None, [{"question": "O que é o alias \"current\"?", "similarity": 0.5}]]
+)
+def test_encoded_response_matches_json_response(suggestions: object) -> None:
+    payload = {"answer": "Resposta é <b>única</b>\n", "intent": "faq_query", "status": "ok"}
+    fragments = runtime.encode_execute_response(
+        "bundle-ç", payload, "texto\tlivre", suggestions  # type: ignore[arg-type]
+    )
+    result: dict[str, object] = {
+        "request_id": "rid-é",
+        "bundle_id": "bundle-ç",
+        "tenant_id": "tenant_a",
+        "intent": "faq_query",
+        "status": "ok",
+        "output_text": "texto\tlivre",
+        "result": payload,
+    }
+    if suggestions is not None:
+        result["suggestions"] = suggestions
+
+    expected = JSONResponse(jsonable_encoder(result)).body
+
+    assert fragments.render("rid-é", "tenant_a") == expected
+
+
+def test_response_fragment_cache_evicts_least_recently_used() -> None:
+    cache = runtime.ResponseFragmentCache(max_entries=2)
+    fragments = runtime.ExecuteResponseFragments(middle=b"", tail=b"")
+    cache.put("a", fragments)
+    cache.put("b", fragments)
+    assert cache.get("a") is fragments
+
+    cache.put("c", fragments)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is fragments
+
+
+def test_repeated_question_is_served_from_encoded_bytes(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    _seed_verified_bundle(tmp_path / "data" / "bundles", _bundle_id())
+    computed: list[str] = []
+    original_compute = runtime.compute_execute_result
+
+    def _counting_compute(
+        compiled: runtime.CompiledBundle, question: str
+    ) -> tuple[dict[str, str], str]:
+        computed.append(question)
+        return original_compute(compiled, question)
+
+    monkeypatch.setattr(runtime, "compute_execute_result", _counting_compute)
+    question = "O que é o alias current?"
+
+    with _slow_control_plane(0, []) as cp_base:
+        monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+        first = runtime_client.post(
+            "/execute", json={"question": question}, headers=_runtime_headers("rid-bytes-1")
+        )
+        second = runtime_client.post(
+            "/execute", json={"question": question}, headers=_runtime_headers("rid-bytes-2")
+        )
+
+    assert computed == [question]
+    assert first.status_code == second.status_code == 200
+    assert second.headers["content-type"] == "application/json"
+    assert second.headers["X-RateLimit-Remaining"] == "98"
+    assert second.json() == {**first.json(), "request_id": "rid-bytes-2"}
+    assert second.json()["status"] == "ok"
+    assert runtime.runtime_metrics_snapshot()["response_cache"] == {"hit": 1, "miss": 1}
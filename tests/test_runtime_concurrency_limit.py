@@ -0,0 +1,76 @@
+# tests/test_runtime_concurrency_limit.py
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import runtime
+from tests.conftest import _runtime_events, _runtime_headers, _switchable_control_plane
+
+
+def _policy(tenants: dict[str, dict[str, int]]) -> str:
+    return json.dumps(
+        {
+            "rate_limit": {"window_seconds": 60, "max_requests": 100},
+            "quota": {"window_seconds": 86400, "max_requests": 100},
+            "tenants": tenants,
+        }
+    )
+
+
+def test_max_in_flight_falls_back_to_star(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(
+        "CONTRACTOR_RATE_LIMIT_POLICY_JSON",
+        _policy({"*": {"max_in_flight": 4}, "tenant_a": {"max_in_flight": 1}, "tenant_b": {}}),
+    )
+    assert runtime.resolve_tenant_policy("tenant_a")["max_in_flight"] == 1
+    assert runtime.resolve_tenant_policy("tenant_b")["max_in_flight"] == 4
+    assert runtime.resolve_tenant_policy("tenant_c")["max_in_flight"] == 4
+
+    monkeypatch.setenv("CONTRACTOR_RATE_LIMIT_POLICY_JSON", _policy({"*": {}}))
+    assert runtime.resolve_tenant_policy("tenant_a")["max_in_flight"] is None
+
+    monkeypatch.setenv(
+        "CONTRACTOR_RATE_LIMIT_POLICY_JSON", _policy({"*": {"max_in_flight": 0}})
+    )
+    with pytest.raises(runtime.RuntimeConfigError, match="Rate limit policy invalid"):
+        runtime.resolve_tenant_policy("tenant_a")
+
+
+def test_execute_enforces_max_in_flight(
+    runtime_client: TestClient,
+    breaker_env: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.setenv(
+        "CONTRACTOR_RATE_LIMIT_POLICY_JSON",
+        _policy({"*": {"max_in_flight": 1}}),
+    )
+    monkeypatch.setattr(runtime, "TENANT_IN_FLIGHT", {"tenant_a": 1})
+    state = {"status": 200, "calls": 0}
+
+    with _switchable_control_plane(state) as cp_base:
+        monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+        rejected = runtime_client.post(
+            "/execute", json={"question": "x"}, headers=_runtime_headers("rid-busy")
+        )
+        runtime.release_tenant_in_flight("tenant_a")
+        admitted = runtime_client.post(
+            "/execute", json={"question": "x"}, headers=_runtime_headers("rid-free")
+        )
+    events = _runtime_events(capsys.readouterr().out)
+
+    assert rejected.status_code == 429
+    assert rejected.json()["detail"] == "Concurrency limit exceeded"
+    assert rejected.headers["X-RateLimit-InFlight"] == "1"
+    assert rejected.headers["X-RateLimit-InFlight-Limit"] == "1"
+    assert rejected.headers["X-RateLimit-Remaining"] == "99"
+    assert admitted.status_code == 200
+    assert admitted.headers["X-RateLimit-InFlight"] == "1"
+    assert runtime.TENANT_IN_FLIGHT == {}
+    assert state["calls"] == 1
+    assert events[0]["error_code"] == "concurrency_limit_exceeded"
+    assert events[0]["rate_limit"]["max_in_flight"] == 1
+    assert events[1]["rate_limit"]["in_flight"] == 1
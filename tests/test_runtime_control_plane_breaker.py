@@ -0,0 +1,128 @@
+# tests/test_runtime_control_plane_breaker.py
+import json
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import runtime
+from tests.conftest import _bundle_id, _runtime_events, _runtime_headers, _switchable_control_plane
+
+
+def test_circuit_breaker_opens_probes_and_closes() -> None:
+    breaker = runtime.CircuitBreaker(
+        window=4, min_calls=2, error_rate=0.5, slow_call_seconds=1.0, open_seconds=0.05
+    )
+
+    assert breaker.allow()
+    breaker.record(success=True, latency_seconds=0.01)
+    assert breaker.allow()
+    # Chamada lenta conta como falha mesmo com resposta válida.
+    breaker.record(success=True, latency_seconds=1.5)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record(success=True, latency_seconds=0.01)
+
+    assert breaker.state == "closed"
+    assert breaker.snapshot() == {
+        "state": "closed",
+        "window_calls": 0,
+        "window_failures": 0,
+        "opened_total": 1,
+        "short_circuited_total": 2,
+    }
+
+
+def test_open_circuit_serves_last_known_good(
+    runtime_client: TestClient,
+    breaker_env: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_SERVE_STALE", "true")
+    state = {"status": 200, "calls": 0}
+
+    with _switchable_control_plane(state) as cp_base:
+        monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+        fresh = runtime_client.post(
+            "/execute", json={"question": "x"}, headers=_runtime_headers("rid-fresh")
+        )
+        state["status"] = 500
+        failed_over = runtime_client.post(
+            "/execute", json={"question": "x"}, headers=_runtime_headers("rid-stale-1")
+        )
+        short_circuited = runtime_client.post(
+            "/execute", json={"question": "x"}, headers=_runtime_headers("rid-stale-2")
+        )
+    events = _runtime_events(capsys.readouterr().out)
+
+    assert [fresh.status_code, failed_over.status_code, short_circuited.status_code] == [
+        200,
+        200,
+        200,
+    ]
+    assert state["calls"] == 2
+    assert [e.get("control_plane_status") for e in events] == [200, None, None]
+    assert [e.get("control_plane_state") for e in events] == [None, "stale", "stale"]
+    persisted = json.loads(
+        (breaker_env / ".last_known_good.json").read_text(encoding="utf-8")
+    )
+    assert persisted[cp_base]["tenant_a"]["bundle_id"] == _bundle_id()
+    assert runtime.runtime_metrics_snapshot()["control_plane_breakers"][cp_base][
+        "state"
+    ] == "open"
+
+
+def test_open_circuit_fails_fast_by_default(
+    runtime_client: TestClient,
+    breaker_env: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.delenv("CONTRACTOR_CONTROL_PLANE_SERVE_STALE", raising=False)
+    state = {"status": 503, "calls": 0}
+
+    with _switchable_control_plane(state) as cp_base:
+        monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+        first = runtime_client.post(
+            "/execute", json={"question": "x"}, headers=_runtime_headers("rid-cp-503")
+        )
+        second = runtime_client.post(
+            "/execute", json={"question": "x"}, headers=_runtime_headers("rid-open")
+        )
+    events = _runtime_events(capsys.readouterr().out)
+
+    assert first.json()["detail"] == "Control Plane error: 503"
+    assert second.status_code == 503
+    assert second.json()["detail"] == "Control Plane circuit open"
+    assert state["calls"] == 1
+    assert "control_plane_status" not in events[1]
+    assert events[1]["control_plane_state"] == "circuit_open"
+    assert events[1]["error_code"] == "control_plane_circuit_open"
+
+
+def test_client_errors_never_serve_stale(
+    runtime_client: TestClient,
+    breaker_env: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_SERVE_STALE", "true")
+    state = {"status": 200, "calls": 0}
+
+    with _switchable_control_plane(state) as cp_base:
+        monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+        runtime_client.post("/execute", json={"question": "x"}, headers=_runtime_headers())
+        state["status"] = 403
+        forbidden = runtime_client.post(
+            "/execute", json={"question": "x"}, headers=_runtime_headers()
+        )
+
+    assert forbidden.status_code == 503
+    assert forbidden.json()["detail"] == "Control Plane error: 403"
+    assert runtime.CONTROL_PLANE_BREAKERS[cp_base].state == "closed"
@@ -0,0 +1,163 @@
+# tests/test_runtime_control_plane_hedging.py
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app import runtime
+
+RESOLVE_BODY = json.dumps(
+    {"bundle_id": "demo-faq-0001", "runtime_compatibility": {"min_version": "0.0.0"}}
+).encode("utf-8")
+
+
+@contextmanager
+def _replica(delay: float, status_code: int, calls: list[int]) -> Iterator[str]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            calls.append(self.server.server_address[1])  # type: ignore[attr-defined]
+            time.sleep(delay)
+            try:
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                if status_code == 200:
+                    self.wfile.write(RESOLVE_BODY)
+            except OSError:
+                return
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A003
+            return
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=2)
+
+
+@pytest.fixture(autouse=True)
+def hedging_state(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(runtime, "CONTROL_PLANE_BREAKERS", {})
+    monkeypatch.setattr(runtime, "CONTROL_PLANE_REPLICA_LATENCIES", {})
+    monkeypatch.setattr(
+        runtime,
+        "CONTROL_PLANE_HEDGE_COUNTERS",
+        {"hedged": 0, "hedge_won": 0, "failover": 0, "cancelled": 0},
+    )
+    monkeypatch.delenv("CONTRACTOR_CONTROL_PLANE_HEDGE_DELAY_SECONDS", raising=False)
+    monkeypatch.delenv("CONTRACTOR_CONTROL_PLANE_EXECUTOR_WORKERS", raising=False)
+
+
+def test_slow_primary_is_hedged_to_next_replica() -> None:
+    calls: list[int] = []
+    with _replica(0.6, 200, calls) as slow, _replica(0, 200, calls) as fast:
+        started = time.monotonic()
+        resolution = runtime.resolve_bundle_via_control_planes(
+            "tenant_a", f"{slow}, {fast}"
+        )
+        elapsed = time.monotonic() - started
+
+    assert resolution[0] == "demo-faq-0001"
+    assert elapsed < 0.5
+    assert len(calls) == 2
+    assert runtime.CONTROL_PLANE_HEDGE_COUNTERS == {
+        "hedged": 1,
+        "hedge_won": 1,
+        "failover": 0,
+        "cancelled": 1,
+    }
+
+
+def test_losing_hedge_is_cancelled_without_penalizing_the_replica() -> None:
+    calls: list[int] = []
+    with _replica(0.6, 200, calls) as slow, _replica(0, 200, calls) as fast:
+        runtime.resolve_bundle_via_control_planes("tenant_a", f"{slow},{fast}")
+        # Sem cancelamento, a primária responderia em 0.6s e registraria sucesso.
+        time.sleep(0.8)
+
+    # Amostra censurada no instante do cancelamento, não a resposta tardia da réplica.
+    assert len(runtime.CONTROL_PLANE_REPLICA_LATENCIES[slow]) == 1
+    assert runtime.CONTROL_PLANE_REPLICA_LATENCIES[slow][0] < 0.5
+    assert list(runtime.CONTROL_PLANE_BREAKERS[slow]._outcomes) == []
+    assert runtime.CONTROL_PLANE_BREAKERS[slow].state == "closed"
+
+
+def test_replica_that_always_loses_the_hedge_is_demoted() -> None:
+    calls: list[int] = []
+    with _replica(0.3, 200, calls) as slow, _replica(0, 200, calls) as fast:
+        for _ in range(runtime.CONTROL_PLANE_HEDGE_MIN_SAMPLES):
+            runtime.resolve_bundle_via_control_planes("tenant_a", f"{slow},{fast}")
+        hedges_won = runtime.CONTROL_PLANE_HEDGE_COUNTERS["hedge_won"]
+        # A amostra censurada da perdedora é gravada pela thread dela, logo após o cancelamento.
+        time.sleep(0.1)
+        runtime.resolve_bundle_via_control_planes("tenant_a", f"{slow},{fast}")
+
+    assert hedges_won == runtime.CONTROL_PLANE_HEDGE_MIN_SAMPLES
+    assert runtime._rank_control_plane_replicas([slow, fast]) == [fast, slow]
+    # Rebaixada a lenta, a rápida é a primária: a última resolução não depende de hedge.
+    assert runtime.CONTROL_PLANE_HEDGE_COUNTERS["hedge_won"] == hedges_won
+
+
+def test_control_plane_executor_is_sized_from_config(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(runtime, "CONTROL_PLANE_EXECUTORS", {})
+    monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_EXECUTOR_WORKERS", "3")
+
+    assert runtime._control_plane_executor()._max_workers == 3
+    assert runtime._control_plane_executor() is runtime._control_plane_executor()
+
+    monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_EXECUTOR_WORKERS", "0")
+    with pytest.raises(runtime.RuntimeConfigError, match="Control Plane hedge config invalid"):
+        runtime._control_plane_executor()
+
+
+def test_unavailable_primary_fails_over_without_waiting() -> None:
+    calls: list[int] = []
+    with _replica(0, 503, calls) as broken, _replica(0, 200, calls) as healthy:
+        resolution = runtime.resolve_bundle_via_control_planes(
+            "tenant_a", f"{broken},{healthy}"
+        )
+
+    assert resolution[-1] == 200
+    assert runtime.CONTROL_PLANE_HEDGE_COUNTERS["failover"] == 1
+    assert runtime.CONTROL_PLANE_HEDGE_COUNTERS["hedged"] == 0
+
+
+def test_client_error_is_authoritative() -> None:
+    calls: list[int] = []
+    with _replica(0, 403, calls) as forbidding, _replica(0, 200, calls) as healthy:
+        with pytest.raises(runtime.RuntimeConfigError, match="Control Plane error: 403"):
+            runtime.resolve_bundle_via_control_planes(
+                "tenant_a", f"{forbidding},{healthy}"
+            )
+
+    assert len(calls) == 1
+
+
+def test_primary_is_the_replica_with_lowest_p95() -> None:
+    runtime.CONTROL_PLANE_REPLICA_LATENCIES.update(
+        {
+            "http://cp-a": deque([0.4] * 10),
+            "http://cp-b": deque([0.02] * 9 + [0.05]),
+        }
+    )
+
+    assert runtime._rank_control_plane_replicas(["http://cp-a", "http://cp-b"]) == [
+        "http://cp-b",
+        "http://cp-a",
+    ]
+    assert runtime._control_plane_hedge_delay("http://cp-b") == 0.05
+    assert runtime.runtime_metrics_snapshot()["control_plane_hedging"]["p95_seconds"] == {
+        "http://cp-a": 0.4,
+        "http://cp-b": 0.05,
+    }
@@ -0,0 +1,178 @@
+# tests/test_runtime_deadline.py
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import runtime
+from tests.conftest import _bundle_id, _runtime_headers
+
+
+@contextmanager
+def _slow_server(routes: dict[str, tuple[float, bytes]], calls: list[str]) -> Iterator[str]:
+    # routes: path -> (atraso em segundos, corpo); paths desconhecidos respondem 404.
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            calls.append(self.path)
+            if self.path not in routes:
+                self.send_response(404)
+                self.end_headers()
+                return
+            delay, body = routes[self.path]
+            time.sleep(delay)
+            try:
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(body)
+            except OSError:
+                return
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A003
+            return
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=2)
+
+
+def _resolve_body(digest: str | None = None) -> bytes:
+    payload: dict[str, object] = {
+        "bundle_id": _bundle_id(),
+        "runtime_compatibility": {"min_version": "0.0.0"},
+    }
+    if digest:
+        payload["bundle_sha256"] = digest
+    return json.dumps(payload).encode("utf-8")
+
+
+def test_resolve_request_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("CONTRACTOR_REQUEST_BUDGET_SECONDS", raising=False)
+    assert runtime.resolve_request_deadline(None, None) is None
+
+    relative = runtime.resolve_request_deadline(None, "1500")
+    assert relative is not None and 1.4 < relative.remaining() <= 1.5
+
+    absolute = runtime.resolve_request_deadline(str(time.time() + 3), "100")
+    assert absolute is not None and 2.9 < absolute.remaining() <= 3
+
+    monkeypatch.setenv("CONTRACTOR_REQUEST_BUDGET_SECONDS", "0.5")
+    capped = runtime.resolve_request_deadline(None, "1500")
+    assert capped is not None and capped.remaining() <= 0.5
+
+    with pytest.raises(runtime.RuntimeConfigError, match="Request deadline invalid") as exc:
+        runtime.resolve_request_deadline(None, "soon")
+    assert exc.value.status_code == 400
+
+
+def test_invalid_deadline_header_is_audited_as_client_error(
+    runtime_client: TestClient,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    response = runtime_client.post(
+        "/execute",
+        json={"question": "x"},
+        headers={**_runtime_headers("rid-bad-deadline"), "X-Request-Timeout-Ms": "soon"},
+    )
+    event = [
+        json.loads(line)
+        for line in capsys.readouterr().out.splitlines()
+        if line.strip() and json.loads(line).get("service") == "runtime"
+    ][0]
+
+    assert response.status_code == 400
+    assert event["error_code"] == "invalid_request"
+
+
+def test_slow_control_plane_is_abandoned_at_deadline(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.setattr(runtime, "CONTROL_PLANE_BREAKERS", {})
+    calls: list[str] = []
+    routes = {"/tenants/tenant_a/resolve/current": (0.6, _resolve_body())}
+
+    with _slow_server(routes, calls) as cp_base:
+        monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+        started = time.monotonic()
+        response = runtime_client.post(
+            "/execute",
+            json={"question": "x"},
+            headers={**_runtime_headers("rid-deadline"), "X-Request-Timeout-Ms": "150"},
+        )
+        elapsed = time.monotonic() - started
+        breaker = runtime.CONTROL_PLANE_BREAKERS[cp_base].snapshot()
+    event = [
+        json.loads(line)
+        for line in capsys.readouterr().out.splitlines()
+        if line.strip() and json.loads(line).get("service") == "runtime"
+    ][0]
+
+    assert response.status_code == 504
+    assert response.json()["detail"] == "Request deadline exceeded"
+    assert elapsed < 0.55
+    assert event["error_code"] == "deadline_exceeded"
+    # O timeout foi do orçamento da request: não conta contra o Control Plane.
+    assert breaker["window_calls"] == 0
+
+
+def test_expired_deadline_skips_downstream_calls(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[str] = []
+    routes = {"/tenants/tenant_a/resolve/current": (0, _resolve_body())}
+
+    with _slow_server(routes, calls) as cp_base:
+        monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+        response = runtime_client.post(
+            "/execute",
+            json={"question": "x"},
+            headers={
+                **_runtime_headers("rid-expired"),
+                "X-Request-Deadline": str(time.time() - 1),
+            },
+        )
+
+    assert response.status_code == 504
+    assert calls == []
+
+
+def test_slow_origin_download_uses_remaining_budget(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(runtime, "BUNDLE_FETCHES", {})
+    monkeypatch.setattr(runtime, "BUNDLE_FETCH_TENANT_IN_FLIGHT", {})
+    calls: list[str] = []
+    bundle_id = _bundle_id()
+    routes = {
+        "/tenants/tenant_a/resolve/current": (0, _resolve_body("0" * 64)),
+        f"/{bundle_id}.tar.gz": (0.6, b"late"),
+    }
+
+    with _slow_server(routes, calls) as base:
+        monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", base)
+        monkeypatch.setenv("CONTRACTOR_BUNDLE_BASE_URL", base)
+        monkeypatch.setenv("CONTRACTOR_REQUEST_BUDGET_SECONDS", "0.2")
+        started = time.monotonic()
+        response = runtime_client.post(
+            "/execute", json={"question": "x"}, headers=_runtime_headers("rid-origin")
+        )
+        elapsed = time.monotonic() - started
+
+    assert response.status_code == 504
+    assert elapsed < 0.55
+    assert calls == ["/tenants/tenant_a/resolve/current", f"/{bundle_id}.tar.gz"]
@@ -0,0 +1,151 @@
+# tests/test_runtime_faq_data.py
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app import runtime
+from tests.conftest import _source_bundle_path
+
+
+def _bundle_with_jsonl_shards(tmp_path: Path) -> tuple[Path, dict[str, str]]:
+    bundle_path = tmp_path / "faq"
+    shutil.copytree(_source_bundle_path(), bundle_path)
+    faq_path = bundle_path / "data" / "faq.json"
+    items = json.loads(faq_path.read_text(encoding="utf-8"))
+    faq_path.unlink()
+    shard_dir = bundle_path / "data" / "faq"
+    shard_dir.mkdir()
+    for index in range(2):
+        lines = [json.dumps(item, ensure_ascii=False) for item in items[index::2]]
+        (shard_dir / f"{index:04d}.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return bundle_path, {item["question"]: item["answer"] for item in items}
+
+
+def test_json_array_is_stream_parsed_across_chunks(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(runtime, "FAQ_STREAM_CHUNK_CHARS", 7)
+    (tmp_path / "data").mkdir()
+    items = [
+        {"question": f"Pergunta {i}?", "answer": f"Resposta {i} é {'x' * i}"} for i in range(20)
+    ]
+    (tmp_path / "data" / "faq.json").write_text(
+        json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+
+    records = list(runtime.iter_faq_records(tmp_path))
+
+    assert records == [(item["question"], item["answer"]) for item in items]
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '[{"question": "a", "answer": "1"},]',
+        '[{"question": "a", "answer": "1"}] extra',
+        '[{"question": "a", "answer": "1"}',
+        '{"question": "a", "answer": "1"}',
+        '[{"question": "a"}]',
+    ],
+)
+def test_invalid_faq_data_fails_closed(tmp_path: Path, raw: str) -> None:
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "faq.json").write_text(raw, encoding="utf-8")
+
+    with pytest.raises(runtime.RuntimeConfigError, match="FAQ data invalid"):
+        list(runtime.iter_faq_records(tmp_path))
+
+
+def test_multiple_faq_layouts_are_rejected(tmp_path: Path) -> None:
+    bundle_path, _ = _bundle_with_jsonl_shards(tmp_path)
+    (bundle_path / "data" / "faq.jsonl").write_text("", encoding="utf-8")
+
+    with pytest.raises(runtime.RuntimeConfigError, match="FAQ data invalid"):
+        runtime.faq_data_files(bundle_path)
+
+
+def test_small_faq_stays_in_memory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: tmp_path / "root")
+    bundle_path, expected = _bundle_with_jsonl_shards(tmp_path)
+
+    compiled = runtime.compile_bundle(bundle_path, "b1")
+
+    assert isinstance(compiled.answer_map, runtime.PackedFaqAnswers)
+    assert compiled.answer_map == expected
+    assert not (tmp_path / "root" / runtime.FAQ_INDEX_DIRNAME).exists()
+
+
+def test_sharded_faq_answers_through_disk_index(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: tmp_path / "root")
+    monkeypatch.setenv(runtime.FAQ_DISK_INDEX_MIN_BYTES_ENV, "1")
+    bundle_path, expected = _bundle_with_jsonl_shards(tmp_path)
+    question = "O que é o alias current?"
+
+    compiled = runtime.compile_bundle(bundle_path, "b1")
+    payload, _ = runtime.compute_execute_result(compiled, question)
+
+    assert isinstance(compiled.answer_map, runtime.FaqAnswerIndex)
+    assert dict(compiled.answer_map) == expected
+    assert compiled.answer_map.get("Pergunta inexistente?") is None
+    assert payload["status"] == "ok"
+    assert payload["answer"] == expected[question]
+
+    index_paths = list((tmp_path / "root" / runtime.FAQ_INDEX_DIRNAME).glob("b1-*.idx"))
+    assert index_paths == [compiled.answer_map.path]
+    assert runtime.load_faq_index(bundle_path, "b1").path == compiled.answer_map.path
+
+    runtime._remove_faq_indexes("b1")
+    assert not compiled.answer_map.path.exists()
+
+
+def test_disk_index_keeps_last_duplicate_answer(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: tmp_path / "root")
+    monkeypatch.setenv(runtime.FAQ_DISK_INDEX_MIN_BYTES_ENV, "1")
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "faq.jsonl").write_text(
+        '{"question": "a", "answer": "1"}\n'
+        '{"question": "b", "answer": "2"}\n'
+        '{"question": "a", "answer": "3"}\n',
+        encoding="utf-8",
+    )
+
+    index = runtime.load_faq_index(tmp_path, "b1")
+
+    assert len(index) == 2
+    assert dict(index) == {"a": "3", "b": "2"}
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+def test_packed_answers_round_trip_and_report_footprint(compression: str) -> None:
+    answers = {
+        f"Pergunta {i}?": f"O bundle {i} é promovido via alias current após os gates." * 3
+        for i in range(200)
+    }
+
+    packed = runtime.PackedFaqAnswers(answers, compression=compression)
+    footprint = packed.footprint()
+
+    assert packed == answers
+    assert packed.get("Pergunta 7?") == answers["Pergunta 7?"]
+    assert "Pergunta 200?" not in packed
+    assert footprint["entries"] == 200
+    assert footprint["resident_bytes"] < footprint["dict_bytes"]
+    assert (footprint["compressed_entries"] == 200) is (compression == "zlib")
+
+
+def test_faq_answer_compression_env_is_validated(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    bundle_path, expected = _bundle_with_jsonl_shards(tmp_path)
+    monkeypatch.setenv(runtime.FAQ_ANSWER_COMPRESSION_ENV, "zlib")
+    assert runtime.load_faq_index(bundle_path, "b1") == expected
+
+    monkeypatch.setenv(runtime.FAQ_ANSWER_COMPRESSION_ENV, "brotli")
+    with pytest.raises(runtime.RuntimeConfigError, match="FAQ answer compression invalid"):
+        runtime.load_faq_index(bundle_path, "b1")
@@ -0,0 +1,127 @@
+# tests/test_runtime_intent_router.py
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+
+from app import runtime
+from tests.conftest import _source_bundle_path
+
+FAQ_QUESTION = "O que é o alias current?"
+
+
+def _bundle_with_intents(tmp_path: Path, extra_intents: list[dict[str, Any]]) -> Path:
+    bundle_path = tmp_path / "faq"
+    shutil.copytree(_source_bundle_path(), bundle_path)
+    ontology_path = bundle_path / "ontology" / "ontology.yaml"
+    ontology = yaml.safe_load(ontology_path.read_text(encoding="utf-8"))
+    ontology["intents"].extend(extra_intents)
+    ontology_path.write_text(yaml.safe_dump(ontology, allow_unicode=True), encoding="utf-8")
+    return bundle_path
+
+
+def _route(compiled: runtime.CompiledBundle, question: str) -> tuple[str, str, str]:
+    payload, _ = runtime.compute_execute_result(compiled, question)
+    return payload["intent"], payload["status"], payload["answer"]
+
+
+def test_keyword_automaton_reports_overlapping_matches() -> None:
+    automaton = runtime.KeywordAutomaton([("he", 0), ("she", 1), ("hers", 2), ("xyz", 3)])
+
+    assert automaton.matches("ushers") == {0, 1, 2}
+    assert automaton.matches("xy z") == set()
+
+
+def test_router_resolves_keywords_regexes_and_priority(tmp_path: Path) -> None:
+    compiled = runtime.compile_bundle(
+        _bundle_with_intents(
+            tmp_path,
+            [
+                {
+                    "name": "greeting",
+                    "answer": "Olá!",
+                    "match": {"type": "keyword", "keywords": ["bom dia", "Olá"]},
+                },
+                {
+                    "name": "billing",
+                    "priority": 10,
+                    "answer": "Consulte o financeiro.",
+                    "match": {"type": "regex", "patterns": [r"(?i:fatura|boleto)\s*#?\d+"]},
+                },
+                {
+                    "name": "alias_help",
+                    "priority": 5,
+                    "answer": "Veja o ADR de aliases.",
+                    "match": {"type": "keyword", "keywords": ["alias current"]},
+                },
+                {
+                    "name": "greeting_late",
+                    "answer": "Oi de novo.",
+                    "match": {"type": "keyword", "keywords": ["ola"]},
+                },
+            ],
+        ),
+        "b1",
+    )
+
+    assert _route(compiled, "Olá, bom dia!") == ("greeting", "ok", "Olá!")
+    assert _route(compiled, "bomdia")[1] == "no_match"
+    assert _route(compiled, "olá, minha Fatura #123 venceu")[0] == "billing"
+    assert _route(compiled, FAQ_QUESTION)[0] == "alias_help"
+    faq_intent, faq_status, faq_answer = _route(compiled, "Qual é o papel do Runtime?")
+    assert (faq_intent, faq_status) == ("faq_query", "ok")
+    assert faq_answer == compiled.answer_map["Qual é o papel do Runtime?"]
+    assert _route(compiled, "nada a ver") == ("faq_query", "no_match", "")
+
+
+@pytest.mark.parametrize(
+    "intent",
+    [
+        {"name": "faq_2", "match": {"type": "exact", "questions": ["x"]}},
+        {"name": "named", "match": {"type": "regex", "patterns": [r"(?P<n>\d+)"]}},
+        {"name": "broken", "match": {"type": "regex", "patterns": ["("]}},
+        {"name": "empty", "match": {"type": "keyword", "keywords": ["?!"]}},
+        {"name": "faq_query", "match": {"type": "keyword", "keywords": ["dup"]}},
+    ],
+)
+def test_invalid_router_intents_fail_compile(tmp_path: Path, intent: dict[str, Any]) -> None:
+    with pytest.raises(runtime.RuntimeConfigError):
+        runtime.compile_bundle(_bundle_with_intents(tmp_path, [intent]), "b1")
+
+
+def test_router_scopes_global_regex_flags(tmp_path: Path) -> None:
+    compiled = runtime.compile_bundle(
+        _bundle_with_intents(
+            tmp_path,
+            [
+                {
+                    "name": "pricing",
+                    "answer": "Veja a tabela.",
+                    "match": {"type": "regex", "patterns": [r"(?i)pre[cç]o"]},
+                },
+                {
+                    "name": "billing",
+                    "answer": "Consulte o financeiro.",
+                    "match": {
+                        "type": "regex",
+                        "patterns": ["(?x) boleto \\s* \\d+  # número do boleto"],
+                    },
+                },
+            ],
+        ),
+        "b1",
+    )
+
+    assert _route(compiled, "Qual o PREÇO do plano?")[0] == "pricing"
+    assert _route(compiled, "segunda via do boleto 42")[0] == "billing"
+    assert _route(compiled, "boleto sem número")[1] == "no_match"
+
+
+@pytest.mark.parametrize("pattern", [r"(a)\1", r"(a)?(?(1)b|c)"])
+def test_router_rejects_numbered_group_references(tmp_path: Path, pattern: str) -> None:
+    intent = {"name": "echo", "match": {"type": "regex", "patterns": [pattern]}}
+
+    with pytest.raises(runtime.RuntimeConfigError, match="backreferences not supported"):
+        runtime.compile_bundle(_bundle_with_intents(tmp_path, [intent]), "b1")
@@ -0,0 +1,75 @@
+# tests/test_runtime_lexical_match.py
+import math
+import random
+from pathlib import Path
+
+import pytest
+import yaml
+
+from app import runtime
+from tests.conftest import _bundle_with_match
+
+
+def _brute_force_bm25(questions: set[str], question: str, threshold: float) -> str | None:
+    ordered = sorted(questions)
+    documents = [runtime.normalize_question(q).split() for q in ordered]
+    average_length = sum(len(doc) for doc in documents) / len(documents)
+    best: tuple[float, int] | None = None
+    for doc_id, doc in enumerate(documents):
+        score = 0.0
+        for term in set(runtime.normalize_question(question).split()):
+            term_frequency = doc.count(term)
+            if not term_frequency:
+                continue
+            document_frequency = sum(1 for other in documents if term in other)
+            idf = math.log(
+                1 + (len(documents) - document_frequency + 0.5) / (document_frequency + 0.5)
+            )
+            saturation = runtime.BM25_K1 * (
+                1 - runtime.BM25_B + runtime.BM25_B * len(doc) / average_length
+            )
+            score += idf * term_frequency * (runtime.BM25_K1 + 1) / (term_frequency + saturation)
+        if score and (best is None or score > best[0] + 1e-9):
+            best = (score, doc_id)
+    if best is None or best[0] < threshold:
+        return None
+    return ordered[best[1]]
+
+
+def test_maxscore_ranking_matches_brute_force_bm25() -> None:
+    rng = random.Random(42)
+    vocab = [f"t{i}" for i in range(60)] + ["o", "que", "e", "de"] * 10
+    questions = {" ".join(rng.choices(vocab, k=rng.randint(3, 9))) for _ in range(300)}
+    index = runtime.build_lexical_index(questions, 4.0)
+
+    for _ in range(200):
+        query = " ".join(rng.choices(vocab, k=rng.randint(1, 6)))
+        assert runtime.match_lexical(index, query) == _brute_force_bm25(questions, query, 4.0)
+
+
+def test_lexical_match_type_resolves_paraphrases(tmp_path: Path) -> None:
+    bundle_path = _bundle_with_match(tmp_path, "lexical")
+    ontology_path = bundle_path / "ontology" / "ontology.yaml"
+    ontology = yaml.safe_load(ontology_path.read_text(encoding="utf-8"))
+    ontology["intents"][0]["match"]["threshold"] = 2.5
+    ontology_path.write_text(yaml.safe_dump(ontology, allow_unicode=True), encoding="utf-8")
+    compiled = runtime.compile_bundle(bundle_path, "b1")
+
+    hit, _ = runtime.compute_execute_result(compiled, "rollback de bundles, como funciona")
+    miss, _ = runtime.compute_execute_result(compiled, "qual é o horário de atendimento")
+
+    assert compiled.lexical_index is not None
+    assert hit["status"] == "ok"
+    assert hit["answer"] == compiled.answer_map["Como funciona o rollback de bundles?"]
+    assert miss["status"] == "no_match"
+
+
+def test_lexical_threshold_is_required(tmp_path: Path) -> None:
+    with pytest.raises(runtime.RuntimeConfigError, match="Intent lexical threshold invalid"):
+        runtime.compile_bundle(_bundle_with_match(tmp_path, "lexical"), "b1")
+
+
+def test_lexical_ties_resolve_to_first_question_in_order() -> None:
+    index = runtime.build_lexical_index({"beta alias", "alfa alias"}, 0.1)
+
+    assert runtime.match_lexical(index, "alias") == "alfa alias"
@@ -0,0 +1,193 @@
+# tests/test_runtime_negative_cache.py
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import runtime
+from tests.conftest import INTERNAL_TOKEN, _headers, _runtime_headers, _runtime_node
+
+
+@contextmanager
+def _counting_control_plane(status_code: int, calls: list[str]) -> Iterator[str]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            calls.append(self.path)
+            self.send_response(status_code)
+            self.end_headers()
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A003
+            return
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=1)
+
+
+@pytest.fixture(autouse=True)
+def negative_cache_state(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(runtime, "NEGATIVE_CACHE", {})
+    monkeypatch.setattr(
+        runtime, "NEGATIVE_CACHE_COUNTERS", {"hit": 0, "store": 0, "invalidate": 0}
+    )
+    monkeypatch.setattr(runtime, "CONTROL_PLANE_BREAKERS", {})
+    monkeypatch.delenv("CONTRACTOR_NEGATIVE_CACHE_TTL_SECONDS", raising=False)
+
+
+def test_unknown_tenant_is_negatively_cached_until_ttl(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    alias_path = tmp_path / "aliases.json"
+    alias_path.write_text(json.dumps({"tenants": {}}), encoding="utf-8")
+    monkeypatch.setenv("CONTRACTOR_ALIAS_CONFIG_PATH", str(alias_path))
+    monkeypatch.delenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", raising=False)
+    monkeypatch.setenv("CONTRACTOR_NEGATIVE_CACHE_TTL_SECONDS", "0.1")
+    loads: list[int] = []
+    original_load = runtime.load_alias_config
+
+    def _counting_load() -> dict[str, object]:
+        loads.append(1)
+        return original_load()
+
+    monkeypatch.setattr(runtime, "load_alias_config", _counting_load)
+
+    for _ in range(3):
+        with pytest.raises(runtime.RuntimeConfigError, match="Tenant alias not configured"):
+            runtime.resolve_current_bundle("tenant_x")
+    assert len(loads) == 1
+    assert runtime.NEGATIVE_CACHE_COUNTERS == {"hit": 2, "store": 1, "invalidate": 0}
+
+    # Expiração com jitter de ±20% sobre o TTL.
+    time.sleep(0.13)
+    with pytest.raises(runtime.RuntimeConfigError):
+        runtime.resolve_current_bundle("tenant_x")
+    assert len(loads) == 2
+
+
+def test_control_plane_404_is_cached_and_invalidated_by_notification(
+    runtime_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("CONTRACTOR_INTERNAL_TOKEN", INTERNAL_TOKEN)
+    calls: list[str] = []
+
+    with _counting_control_plane(404, calls) as cp_base:
+        monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+        responses = [
+            runtime_client.post(
+                "/execute", json={"question": "x"}, headers=_runtime_headers()
+            )
+            for _ in range(3)
+        ]
+        notified = runtime_client.post(
+            "/internal/aliases/tenant_a/changed",
+            json={"bundle_id": "demo-faq-0002"},
+            headers={"Authorization": f"Bearer {INTERNAL_TOKEN}"},
+        )
+        runtime_client.post("/execute", json={"question": "x"}, headers=_runtime_headers())
+
+    assert [r.json()["detail"] for r in responses] == ["Control Plane error: 404"] * 3
+    assert notified.json() == {"tenant_id": "tenant_a", "invalidated": 1}
+    assert len(calls) == 2
+
+
+def test_transient_failures_are_not_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+
+    with _counting_control_plane(503, calls) as cp_base:
+        monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+        for _ in range(2):
+            with pytest.raises(runtime.ControlPlaneUnavailableError):
+                runtime.resolve_current_bundle("tenant_a")
+
+    assert len(calls) == 2
+    assert runtime.NEGATIVE_CACHE == {}
+
+
+def test_broken_bundle_fetch_is_cached_per_bundle(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: tmp_path)
+    monkeypatch.setattr(
+        runtime,
+        "resolve_bundle_via_control_planes",
+        lambda *args, **kwargs: ("demo-faq-0009", "0.0.0", "0" * 64, None, 200),
+    )
+    monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", "http://cp.invalid")
+    fetches: list[str] = []
+
+    def _broken_fetch(tenant_id: str, bundle_id: str, **_: object) -> None:
+        fetches.append(bundle_id)
+        raise runtime.RuntimeConfigError("Bundle digest mismatch")
+
+    monkeypatch.setattr(runtime, "fetch_bundle", _broken_fetch)
+
+    for tenant_id in ("tenant_a", "tenant_b"):
+        with pytest.raises(runtime.RuntimeConfigError, match="Bundle digest mismatch"):
+            runtime.resolve_current_bundle(tenant_id)
+
+    assert fetches == ["demo-faq-0009"]
+    assert runtime.invalidate_negative_cache("tenant_a", "demo-faq-0009") == 1
+
+
+def test_bundle_download_network_failure_is_not_cached(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: tmp_path)
+    monkeypatch.setattr(
+        runtime,
+        "resolve_bundle_via_control_planes",
+        lambda *args, **kwargs: ("demo-faq-0009", "0.0.0", "0" * 64, None, 200),
+    )
+    monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", "http://cp.invalid")
+    # Porta fechada: conexão recusada, como numa oscilação de rede da origem.
+    monkeypatch.setenv("CONTRACTOR_BUNDLE_BASE_URL", "http://127.0.0.1:9")
+    fetches: list[str] = []
+
+    def _origin_fetch(tenant_id: str, bundle_id: str, **_: object) -> None:
+        fetches.append(bundle_id)
+        runtime._download_bundle_archive(bundle_id, tmp_path / f"{bundle_id}.tar.gz")
+
+    monkeypatch.setattr(runtime, "fetch_bundle", _origin_fetch)
+
+    for _ in range(2):
+        with pytest.raises(runtime.BundleDownloadError, match="Bundle download failed"):
+            runtime.resolve_current_bundle("tenant_a")
+
+    assert fetches == ["demo-faq-0009"] * 2
+    assert runtime.NEGATIVE_CACHE == {}
+
+
+def test_promote_notifies_runtimes_of_alias_change(
+    cp_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    observed: list[dict[str, object]] = []
+    with _runtime_node(True, observed) as node:
+        monkeypatch.setenv("CONTRACTOR_RUNTIME_INTERNAL_URLS", node)
+        cp_client.post(
+            "/tenants/tenant_a/aliases/candidate",
+            headers=_headers("cp_test_key_a", "tenant_a"),
+            json={"bundle_id": "demo-faq-0002"},
+        )
+        response = cp_client.post(
+            "/tenants/tenant_a/aliases/promote",
+            headers=_headers("cp_test_key_a", "tenant_a"),
+        )
+
+    assert response.status_code == 200
+    assert observed[-1]["path"] == "/internal/aliases/tenant_a/changed"
+    assert observed[-1]["body"] == {"bundle_id": "demo-faq-0002"}
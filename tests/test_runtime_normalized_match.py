@@ -0,0 +1,48 @@
+# tests/test_runtime_normalized_match.py
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app import runtime
+from tests.conftest import _bundle_with_match
+
+
+def test_normalize_question_folds_case_accents_punctuation_and_spaces() -> None:
+    assert runtime.normalize_question("  O QUE É o  alias\tcurrent ?") == "o que e o alias current"
+    assert runtime.normalize_question("Qual é o papel do Control-Plane?") == (
+        "qual e o papel do control plane"
+    )
+    assert runtime.normalize_question("ﬁnal") == "final"
+
+
+def test_normalized_match_hits_variants_with_canonical_answer(tmp_path: Path) -> None:
+    compiled = runtime.compile_bundle(_bundle_with_match(tmp_path, "normalized"), "b1")
+
+    payload, _ = runtime.compute_execute_result(compiled, "o que e o ALIAS current ?")
+    exact_payload, _ = runtime.compute_execute_result(compiled, "O que é o alias current?")
+    miss, _ = runtime.compute_execute_result(compiled, "o que e o alias draft?")
+
+    assert payload == exact_payload
+    assert payload["status"] == "ok"
+    assert payload["answer"]
+    assert compiled.question_index["o que e o alias current"] == "O que é o alias current?"
+    assert miss == {"answer": "", "intent": "faq_query", "status": "no_match"}
+
+
+def test_exact_match_is_unchanged(tmp_path: Path) -> None:
+    compiled = runtime.compile_bundle(_bundle_with_match(tmp_path, "exact"), "b1")
+
+    payload, _ = runtime.compute_execute_result(compiled, "o que e o ALIAS current ?")
+
+    assert payload["status"] == "no_match"
+
+
+def test_normalized_collisions_and_unknown_types_fail_compile(tmp_path: Path) -> None:
+    colliding = _bundle_with_match(tmp_path, "normalized", ["o que e o alias current"])
+    with pytest.raises(runtime.RuntimeConfigError, match="collide after normalization"):
+        runtime.compile_bundle(colliding, "b1")
+
+    shutil.rmtree(colliding)
+    with pytest.raises(runtime.RuntimeConfigError, match="Intent match type must be"):
+        runtime.compile_bundle(_bundle_with_match(tmp_path, "fuzzy"), "b1")
@@ -16,7 +16,8 @@ API_KEY = "runtime-test-key"
 
 @pytest.fixture
 def client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
-    runtime.RATE_LIMIT_COUNTERS.clear()
+    monkeypatch.setattr(runtime, "RATE_LIMIT_COUNTERS", {})
+    monkeypatch.setattr(runtime, "RATE_LIMIT_EXPIRY", [])
     monkeypatch.setenv("CONTRACTOR_TENANT_KEYS", json.dumps({TENANT_ID: API_KEY}))
     monkeypatch.delenv("CONTRACTOR_RATE_LIMIT_POLICY_PATH", raising=False)
     monkeypatch.delenv("CONTRACTOR_RATE_LIMIT_POLICY_JSON", raising=False)
@@ -99,6 +100,23 @@ def test_runtime_execute_rejects_when_rate_limit_exceeded(
     assert int(second.headers["Retry-After"]) > 0
 
 
+def test_runtime_execute_counts_denied_requests_until_first_denying_level(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _set_policy(monkeypatch, _base_policy(rate_limit_max=1, quota_max=10))
+    monkeypatch.setattr(runtime.time, "time", lambda: 1700000000)
+
+    statuses = [
+        client.post("/execute", json={"question": QUESTION}, headers=_headers()).status_code
+        for _ in range(3)
+    ]
+
+    assert statuses == [200, 429, 429]
+    # Negadas pelo rate limit contam na janela dele, mas não chegam a consumir quota.
+    assert runtime.RATE_LIMIT_COUNTERS[(TENANT_ID, "rate_limit", 1699999980)] == 3
+    assert runtime.RATE_LIMIT_COUNTERS[(TENANT_ID, "quota", 1699920000)] == 1
+
+
 def test_runtime_execute_rejects_when_quota_exceeded(
     client: TestClient, monkeypatch: pytest.MonkeyPatch
 ) -> None:
@@ -112,3 +130,95 @@ def test_runtime_execute_rejects_when_quota_exceeded(
     assert second.status_code == 429
     assert second.json()["detail"] == "Quota exceeded"
     assert int(second.headers["Retry-After"]) > 0
+
+
+def _hierarchical_policy(
+    *, global_max: int | None, tenant_max: int, borrow_max: int
+) -> dict[str, object]:
+    policy = _base_policy(rate_limit_max=tenant_max, quota_max=1000)
+    tenants = policy["tenants"]
+    assert isinstance(tenants, dict)
+    tenants[TENANT_ID]["rate_limit"]["borrow_max_requests"] = borrow_max
+    if global_max is not None:
+        policy["global"] = {"rate_limit": {"window_seconds": 60, "max_requests": global_max}}
+    return policy
+
+
+def test_runtime_execute_sheds_when_global_bucket_exhausted(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _set_policy(monkeypatch, _hierarchical_policy(global_max=1, tenant_max=5, borrow_max=5))
+    monkeypatch.setattr(runtime.time, "time", lambda: 1700000000)
+
+    first = client.post("/execute", json={"question": QUESTION}, headers=_headers())
+    second = client.post("/execute", json={"question": QUESTION}, headers=_headers())
+
+    assert first.status_code == 200
+    assert second.status_code == 503
+    assert second.json()["detail"] == "Global rate limit exceeded"
+    assert int(second.headers["Retry-After"]) > 0
+    # Como na v1, a request negada conta em todos os níveis avaliados.
+    assert runtime.RATE_LIMIT_COUNTERS[(TENANT_ID, "rate_limit", 1699999980)] == 2
+    assert runtime.RATE_LIMIT_COUNTERS[("", "global", 1699999980)] == 2
+
+
+def test_runtime_execute_borrows_global_capacity_up_to_tenant_cap(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _set_policy(monkeypatch, _hierarchical_policy(global_max=10, tenant_max=1, borrow_max=2))
+    monkeypatch.setattr(runtime.time, "time", lambda: 1700000000)
+
+    responses = [
+        client.post("/execute", json={"question": QUESTION}, headers=_headers())
+        for _ in range(3)
+    ]
+
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert "X-RateLimit-Borrowed" not in responses[0].headers
+    assert responses[1].headers["X-RateLimit-Borrowed"] == "true"
+    assert responses[1].headers["X-RateLimit-Remaining"] == "0"
+    assert responses[2].json()["detail"] == "Rate limit exceeded"
+
+
+def test_runtime_execute_does_not_borrow_without_global_bucket(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _set_policy(
+        monkeypatch, _hierarchical_policy(global_max=None, tenant_max=1, borrow_max=2)
+    )
+    monkeypatch.setattr(runtime.time, "time", lambda: 1700000000)
+
+    first = client.post("/execute", json={"question": QUESTION}, headers=_headers())
+    second = client.post("/execute", json={"question": QUESTION}, headers=_headers())
+
+    assert [first.status_code, second.status_code] == [200, 429]
+
+
+def test_runtime_policy_rejects_borrow_below_tenant_limit(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _set_policy(monkeypatch, _hierarchical_policy(global_max=10, tenant_max=5, borrow_max=4))
+
+    response = client.post("/execute", json={"question": QUESTION}, headers=_headers())
+
+    assert response.status_code == 500
+
+
+def test_rate_limit_counters_expire_without_scanning(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _set_policy(monkeypatch, _hierarchical_policy(global_max=10, tenant_max=5, borrow_max=5))
+    now = {"value": 1700000000}
+    monkeypatch.setattr(runtime.time, "time", lambda: now["value"])
+
+    runtime.enforce_rate_limit_and_quota(TENANT_ID)
+    assert (TENANT_ID, "rate_limit", 1699999980) in runtime.RATE_LIMIT_COUNTERS
+    assert ("", "global", 1699999980) in runtime.RATE_LIMIT_COUNTERS
+
+    now["value"] += 200
+    runtime.enforce_rate_limit_and_quota(TENANT_ID)
+
+    assert (TENANT_ID, "rate_limit", 1699999980) not in runtime.RATE_LIMIT_COUNTERS
+    assert ("", "global", 1699999980) not in runtime.RATE_LIMIT_COUNTERS
+    # A quota diária continua na mesma janela.
+    assert runtime.RATE_LIMIT_COUNTERS[(TENANT_ID, "quota", 1699920000)] == 2
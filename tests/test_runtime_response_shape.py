@@ -0,0 +1,159 @@
+# tests/test_runtime_response_shape.py
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+from fastapi import HTTPException
+
+from app import runtime
+from tests.conftest import _source_bundle_path
+
+DOMAINS = {
+    "answer": None,
+    "intent": frozenset({"faq_query"}),
+    "status": frozenset({"ok", "no_match"}),
+}
+
+
+def _bundle_with_schema(tmp_path: Path, edit: Any) -> Path:
+    bundle_path = tmp_path / "faq"
+    shutil.copytree(_source_bundle_path(), bundle_path)
+    schema_path = bundle_path / "entities" / "faq_answer.schema.yaml"
+    schema = yaml.safe_load(schema_path.read_text(encoding="utf-8"))
+    edit(schema)
+    schema_path.write_text(yaml.safe_dump(schema), encoding="utf-8")
+    return bundle_path
+
+
+def test_demo_schema_is_proven_without_per_request_check() -> None:
+    compiled = runtime.compile_bundle(_source_bundle_path(), "b1")
+
+    payload, _ = runtime.compute_execute_result(compiled, "O que é o alias current?")
+
+    assert compiled.response_validation == "proven"
+    assert compiled.response_check is None
+    assert payload["status"] == "ok"
+
+
+def test_unproven_constraints_compile_to_generated_check(tmp_path: Path) -> None:
+    def edit(schema: dict[str, Any]) -> None:
+        schema["properties"]["answer"]["minLength"] = 1
+        schema["properties"]["status"]["enum"] = ["ok", "no_match"]
+
+    compiled = runtime.compile_bundle(_bundle_with_schema(tmp_path, edit), "b1")
+
+    payload, _ = runtime.compute_execute_result(compiled, "O que é o alias current?")
+    with pytest.raises(HTTPException) as exc_info:
+        runtime.compute_execute_result(compiled, "pergunta sem resposta")
+
+    assert compiled.response_validation == "generated"
+    assert payload["status"] == "ok"
+    assert exc_info.value.detail == "Invalid response payload"
+
+
+@pytest.mark.parametrize(
+    ("schema", "valid", "invalid"),
+    [
+        (
+            {"properties": {"status": {"enum": ["ok"]}, "answer": {"pattern": "^[A-Z]"}}},
+            {"answer": "Sim", "intent": "faq_query", "status": "ok"},
+            {"answer": "Sim", "intent": "faq_query", "status": "no_match"},
+        ),
+        (
+            {"additionalProperties": {"maxLength": 3}, "properties": {"intent": True}},
+            {"answer": "abc", "intent": "faq_query", "status": "ok"},
+            {"answer": "abcd", "intent": "faq_query", "status": "ok"},
+        ),
+        (
+            {
+                "if": {"properties": {"status": {"const": "ok"}}},
+                "then": {"properties": {"answer": {"$ref": "#/$defs/filled"}}},
+                "$defs": {"filled": {"minLength": 1}},
+            },
+            {"answer": "", "intent": "faq_query", "status": "no_match"},
+            {"answer": "", "intent": "faq_query", "status": "ok"},
+        ),
+        (
+            {
+                "anyOf": [
+                    {"properties": {"status": {"const": "no_match"}}},
+                    {"not": {"properties": {"answer": {"maxLength": 0}}}},
+                ]
+            },
+            {"answer": "", "intent": "faq_query", "status": "no_match"},
+            {"answer": "", "intent": "faq_query", "status": "ok"},
+        ),
+        (
+            {
+                "oneOf": [{"required": ["answer"]}, {"properties": {"answer": {"maxLength": 2}}}],
+                "patternProperties": {"^(intent|status)$": {"pattern": "^[a-z_]+$"}},
+            },
+            {"answer": "abc", "intent": "faq_query", "status": "ok"},
+            {"answer": "ab", "intent": "faq_query", "status": "ok"},
+        ),
+    ],
+)
+def test_generated_check_matches_jsonschema(
+    schema: dict[str, Any], valid: dict[str, str], invalid: dict[str, str]
+) -> None:
+    kind, check = runtime.build_response_check(schema, DOMAINS)
+    validator = runtime.Draft202012Validator(schema)
+
+    assert kind == "generated"
+    assert check is not None
+    assert check(valid) is validator.is_valid(valid) is True
+    assert check(invalid) is validator.is_valid(invalid) is False
+
+
+def test_statically_impossible_schema_always_fails() -> None:
+    kind, check = runtime.build_response_check({"required": ["extra"]}, DOMAINS)
+
+    assert kind == "generated"
+    assert check is not None
+    assert check({"answer": "a", "intent": "faq_query", "status": "ok"}) is False
+
+
+def test_statically_decided_keywords_are_proven() -> None:
+    schema = {
+        "allOf": [{"type": "object"}, {"$ref": "#/$defs/shape"}],
+        "$defs": {"shape": {"propertyNames": {"maxLength": 6}}},
+        "dependentRequired": {"answer": ["intent"]},
+    }
+
+    assert runtime.build_response_check(schema, DOMAINS) == ("proven", None)
+
+
+@pytest.mark.parametrize(
+    "unsupported",
+    [
+        {"unevaluatedProperties": True},
+        {"$ref": "https://example.com/answer.schema.json"},
+        {"$defs": {"loop": {"$ref": "#/$defs/loop"}}, "$ref": "#/$defs/loop"},
+    ],
+)
+def test_unsupported_schemas_fall_back_to_jsonschema(unsupported: dict[str, Any]) -> None:
+    kind, check = runtime.build_response_check(unsupported, DOMAINS)
+
+    assert kind == "jsonschema"
+    assert check is not None
+
+
+def test_unsupported_keywords_fall_back_to_jsonschema(tmp_path: Path) -> None:
+    compiled = runtime.compile_bundle(
+        _bundle_with_schema(tmp_path, lambda schema: schema.update(unevaluatedProperties=True)),
+        "b1",
+    )
+
+    payload, _ = runtime.compute_execute_result(compiled, "O que é o alias current?")
+
+    assert compiled.response_validation == "jsonschema"
+    assert payload["status"] == "ok"
+
+
+def test_invalid_schema_fails_compile(tmp_path: Path) -> None:
+    bundle_path = _bundle_with_schema(tmp_path, lambda schema: schema.update(type=12))
+
+    with pytest.raises(runtime.RuntimeConfigError, match="Response schema invalid"):
+        runtime.compile_bundle(bundle_path, "b1")
@@ -0,0 +1,138 @@
+# tests/test_runtime_suggestions.py
+import math
+import random
+import shutil
+from pathlib import Path
+
+import pytest
+import yaml
+from fastapi.testclient import TestClient
+
+from app import runtime
+from tests.conftest import (
+    _bundle_id,
+    _runtime_headers,
+    _seed_verified_bundle,
+    _source_bundle_path,
+    _switchable_control_plane,
+)
+
+
+def _brute_force_suggestions(
+    index: runtime.SuggestionIndex, question: str
+) -> list[tuple[str, float]]:
+    unseen_idf = math.log(1 + len(index.questions))
+    query = {
+        bucket: weight
+        for bucket, weight in runtime._tfidf_unit_vector(
+            runtime._hashed_ngram_counts(question), index.idf, unseen_idf
+        ).items()
+        if bucket in index.columns
+    }
+    scored = []
+    for doc_id, candidate in enumerate(index.questions):
+        document = runtime._tfidf_unit_vector(
+            runtime._hashed_ngram_counts(candidate), index.idf, unseen_idf
+        )
+        score = sum(weight * document.get(bucket, 0.0) for bucket, weight in query.items())
+        if score >= index.min_similarity:
+            scored.append((-score, doc_id))
+    return [(index.questions[doc_id], -score) for score, doc_id in sorted(scored)[: index.top_k]]
+
+
+@pytest.fixture(autouse=True)
+def suggestion_state(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(runtime, "SUGGESTION_COUNTERS", {"computed": 0, "capped": 0})
+    monkeypatch.setattr(runtime, "EXECUTE_FLIGHTS", runtime.SingleFlight())
+
+
+def test_pruned_ranking_matches_brute_force() -> None:
+    rng = random.Random(7)
+    vocab = [f"termo{i}" for i in range(40)] + ["o", "que", "e", "de"] * 10
+    questions = {" ".join(rng.choices(vocab, k=rng.randint(3, 8))) for _ in range(300)}
+    index = runtime.build_suggestion_index(questions, {"top_k": 3, "min_similarity": 0.2})
+
+    for _ in range(100):
+        query = " ".join(rng.choices(vocab, k=rng.randint(1, 6)))
+        suggestions = runtime.suggest_questions(index, query, max_seconds=10)
+        expected = _brute_force_suggestions(index, query)
+        assert suggestions is not None
+        assert [s["question"] for s in suggestions] == [q for q, _ in expected]
+        assert [s["similarity"] for s in suggestions] == pytest.approx(
+            [score for _, score in expected], abs=1e-4
+        )
+
+
+def test_ties_resolve_in_question_order_and_respect_top_k() -> None:
+    index = runtime.build_suggestion_index(
+        {"x2 alias", "x1 alias", "x3 alias"}, {"top_k": 2, "min_similarity": 0.05}
+    )
+
+    suggestions = runtime.suggest_questions(index, "alias", max_seconds=10)
+
+    assert suggestions is not None
+    assert [s["question"] for s in suggestions] == ["x1 alias", "x2 alias"]
+    assert suggestions[0]["similarity"] == suggestions[1]["similarity"]
+
+
+def test_latency_cap_omits_suggestions() -> None:
+    index = runtime.build_suggestion_index({"o que e o alias current"}, {})
+
+    assert runtime.suggest_questions(index, "alias current", max_seconds=-1) is None
+    assert runtime.SUGGESTION_COUNTERS == {"computed": 0, "capped": 1}
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        [],
+        {"top_k": 0},
+        {"top_k": 21},
+        {"top_k": True},
+        {"min_similarity": 0},
+        {"min_similarity": 2},
+    ],
+)
+def test_invalid_config_fails(config: object) -> None:
+    with pytest.raises(runtime.RuntimeConfigError, match="Intent suggestions config invalid"):
+        runtime.build_suggestion_index({"o que e o alias current"}, config)
+
+
+def test_execute_no_match_carries_suggestions(
+    runtime_client: TestClient,
+    breaker_env: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    # Variante montada numa fonte nova e semeada com marker próprio: editar o bundle já
+    # verificado seria detectado como corrompido (ADR 0025).
+    source = tmp_path / "source"
+    shutil.copytree(_source_bundle_path(), source)
+    ontology_path = source / "ontology" / "ontology.yaml"
+    ontology = yaml.safe_load(ontology_path.read_text(encoding="utf-8"))
+    ontology["intents"][0]["suggestions"] = {"top_k": 2, "min_similarity": 0.3}
+    ontology_path.write_text(yaml.safe_dump(ontology, allow_unicode=True), encoding="utf-8")
+    shutil.rmtree(breaker_env / _bundle_id())
+    _seed_verified_bundle(breaker_env, _bundle_id(), source)
+
+    with _switchable_control_plane({"status": 200, "calls": 0}) as cp_base:
+        monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", cp_base)
+        miss = runtime_client.post(
+            "/execute",
+            json={"question": "como funciona o rolback dos bundles"},
+            headers=_runtime_headers("rid-suggest-miss"),
+        )
+        hit = runtime_client.post(
+            "/execute",
+            json={"question": "O que é o alias current?"},
+            headers=_runtime_headers("rid-suggest-hit"),
+        )
+
+    assert miss.status_code == 200
+    assert miss.json()["status"] == "no_match"
+    suggestions = miss.json()["suggestions"]
+    assert suggestions[0]["question"] == "Como funciona o rollback de bundles?"
+    assert 0.3 <= suggestions[0]["similarity"] <= 1
+    assert len(suggestions) <= 2
+    assert "suggestions" not in hit.json()
+    assert runtime.runtime_metrics_snapshot()["suggestions"]["computed"] == 1
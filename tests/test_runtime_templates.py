@@ -0,0 +1,101 @@
+# tests/test_runtime_templates.py
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app import runtime
+from tests.conftest import _source_bundle_path
+
+PAYLOAD = {"answer": "Resposta", "intent": "faq_query", "status": "ok"}
+
+
+def _bundle_copy(tmp_path: Path, name: str = "faq") -> Path:
+    bundle_path = tmp_path / name
+    shutil.copytree(_source_bundle_path(), bundle_path)
+    return bundle_path
+
+
+def _cache_files(root: Path) -> list[Path]:
+    return sorted((root / runtime.TEMPLATE_CACHE_DIRNAME).glob("*.cache"))
+
+
+def test_fresh_environment_loads_bytecode_without_recompiling(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: tmp_path / "root")
+    expected = runtime.load_output_template(_bundle_copy(tmp_path, "a")).render(**PAYLOAD)
+
+    def _fail_compile(*_args: object, **_kwargs: object) -> None:
+        raise AssertionError("template recompiled")
+
+    monkeypatch.setattr(runtime.Environment, "compile", _fail_compile)
+    template = runtime.load_output_template(_bundle_copy(tmp_path, "b"))
+
+    assert template.render(**PAYLOAD) == expected
+    assert len(_cache_files(tmp_path / "root")) == 1
+
+
+def test_static_includes_are_precompiled(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: tmp_path / "root")
+    bundle_path = _bundle_copy(tmp_path)
+    templates = bundle_path / "templates"
+    (templates / "footer.j2").write_text("-- {{ status }}\n", encoding="utf-8")
+    (templates / "faq_answer.j2").write_text(
+        '{{ answer }}\n{% include "footer.j2" %}', encoding="utf-8"
+    )
+
+    template = runtime.load_output_template(bundle_path)
+    (templates / "footer.j2").unlink()
+
+    assert template.render(**PAYLOAD) == "Resposta\n-- ok"
+    assert len(_cache_files(tmp_path / "root")) == 2
+
+
+def test_dynamic_template_references_are_rejected(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: tmp_path / "root")
+    bundle_path = _bundle_copy(tmp_path)
+    (bundle_path / "templates" / "faq_answer.j2").write_text(
+        "{% include intent ~ '.j2' %}", encoding="utf-8"
+    )
+
+    with pytest.raises(runtime.RuntimeConfigError, match="requires runtime compilation"):
+        runtime.compile_bundle(bundle_path, "b1")
+
+
+def test_warm_cache_skips_reference_parse(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: tmp_path / "root")
+    bundle_path = _bundle_copy(tmp_path, "a")
+    (bundle_path / "templates" / "footer.j2").write_text("-- {{ status }}\n", encoding="utf-8")
+    (bundle_path / "templates" / "faq_answer.j2").write_text(
+        '{{ answer }}\n{% include "footer.j2" %}', encoding="utf-8"
+    )
+    runtime.load_output_template(bundle_path)
+
+    def _fail_parse(*_args: object, **_kwargs: object) -> None:
+        raise AssertionError("template parsed again")
+
+    monkeypatch.setattr(runtime.Environment, "parse", _fail_parse)
+    template = runtime.load_output_template(bundle_path)
+
+    assert template.render(**PAYLOAD) == "Resposta\n-- ok"
+
+
+def test_shared_bytecode_cache_requires_private_directory(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: tmp_path / "root")
+    cache_dir = tmp_path / "root" / runtime.TEMPLATE_CACHE_DIRNAME
+    cache_dir.mkdir(parents=True)
+    cache_dir.chmod(0o777)
+
+    template = runtime.load_output_template(_bundle_copy(tmp_path))
+
+    assert template.render(**PAYLOAD)
+    assert _cache_files(tmp_path / "root") == []
@@ -0,0 +1,140 @@
+# tests/test_runtime_warmup.py
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.runtime as runtime
+
+BUNDLE_PATH = Path(__file__).resolve().parents[1] / "data" / "bundles" / "demo" / "faq"
+
+
+@pytest.fixture(autouse=True)
+def warmup_env(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(
+        runtime, "RUNTIME_READINESS", {"status": "starting", "tenants": {}}
+    )
+    monkeypatch.setattr(runtime, "COMPILED_BUNDLES", {})
+    monkeypatch.setenv(
+        "CONTRACTOR_TENANT_KEYS",
+        json.dumps({"tenant_a": "key-a", "tenant_b": "key-b"}),
+    )
+    alias_path = tmp_path / "aliases.json"
+    alias_path.write_text(
+        json.dumps(
+            {
+                "tenants": {
+                    "tenant_a": {
+                        "current_bundle_path": str(BUNDLE_PATH),
+                        "bundle_id": "demo-faq-0001",
+                    }
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("CONTRACTOR_ALIAS_CONFIG_PATH", str(alias_path))
+    monkeypatch.delenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", raising=False)
+
+
+def test_readyz_is_unavailable_until_warmup_completes() -> None:
+    client = TestClient(runtime.app)
+
+    before = client.get("/readyz")
+    runtime.warmup_runtime()
+    after = client.get("/readyz")
+
+    assert client.get("/healthz").status_code == 200
+    assert before.status_code == 503
+    assert before.json()["status"] == "starting"
+    assert after.status_code == 200
+    assert after.json() == {
+        "status": "ready",
+        "tenants": {
+            "tenant_a": {"status": "warm", "bundle_id": "demo-faq-0001"},
+            "tenant_b": {"status": "failed"},
+        },
+    }
+    assert ("demo-faq-0001", str(BUNDLE_PATH)) in runtime.COMPILED_BUNDLES
+
+
+def test_warmup_fails_closed_when_tenant_config_invalid(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("CONTRACTOR_TENANT_KEYS", "{invalid")
+
+    readiness = runtime.warmup_runtime()
+
+    assert readiness["status"] == "failed"
+    assert TestClient(runtime.app).get("/readyz").status_code == 503
+
+
+def test_readyz_is_unavailable_when_control_plane_is_down_during_warmup(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(runtime, "_bundle_root", lambda: tmp_path / "bundles")
+    monkeypatch.setattr(runtime, "CONTROL_PLANE_BREAKERS", {})
+    monkeypatch.setattr(runtime, "LAST_KNOWN_GOOD", {})
+    monkeypatch.setattr(runtime, "NEGATIVE_CACHE", {})
+    # Porta fechada: todo resolve falha com o Control Plane indisponível.
+    monkeypatch.setenv("CONTRACTOR_CONTROL_PLANE_BASE_URL", "http://127.0.0.1:9")
+
+    readiness = runtime.warmup_runtime()
+    response = TestClient(runtime.app).get("/readyz")
+
+    assert readiness["status"] == "failed"
+    assert response.status_code == 503
+    assert response.json() == {
+        "status": "failed",
+        "tenants": {"tenant_a": {"status": "failed"}, "tenant_b": {"status": "failed"}},
+    }
+
+
+def test_failed_warmup_is_retried_until_a_tenant_warms(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    attempts: list[str] = []
+    original = runtime._warmup_tenant
+
+    def _flaky_warmup(tenant_id: str) -> dict[str, str]:
+        attempts.append(tenant_id)
+        if len(attempts) <= 2:
+            raise runtime.ControlPlaneUnavailableError("Control Plane unavailable")
+        return original(tenant_id)
+
+    monkeypatch.setattr(runtime, "_warmup_tenant", _flaky_warmup)
+    runtime._WARMUP_STOP.clear()
+
+    runtime._run_warmup(0.01)
+
+    assert len(attempts) == 4
+    assert runtime.RUNTIME_READINESS["status"] == "ready"
+    assert runtime.RUNTIME_READINESS["tenants"]["tenant_a"]["status"] == "warm"
+
+
+def test_startup_runs_warmup_in_background() -> None:
+    with TestClient(runtime.app) as client:
+        deadline = time.time() + 5
+        response = client.get("/readyz")
+        while response.status_code != 200 and time.time() < deadline:
+            time.sleep(0.01)
+            response = client.get("/readyz")
+
+    assert response.status_code == 200
+    assert response.json()["tenants"]["tenant_a"]["status"] == "warm"
+
+
+def test_startup_without_warmup_is_ready_immediately(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("CONTRACTOR_WARMUP_ENABLED", "false")
+
+    with TestClient(runtime.app) as client:
+        response = client.get("/readyz")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready", "tenants": {}}